@@ -0,0 +1,308 @@
+import argparse
+import os
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from connection import DB_FILE, open_connection
+from validation import epoch_day, is_valid_date
+
+# Time-series operational reports computed with NumPy.
+#
+# Each report needs the departure day plus one id per flight (destination,
+# status code or pilot), which are bulk-loaded into a pair of NumPy arrays.
+# The reports are then a handful of whole-array operations: bincount over a
+# combined (period, id) key for grouped counts, cumsum differences for
+# rolling windows, a least-squares slope across all pilots at once for
+# workload trends, and a stable argsort for the top N. No Python loop runs
+# per flight and no query runs per bucket.
+#
+# Loading is the expensive part, since SQLite hands values to Python one
+# object at a time. Each pair is read from the covering index ordered by
+# (id, departure_day) with one row per id: its flight count and its day
+# numbers as a single group_concat() string, parsed by np.fromstring(). The
+# id array is rebuilt with np.repeat(). For 10M flights that is about 2s
+# per pair and 0.1-0.3s per report. Loaded pairs are kept for the process and
+# reused until the database changes (PRAGMA data_version and the
+# connection's total_changes), so a menu session pays for each load once.
+#
+# NumPy is optional for the rest of the system; the reports need it.
+#
+#     python analytics.py volume --period week --top 5
+#     python analytics.py rates --window 7 --last 14
+#     python analytics.py workload --months 6 --top 10
+
+PERIODS = ("day", "week")
+# Statuses whose share of flights the rates report tracks, by name
+RATE_STATUSES = ("On Time", "Delayed", "Cancelled")
+DEFAULT_TOP = 5
+DEFAULT_LAST = 14
+DEFAULT_WINDOW = 7
+DEFAULT_MONTHS = 6
+
+# id column -> covering index on (column, departure_day)
+PAIR_INDEXES = {
+    "dest_id": "idx_flights_dest",
+    "status_id": "idx_flights_status",
+    "pilot_id": "idx_flights_pilot",
+}
+
+# Loaded pairs, {(column, date_from, date_to): (ids, days)}, and the
+# (connection, data_version, total_changes) stamp they were loaded under
+_cache = {"stamp": None, "pairs": {}}
+
+
+def require_numpy():
+    if np is None:
+        raise RuntimeError("The analytics reports need NumPy. Install it with: pip install numpy")
+
+
+def load_pair(conn, column, date_from=None, date_to=None):
+    """(ids, days) arrays with one entry per flight departing in [date_from,
+    date_to] (None = open) whose column is not NULL. days are departure_day
+    numbers (days since 1970-01-01).
+    """
+    require_numpy()
+    rows = conn.execute(f"""SELECT {column}, COUNT(*), group_concat(departure_day)
+                            FROM Flights INDEXED BY {PAIR_INDEXES[column]}
+                            WHERE {column} IS NOT NULL
+                              AND departure_day >= COALESCE(?, -1e9) AND departure_day <= COALESCE(?, 1e9)
+                            GROUP BY {column}""",
+                        (date_from and epoch_day(date_from), date_to and epoch_day(date_to))).fetchall()
+    ids = np.array([row[0] for row in rows], dtype=np.int32)
+    counts = np.array([row[1] for row in rows], dtype=np.int64)
+    days = np.fromstring(",".join(row[2] for row in rows), dtype=np.int32, sep=",") if rows else np.zeros(0, np.int32)
+    return np.repeat(ids, counts), days
+
+
+def flight_pair(conn, column, date_from=None, date_to=None):
+    """load_pair(), reused while the database has not changed since it was loaded."""
+    stamp = (id(conn), conn.execute("PRAGMA data_version").fetchone()[0], conn.total_changes)
+    if _cache["stamp"] != stamp:
+        _cache.update(stamp=stamp, pairs={})
+    key = (column, date_from, date_to)
+    if key not in _cache["pairs"]:
+        _cache["pairs"][key] = load_pair(conn, column, date_from, date_to)
+    return _cache["pairs"][key]
+
+
+def day_label(day):
+    return str(np.datetime64(int(day), "D"))
+
+
+def period_index(days, period):
+    """(index of each flight's period counted from the first, first day of each period)."""
+    if period == "week":
+        # Day 0 (1970-01-01) was a Thursday; weeks start on Monday
+        keys = (days + 3) // 7
+        first = int(keys.min())
+        return keys - first, np.arange(first, int(keys.max()) + 1) * 7 - 3
+    first = int(days.min())
+    return days - first, np.arange(first, int(days.max()) + 1)
+
+
+def top_ids(counts, top):
+    """Ids (indexes of counts) of the top largest counts, biggest first, ties by id."""
+    order = np.argsort(-counts, kind="stable")[:top]
+    return order[counts[order] > 0]
+
+
+def destination_volume(dests, days, period="day", top=DEFAULT_TOP):
+    """(period starts, top destination ids, counts[period, destination]) for the
+    busiest destinations, from a (dest_id, day) pair.
+    """
+    if not len(days):
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros((0, 0), dtype=np.int64)
+    index, starts = period_index(days, period)
+    width = int(dests.max()) + 1
+    counts = np.bincount(index.astype(np.int64) * width + dests, minlength=len(starts) * width)
+    counts = counts.reshape(len(starts), width)
+    ids = top_ids(counts.sum(axis=0), top)
+    return starts, ids, counts[:, ids]
+
+
+def status_rates(codes, days, status_ids, window=DEFAULT_WINDOW):
+    """(days, flights in the window ending on each day, {name: share of those flights})
+    over a rolling window of `window` days, from a (status_id, day) pair.
+    status_ids maps names to codes.
+    """
+    if not len(days):
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), {name: np.zeros(0) for name in status_ids}
+    index, starts = period_index(days, "day")
+    width = int(codes.max()) + 1
+    daily = np.bincount(index.astype(np.int64) * width + codes, minlength=len(starts) * width).reshape(-1, width)
+    # Rolling sums as differences of a cumulative sum with a leading zero row
+    cumulative = np.vstack([np.zeros((1, width), dtype=np.int64), np.cumsum(daily, axis=0)])
+    rolling = cumulative[1:] - cumulative[np.maximum(np.arange(1, len(starts) + 1) - window, 0)]
+    totals = rolling.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rates = {name: np.where(totals > 0, rolling[:, code] / totals, np.nan) if code < width
+                 else np.zeros(len(starts)) for name, code in status_ids.items()}
+    return starts, totals, rates
+
+
+def pilot_workload(pilots, days, months=DEFAULT_MONTHS, top=DEFAULT_TOP):
+    """(month labels, top pilot ids, counts[pilot, month], trend per pilot) for the
+    last `months` months with flights, from a (pilot_id, day) pair. The trend
+    is the least-squares slope of the monthly counts, in flights per month.
+    """
+    if not len(days):
+        return [], np.zeros(0, dtype=np.int64), np.zeros((0, 0), dtype=np.int64), np.zeros(0)
+    # Month of each calendar day in range, looked up per flight instead of
+    # converting every flight's date
+    first = int(days.min())
+    month_of_day = np.arange(first, int(days.max()) + 1).astype("datetime64[D]").astype("datetime64[M]").astype(np.int32)
+    month = month_of_day[days - first]
+    last_month = int(month.max())
+    first_month = max(int(month.min()), last_month - months + 1)
+    recent = month >= first_month
+    width = last_month - first_month + 1
+    counts = np.bincount(pilots[recent].astype(np.int64) * width + (month[recent] - first_month),
+                         minlength=(int(pilots.max()) + 1) * width).reshape(-1, width)
+    ids = top_ids(counts.sum(axis=1), top)
+    counts = counts[ids]
+    # Slope for every pilot at once: sum((x - mean x) * y) / sum((x - mean x)^2)
+    x = np.arange(width) - (width - 1) / 2
+    trend = counts @ x / (x @ x) if width > 1 else np.zeros(len(ids))
+    labels = [str(np.datetime64(m, "M")) for m in range(first_month, last_month + 1)]
+    return labels, ids, counts, trend
+
+
+def check_counts(**counts):
+    """Raise ValueError unless every count (periods, days, months or ids to
+    show) is at least 1; the slicing and rolling windows need that.
+    """
+    for name, value in counts.items():
+        if value < 1:
+            raise ValueError(f"{name} must be at least 1 (got {value}).")
+
+
+def status_codes(conn, names=RATE_STATUSES):
+    """{name: status_id} for the names that exist in FlightStatus."""
+    found = {}
+    for name in names:
+        row = conn.execute("SELECT status_id FROM FlightStatus WHERE name = ?", (name,)).fetchone()
+        if row:
+            found[name] = row[0]
+    return found
+
+
+def names_by_id(conn, query, ids):
+    """{id: label} from a (id, label) query with a json_each(?) list of ids."""
+    import json
+    return dict(conn.execute(query, (json.dumps([int(i) for i in ids]),)).fetchall())
+
+
+def volume_report(conn, period="day", top=DEFAULT_TOP, last=DEFAULT_LAST, date_from=None, date_to=None):
+    """(headers, rows): flights per period for the busiest destinations, last periods only."""
+    check_counts(top=top, last=last)
+    starts, ids, counts = destination_volume(*flight_pair(conn, "dest_id", date_from, date_to), period, top)
+    codes = names_by_id(conn, """SELECT dest_id, airport_code FROM Destinations
+                                 WHERE dest_id IN (SELECT value FROM json_each(?))""", ids)
+    headers = ["Week of" if period == "week" else "Date"] + [codes.get(int(i), str(i)) for i in ids]
+    rows = [[day_label(start)] + [int(value) for value in counts[i]]
+            for i, start in list(enumerate(starts))[-last:]]
+    return headers, rows
+
+
+def rates_report(conn, window=DEFAULT_WINDOW, last=DEFAULT_LAST, date_from=None, date_to=None):
+    """(headers, rows): rolling share of flights per tracked status, last days only."""
+    check_counts(window=window, last=last)
+    codes = status_codes(conn)
+    days, totals, rates = status_rates(*flight_pair(conn, "status_id", date_from, date_to), codes, window)
+    headers = ["Date", f"Flights ({window}d)"] + [f"{name} %" for name in codes]
+    rows = [[day_label(day), int(totals[i])] + [f"{rates[name][i] * 100:.1f}" if totals[i] else "-" for name in codes]
+            for i, day in list(enumerate(days))[-last:]]
+    return headers, rows
+
+
+def workload_report(conn, months=DEFAULT_MONTHS, top=DEFAULT_TOP, date_from=None, date_to=None):
+    """(headers, rows): flights per month for the busiest pilots, with the trend."""
+    check_counts(months=months, top=top)
+    labels, ids, counts, trend = pilot_workload(*flight_pair(conn, "pilot_id", date_from, date_to), months, top)
+    names = names_by_id(conn, """SELECT pilot_id, name FROM Pilots
+                                 WHERE pilot_id IN (SELECT value FROM json_each(?))""", ids)
+    headers = ["Pilot"] + labels + ["Trend/month"]
+    rows = [[names.get(int(pilot_id), str(pilot_id))] + [int(value) for value in counts[i]] + [f"{trend[i]:+.1f}"]
+            for i, pilot_id in enumerate(ids)]
+    return headers, rows
+
+
+# name -> (report, the id column its pair holds)
+REPORTS = {
+    "volume": (volume_report, "dest_id"),
+    "rates": (rates_report, "status_id"),
+    "workload": (workload_report, "pilot_id"),
+}
+
+
+def print_table(headers, rows):
+    if not rows:
+        print("No flights in range.")
+        return
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    print(" | ".join(f"{header:>{width}}" for header, width in zip(headers, widths)))
+    print("-+-".join("-" * width for width in widths))
+    for row in rows:
+        print(" | ".join(f"{value:>{width}}" for value, width in zip(row, widths)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time-series flight reports (needs NumPy).")
+    parser.add_argument("--db", default=DB_FILE, help="database file")
+    parser.add_argument("--from", dest="date_from", help="first departure date (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="date_to", help="last departure date (YYYY-MM-DD)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    volume = commands.add_parser("volume", help="flights per day or week for the busiest destinations")
+    volume.add_argument("--period", choices=PERIODS, default="day")
+    volume.add_argument("--top", type=int, default=DEFAULT_TOP, help="destinations to show")
+    volume.add_argument("--last", type=int, default=DEFAULT_LAST, help="most recent periods to show")
+
+    rates = commands.add_parser("rates", help="on-time / delayed / cancelled share over a rolling window")
+    rates.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="window length in days")
+    rates.add_argument("--last", type=int, default=DEFAULT_LAST, help="most recent days to show")
+
+    workload = commands.add_parser("workload", help="flights per month for the busiest pilots, with trend")
+    workload.add_argument("--months", type=int, default=DEFAULT_MONTHS)
+    workload.add_argument("--top", type=int, default=DEFAULT_TOP, help="pilots to show")
+
+    args = parser.parse_args(argv)
+    if np is None:
+        print("[Error] The analytics reports need NumPy. Install it with: pip install numpy")
+        return 1
+    if not os.path.exists(args.db):
+        print(f"[Error] Database '{args.db}' not found. Run 'python db_manager.py' first.")
+        return 1
+    for value in (args.date_from, args.date_to):
+        if value is not None and not is_valid_date(value):
+            print(f"[Error] Invalid date '{value}'. Please use a real date as YYYY-MM-DD.")
+            return 1
+    for name in ("window", "last", "top", "months"):
+        value = getattr(args, name, None)
+        if value is not None and value < 1:
+            print(f"[Error] --{name} must be at least 1.")
+            return 1
+    options = {name: value for name, value in vars(args).items() if name not in ("db", "command")}
+
+    report, column = REPORTS[args.command]
+    conn = open_connection(args.db)
+    try:
+        start = time.perf_counter()
+        _, days = flight_pair(conn, column, args.date_from, args.date_to)
+        loaded = time.perf_counter()
+        headers, rows = report(conn, **options)
+        done = time.perf_counter()
+    finally:
+        conn.close()
+    print_table(headers, rows)
+    print(f"\n{len(days):,} flights loaded in {loaded - start:.2f}s, report computed in {done - loaded:.2f}s.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,389 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import signal
+import sqlite3
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from connection import DB_FILE, close_connections, configure
+from loaders import PAGE_SIZE, SUMMARY_QUERIES
+from service import (
+    DestinationInUseError,
+    DuplicateError,
+    FlightService,
+    NotFoundError,
+    ScheduleConflictError,
+    ServiceError,
+    ValidationError,
+)
+from tracing import operation
+from validation import epoch_day, is_valid_date
+
+# Local HTTP/JSON API over FlightService, using only the standard library.
+#
+# asyncio handles the sockets and HTTP parsing (HTTP/1.1 with keep-alive);
+# every database call runs on a bounded ThreadPoolExecutor. Each worker
+# thread has its own connection (connection.get_connection), so under WAL
+# the readers run in parallel and never block the event loop. When more
+# than --max-pending requests are waiting for a worker, new ones get 503.
+#
+# Endpoints (all responses are JSON):
+#   GET  /health
+#   GET  /flights?city=&status=&date=&date_from=&date_to=&mode=&date_mode=&after=&limit=&history=
+#   GET  /flights/search?q=&limit=
+#   GET  /flights/<id>
+#   PUT  /flights/<id>/pilot          {"pilot_id": 3}
+#   POST /assignments                 [{"flight_id": 1, "pilot_id": 3}, ...]
+#        (409 if a pilot would get overlapping duties or too little rest)
+#   GET  /pilots?q=
+#   GET  /pilots/<id>/schedule
+#   GET  /summaries
+#   GET  /summaries/<destinations|pilots|status>
+#
+# /flights pages are keyset pages: pass the "next" value of one response
+# as ?after= to get the following page.
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_WORKERS = 8
+DEFAULT_MAX_PENDING = 256
+MAX_PAGE_SIZE = 500
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 4 * 1024 * 1024
+
+FLIGHT_FIELDS = ("flight_id", "flight_num", "departure_date", "status", "dest_id", "city", "pilot_id", "pilot_name",
+                 "departure_time", "arrival_time")
+
+_ERROR_STATUS = {
+    ValidationError: HTTPStatus.BAD_REQUEST,
+    NotFoundError: HTTPStatus.NOT_FOUND,
+    DuplicateError: HTTPStatus.CONFLICT,
+    DestinationInUseError: HTTPStatus.CONFLICT,
+    ScheduleConflictError: HTTPStatus.CONFLICT,
+}
+
+logger = logging.getLogger("airline.api")
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def flight_to_dict(row):
+    return dict(zip(FLIGHT_FIELDS, row))
+
+
+def _param(query, name, default=None):
+    values = query.get(name)
+    return values[0] if values else default
+
+
+def _int_param(query, name, default):
+    value = _param(query, name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"'{name}' must be an integer.") from None
+
+
+def _after_key(value):
+    """Parse an ?after= cursor ('YYYY-MM-DD,flight_id') into a flight_key()."""
+    if value is None:
+        return None
+    date, _, flight_id = value.partition(",")
+    if not flight_id.isdigit() or not is_valid_date(date):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "'after' must look like 'YYYY-MM-DD,flight_id'.")
+    return (epoch_day(date), int(flight_id))
+
+
+# --- Handlers: (service, path match, query, body) -> JSON-able result --- #
+# They run on the worker threads, never on the event loop.
+
+def health(service, match, query, body):
+    return {"status": "ok"}
+
+
+def list_flights(service, match, query, body):
+    limit = min(max(_int_param(query, "limit", PAGE_SIZE), 1), MAX_PAGE_SIZE)
+    mode = _param(query, "mode", "prefix")
+    date_mode = _param(query, "date_mode", "exact")
+    if mode not in ("exact", "prefix", "contains") or date_mode not in ("exact", "contains"):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "mode must be exact, prefix or contains; date_mode exact or contains.")
+    rows, has_more = service.query_flights(
+        city=_param(query, "city"),
+        status=_param(query, "status"),
+        departure_date=_param(query, "date"),
+        date_from=_param(query, "date_from"),
+        date_to=_param(query, "date_to"),
+        mode=mode,
+        date_mode=date_mode,
+        after=_after_key(_param(query, "after")),
+        page_size=limit,
+        include_history=_param(query, "history", "0") in ("1", "true"),
+    )
+    next_key = f"{rows[-1][2]},{rows[-1][0]}" if rows and has_more else None
+    return {"flights": [flight_to_dict(row) for row in rows], "has_more": has_more, "next": next_key}
+
+
+def search_flights(service, match, query, body):
+    text = _param(query, "q", "")
+    limit = min(max(_int_param(query, "limit", 50), 1), MAX_PAGE_SIZE)
+    return {"flights": [flight_to_dict(row) for row in service.search_flights(text, limit)]}
+
+
+def get_flight(service, match, query, body):
+    row = service.get_flight(int(match["flight_id"]))
+    if row is None:
+        raise HTTPError(HTTPStatus.NOT_FOUND, f"Flight ID {match['flight_id']} not found.")
+    return flight_to_dict(row)
+
+
+def assign_pilot(service, match, query, body):
+    if not isinstance(body, dict) or not isinstance(body.get("pilot_id"), int):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, 'Body must be {"pilot_id": <int>}.')
+    flight_id = int(match["flight_id"])
+    service.assign_pilot(flight_id, body["pilot_id"])
+    return flight_to_dict(service.get_flight(flight_id))
+
+
+def assign_pilots(service, match, query, body):
+    if not isinstance(body, list) or not all(
+            isinstance(item, dict) and isinstance(item.get("flight_id"), int) and isinstance(item.get("pilot_id"), int)
+            for item in body):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, 'Body must be a list of {"flight_id": <int>, "pilot_id": <int>}.')
+    service.assign_pilots([(item["flight_id"], item["pilot_id"]) for item in body])
+    return {"assigned": len(body)}
+
+
+def list_pilots(service, match, query, body):
+    text = _param(query, "q")
+    rows = service.search_pilots(text) if text else service.list_pilots()
+    return {"pilots": [{"pilot_id": p_id, "name": name, "license_num": lic} for p_id, name, lic in rows]}
+
+
+def pilot_schedule(service, match, query, body):
+    pilot_id = int(match["pilot_id"])
+    if not service.pilot_exists(pilot_id):
+        raise HTTPError(HTTPStatus.NOT_FOUND, f"Pilot ID {pilot_id} not found.")
+    return {
+        "pilot_id": pilot_id,
+        "flights": [{"flight_num": f_num, "departure_date": date, "city": city}
+                    for f_num, date, city in service.pilot_schedule(pilot_id)],
+    }
+
+
+def _summary_rows(rows):
+    return [{"label": label, "flights": count} for label, count in rows]
+
+
+def all_summaries(service, match, query, body):
+    return {name: _summary_rows(rows) for name, rows in service.summaries().items()}
+
+
+def one_summary(service, match, query, body):
+    name = match["name"]
+    if name not in SUMMARY_QUERIES:
+        raise HTTPError(HTTPStatus.NOT_FOUND, f"Unknown summary '{name}'. Use {', '.join(SUMMARY_QUERIES)}.")
+    return _summary_rows(service.summary(name))
+
+
+# (method, path pattern, handler); the first match wins
+ROUTES = [
+    ("GET", r"/health", health),
+    ("GET", r"/flights", list_flights),
+    ("GET", r"/flights/search", search_flights),
+    ("GET", r"/flights/(?P<flight_id>\d+)", get_flight),
+    ("PUT", r"/flights/(?P<flight_id>\d+)/pilot", assign_pilot),
+    ("POST", r"/assignments", assign_pilots),
+    ("GET", r"/pilots", list_pilots),
+    ("GET", r"/pilots/(?P<pilot_id>\d+)/schedule", pilot_schedule),
+    ("GET", r"/summaries", all_summaries),
+    ("GET", r"/summaries/(?P<name>\w+)", one_summary),
+]
+_COMPILED_ROUTES = [(method, re.compile(pattern + r"/?\Z"), handler) for method, pattern, handler in ROUTES]
+
+
+def resolve(method, path):
+    """Return (handler, match) for a request, or raise HTTPError 404/405."""
+    allowed = []
+    for route_method, pattern, handler in _COMPILED_ROUTES:
+        match = pattern.match(path)
+        if match:
+            if route_method == method:
+                return handler, match
+            allowed.append(route_method)
+    if allowed:
+        raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"Use {' or '.join(allowed)} for {path}.")
+    raise HTTPError(HTTPStatus.NOT_FOUND, f"No such endpoint: {path}")
+
+
+def call_handler(handler, match, query, body):
+    """Run on a worker thread: map service errors to HTTP statuses, and any
+    other error to a logged 500."""
+    try:
+        with operation(f"api:{handler.__name__}"):
+            return HTTPStatus.OK, handler(FlightService(actor="api"), match, query, body)
+    except HTTPError as e:
+        return e.status, {"error": str(e)}
+    except ServiceError as e:
+        status = _ERROR_STATUS.get(type(e), HTTPStatus.BAD_REQUEST)
+        result = {"error": str(e)}
+        if e.index is not None:
+            result["index"] = e.index
+        return status, result
+    except sqlite3.Error as e:
+        return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"Database error: {e}"}
+    except Exception:
+        # A bug, not a bad request: keep the traceback here, not in the response
+        logger.exception("Unhandled error in %s", handler.__name__)
+        return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error"}
+
+
+class APIServer:
+    def __init__(self, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING):
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db")
+        self.max_pending = max_pending
+        self.pending = 0
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        try:
+            handler, match = resolve(method, url.path)
+        except HTTPError as e:
+            return e.status, {"error": str(e)}
+        if self.pending >= self.max_pending:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Server busy, try again."}
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, call_handler, handler, match.groupdict(),
+                                              parse_qs(url.query), body)
+        finally:
+            self.pending -= 1
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    return
+                except asyncio.LimitOverrunError:
+                    await self.respond(writer, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                                       {"error": "Headers too large."}, keep_alive=False)
+                    return
+
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = request_line.split(" ")
+                except ValueError:
+                    await self.respond(writer, HTTPStatus.BAD_REQUEST, {"error": "Bad request line."}, keep_alive=False)
+                    return
+                headers = {}
+                for line in header_lines:
+                    if line:
+                        name, _, value = line.partition(":")
+                        headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                length = headers.get("content-length", "0")
+                if not length.isdigit():
+                    await self.respond(writer, HTTPStatus.BAD_REQUEST, {"error": "Bad Content-Length."},
+                                       keep_alive=False)
+                    return
+                length = int(length)
+                if length > MAX_BODY_BYTES:
+                    await self.respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                       {"error": "Body too large."}, keep_alive=False)
+                    return
+                raw_body = await reader.readexactly(length) if length else b""
+
+                body = None
+                if raw_body:
+                    try:
+                        body = json.loads(raw_body)
+                    except ValueError:
+                        await self.respond(writer, HTTPStatus.BAD_REQUEST, {"error": "Body is not valid JSON."},
+                                           keep_alive)
+                        continue
+
+                status, result = await self.dispatch(method, target, body)
+                await self.respond(writer, status, result, keep_alive)
+                if not keep_alive:
+                    return
+        except (ConnectionResetError, BrokenPipeError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def respond(writer, status, result, keep_alive=True):
+        payload = json.dumps(result, separators=(",", ":")).encode("utf-8")
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + payload)
+        await writer.drain()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Serve until SIGINT or SIGTERM."""
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):
+                # Windows: Ctrl+C still raises KeyboardInterrupt
+                pass
+
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_HEADER_BYTES)
+        print(f"Serving flights API on http://{host}:{port} ({self.workers} DB workers)")
+        async with server:
+            await stop.wait()
+        print("Shutting down.")
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        close_connections()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the flight operations as a local HTTP/JSON API.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="database worker threads")
+    parser.add_argument("--max-pending", type=int, default=DEFAULT_MAX_PENDING,
+                        help="requests allowed to wait for a worker before answering 503")
+    parser.add_argument("--db", default=DB_FILE, help="database file")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"[Error] Database '{args.db}' not found. Run 'python db_manager.py' first.")
+        return 1
+    configure(args.db)
+
+    server = APIServer(args.workers, args.max_pending)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+import os
+import sys
+import time
+
+from audit import NOW, default_actor
+from connection import DB_FILE, open_connection
+from refcache import database_key
+from validation import day_to_date, epoch_day, is_valid_date
+
+# Hot/cold split of the flights: past flights move to a history database.
+#
+# Flights departing before a cutoff are moved to <name>_history.db next to
+# the live database, so the live Flights table (and every listing, filter
+# and full-table report over it) only grows with the flights still in
+# operation. The history file has the same Flights columns and date, status,
+# destination and pilot indexes; it is ATTACHed as "history" only when asked
+# for (query_flights(include_history=True), the menu's "include archived
+# flights" question, the API's ?history=1).
+#
+# Flights are moved in batches of ARCHIVE_BATCH_SIZE, each in two
+# transactions: the batch is copied into history.Flights and listed in
+# history.ArchivePending, then deleted from the live table (with one
+# 'archive' change log entry per flight) and the list cleared. With WAL,
+# one transaction over two files is only atomic per file, so a crash could
+# otherwise lose flights; this way it can only leave the last batch in
+# both, and the next run finishes it before starting a new one.
+#
+# Archived flights keep their flight_id (AUTOINCREMENT ids are never
+# reused) and their pilot and destination ids, but the live delete policies
+# no longer apply to them, and their flight numbers become free in the live
+# table. The summary counts, the keyword search and the analytics reports
+# cover the live table only.
+#
+#     python archive.py run --before 2026-01-01
+#     python archive.py run --keep-days 365 --vacuum
+#     python archive.py info
+
+SCHEMA = "history"
+ARCHIVE_BATCH_SIZE = 50000
+FLIGHT_COLUMNS = "flight_id, flight_num, departure_day, status_id, pilot_id, dest_id, departure_time, arrival_time"
+
+HISTORY_TABLES = [
+    """CREATE TABLE IF NOT EXISTS history.Flights (
+           flight_id INTEGER PRIMARY KEY,
+           flight_num TEXT NOT NULL,
+           departure_day INTEGER NOT NULL,
+           status_id INTEGER NOT NULL,
+           pilot_id INTEGER,
+           dest_id INTEGER,
+           departure_time TEXT,
+           arrival_time TEXT,
+           archived_at TEXT NOT NULL DEFAULT (datetime('now')),
+           departure_date TEXT GENERATED ALWAYS AS (date(departure_day + 2440587.5)) VIRTUAL
+       )""",
+    # Named like their live counterparts, so the same queries use them
+    "CREATE INDEX IF NOT EXISTS history.idx_flights_departure ON Flights (departure_day)",
+    "CREATE INDEX IF NOT EXISTS history.idx_flights_status ON Flights (status_id, departure_day)",
+    "CREATE INDEX IF NOT EXISTS history.idx_flights_dest ON Flights (dest_id, departure_day)",
+    "CREATE INDEX IF NOT EXISTS history.idx_flights_pilot ON Flights (pilot_id, departure_day, flight_num, dest_id)",
+    "CREATE INDEX IF NOT EXISTS history.idx_flights_flight_num ON Flights (flight_num)",
+    # Flights of the batch in progress: copied, not yet deleted from the live table
+    "CREATE TABLE IF NOT EXISTS history.ArchivePending (flight_id INTEGER PRIMARY KEY)",
+]
+
+
+def history_file(db_file):
+    """The history database that goes with db_file: airline_data.db -> airline_data_history.db."""
+    root, ext = os.path.splitext(db_file)
+    return f"{root}_history{ext or '.db'}"
+
+
+def is_attached(conn):
+    return any(name == SCHEMA for _, name, _ in conn.execute("PRAGMA database_list"))
+
+
+def attach(conn, path=None, create=False):
+    """ATTACH the history database as "history", creating it (and its tables)
+    when create is set. Returns False, attaching nothing, when there is no
+    history file yet and create is not set, or for an in-memory database.
+    Must be called outside a transaction.
+    """
+    if is_attached(conn):
+        return True
+    if path is None:
+        main_file = database_key(conn)
+        if main_file is None:
+            return False
+        path = history_file(main_file)
+    if not create and not os.path.exists(path):
+        return False
+    conn.execute(f"ATTACH DATABASE ? AS {SCHEMA}", (path,))
+    if create:
+        conn.execute(f"PRAGMA {SCHEMA}.journal_mode = WAL")
+        with conn:
+            for statement in HISTORY_TABLES:
+                conn.execute(statement)
+    return True
+
+
+def _remove_pending(conn, actor):
+    """Delete the flights listed in history.ArchivePending from the live table,
+    logging each, then clear the list. Returns the number deleted.
+    """
+    with conn:
+        conn.execute(f"""INSERT INTO AuditLog (changed_at, actor, entity, entity_id, action, old_values, new_values)
+                         SELECT {NOW}, ?, 'flight', flight_id, 'archive', NULL, NULL
+                         FROM main.Flights
+                         WHERE flight_id IN (SELECT flight_id FROM history.ArchivePending)""", (actor,))
+        removed = conn.execute("""DELETE FROM main.Flights
+                                  WHERE flight_id IN (SELECT flight_id FROM history.ArchivePending)""").rowcount
+    with conn:
+        conn.execute("DELETE FROM history.ArchivePending")
+    return removed
+
+
+def _copy_batch(conn, before_day, batch_size):
+    """Copy up to batch_size of the earliest flights departing before
+    before_day into history.Flights and list them as pending. Returns the count.
+    """
+    with conn:
+        conn.execute("""INSERT INTO history.ArchivePending (flight_id)
+                        SELECT flight_id FROM main.Flights
+                        WHERE departure_day < ?
+                        ORDER BY departure_day LIMIT ?""", (before_day, batch_size))
+        return conn.execute(f"""INSERT OR REPLACE INTO history.Flights ({FLIGHT_COLUMNS})
+                                SELECT {FLIGHT_COLUMNS} FROM main.Flights
+                                WHERE flight_id IN (SELECT flight_id FROM history.ArchivePending)""").rowcount
+
+
+def archive_flights(conn, before, batch_size=ARCHIVE_BATCH_SIZE, actor=None, path=None, progress=None):
+    """Move every flight departing before the date before ('YYYY-MM-DD') to the
+    history database, batch_size flights per batch. progress(moved) is called
+    after each batch. Returns the number of flights moved.
+    """
+    before_day = epoch_day(before)
+    actor = actor or default_actor()
+    attach(conn, path, create=True)
+    # Finish a batch an interrupted run left in both tables
+    moved = _remove_pending(conn, actor)
+    while True:
+        if not _copy_batch(conn, before_day, batch_size):
+            return moved
+        moved += _remove_pending(conn, actor)
+        if progress:
+            progress(moved)
+
+
+def summary(conn, path=None):
+    """{"live": (flights, first date, last date), "history": (...)}; history is
+    None when nothing has been archived.
+    """
+    def flights(schema):
+        count, first, last = conn.execute(f"""SELECT COUNT(*),
+                                                     (SELECT MIN(departure_day) FROM {schema}.Flights),
+                                                     (SELECT MAX(departure_day) FROM {schema}.Flights)
+                                              FROM {schema}.Flights""").fetchone()
+        return (count, day_to_date(first) if first is not None else None,
+                day_to_date(last) if last is not None else None)
+
+    return {"live": flights("main"), "history": flights(SCHEMA) if attach(conn, path) else None}
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Move past flights to the history database.")
+    parser.add_argument("--db", default=DB_FILE, help="database file")
+    parser.add_argument("--history", help="history database file (default: <db>_history.db)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="archive every flight departing before a cutoff")
+    cutoff = run.add_mutually_exclusive_group(required=True)
+    cutoff.add_argument("--before", help="first departure date to keep (YYYY-MM-DD)")
+    cutoff.add_argument("--keep-days", type=int, help="keep flights from this many days ago onwards")
+    run.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE, help="flights per transaction")
+    run.add_argument("--vacuum", action="store_true", help="return the freed space to the file system")
+
+    commands.add_parser("info", help="flights and date ranges in the live and history databases")
+
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.db):
+        print(f"[Error] Database '{args.db}' not found. Run 'python db_manager.py' first.")
+        return 1
+    path = args.history or history_file(os.path.abspath(args.db))
+
+    conn = open_connection(args.db)
+    try:
+        if args.command == "info":
+            for name, counts in summary(conn, path).items():
+                if counts is None:
+                    print(f"{name:<8} nothing archived yet ({path})")
+                else:
+                    flights, first, last = counts
+                    print(f"{name:<8} {flights:>12,} flights  {first or '-'} .. {last or '-'}")
+            return 0
+
+        if args.keep_days is not None:
+            if args.keep_days < 0:
+                print("[Error] --keep-days cannot be negative.")
+                return 1
+            before = day_to_date(epoch_day(time.strftime("%Y-%m-%d")) - args.keep_days)
+        else:
+            before = args.before
+            if not is_valid_date(before):
+                print(f"[Error] Invalid date '{before}'. Please use a real date as YYYY-MM-DD.")
+                return 1
+        if before > time.strftime("%Y-%m-%d"):
+            print("[Error] Only flights that have already departed can be archived; choose a cutoff up to today.")
+            return 1
+        if args.batch_size < 1:
+            print("[Error] --batch-size must be at least 1.")
+            return 1
+
+        start = time.perf_counter()
+
+        def progress(moved):
+            print(f"  {moved:,} flights archived ({moved / (time.perf_counter() - start):,.0f}/sec)", end="\r")
+
+        moved = archive_flights(conn, before, args.batch_size, path=path, progress=progress)
+        if moved:
+            print()
+        print(f"Archived {moved:,} flights departing before {before} to {path} "
+              f"in {time.perf_counter() - start:.1f}s.")
+        if args.vacuum:
+            conn.execute("VACUUM main")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
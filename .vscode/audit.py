@@ -0,0 +1,173 @@
+import getpass
+import os
+import sys
+
+from connection import DB_FILE, open_connection
+
+# Append-only change log for Flights and Destinations (migration 7).
+#
+# FlightService writes one AuditLog row per changed entity: who made the
+# change, the action (insert, update, delete), and the old and new values
+# of the changed fields as JSON objects. The rows are added with
+# executemany() or INSERT ... SELECT in the same transaction as the change,
+# so a change and its log entry commit or roll back together.
+#
+# Two indexes keep the common questions to an index range however long the
+# log grows: (entity, entity_id, audit_id) for the history of one flight
+# and (changed_at) for everything in a time window. A trigger rejects
+# UPDATEs; rows only leave the log through prune().
+#
+#     python audit.py history --flight FL-123
+#     python audit.py recent --hours 1
+#     python audit.py prune --keep-days 365
+
+# changed_at format, matching SQLite's datetime('now') (UTC)
+NOW = "datetime('now')"
+PRUNE_BATCH_SIZE = 50000
+DEFAULT_LIMIT = 100
+
+AUDIT_INSERT = f"""INSERT INTO AuditLog (changed_at, actor, entity, entity_id, action, old_values, new_values)
+                   VALUES ({NOW}, ?, ?, ?, ?, ?, ?)"""
+# Every column of a Flights row as a JSON object, for insert and delete entries
+FLIGHT_VALUES_JSON = """json_object('flight_num', flight_num, 'departure_date', departure_date,
+                                    'status', (SELECT name FROM FlightStatus s WHERE s.status_id = Flights.status_id),
+                                    'pilot_id', pilot_id, 'dest_id', dest_id,
+                                    'departure_time', departure_time, 'arrival_time', arrival_time)"""
+# Set-based insert entries for every flight with flight_id > ?, used after
+# bulk inserts: parameters are (actor, last_flight_id)
+AUDIT_BATCH_INSERT = f"""INSERT INTO AuditLog (changed_at, actor, entity, entity_id, action, old_values, new_values)
+                         SELECT {NOW}, ?, 'flight', flight_id, 'insert', NULL, {FLIGHT_VALUES_JSON}
+                         FROM Flights WHERE flight_id > ?"""
+
+
+def default_actor():
+    """The OS user name, or 'unknown' where it cannot be determined."""
+    try:
+        return getpass.getuser()
+    except (KeyError, OSError):
+        return "unknown"
+
+
+def entry(actor, entity, entity_id, action, old=None, new=None):
+    """One AUDIT_INSERT row. old/new are dicts of the changed fields, stored
+    as compact JSON like the json_object() values of the set-based inserts.
+    """
+    import json  # loaded on first use to keep it off the menu's start-up path
+    return (actor, entity, entity_id, action,
+            json.dumps(old, separators=(",", ":")) if old is not None else None,
+            json.dumps(new, separators=(",", ":")) if new is not None else None)
+
+
+def record(conn, entries):
+    """Append entry() rows; call inside the transaction that made the changes."""
+    conn.executemany(AUDIT_INSERT, entries)
+
+
+def changed_fields(old, new):
+    """(old, new) dicts holding only the fields whose value differs, or None if nothing changed."""
+    fields = [name for name in new if new[name] != old.get(name)]
+    if not fields:
+        return None
+    return {name: old.get(name) for name in fields}, {name: new[name] for name in fields}
+
+
+def history(conn, entity, entity_id, limit=DEFAULT_LIMIT):
+    """(audit_id, changed_at, actor, action, old_values, new_values) for one entity, newest first."""
+    return conn.execute("""SELECT audit_id, changed_at, actor, action, old_values, new_values
+                           FROM AuditLog
+                           WHERE entity = ? AND entity_id = ?
+                           ORDER BY audit_id DESC LIMIT ?""", (entity, entity_id, limit)).fetchall()
+
+
+def changes_between(conn, since, until=None, limit=DEFAULT_LIMIT):
+    """(audit_id, changed_at, actor, entity, entity_id, action, old_values, new_values)
+    changed in [since, until), newest first. Times are 'YYYY-MM-DD HH:MM:SS' UTC.
+    """
+    return conn.execute("""SELECT audit_id, changed_at, actor, entity, entity_id, action, old_values, new_values
+                           FROM AuditLog
+                           WHERE changed_at >= ? AND changed_at < COALESCE(?, '9999')
+                           ORDER BY changed_at DESC LIMIT ?""", (since, until, limit)).fetchall()
+
+
+def prune(conn, keep_days, batch_size=PRUNE_BATCH_SIZE):
+    """Delete log rows older than keep_days in batches of batch_size, one
+    transaction each, so writers are never blocked for long. Returns the count.
+    """
+    cutoff = conn.execute("SELECT datetime('now', ?)", (f"-{keep_days} days",)).fetchone()[0]
+    deleted = 0
+    while True:
+        with conn:
+            cursor = conn.execute("""DELETE FROM AuditLog WHERE audit_id IN (
+                                         SELECT audit_id FROM AuditLog WHERE changed_at < ?
+                                         ORDER BY changed_at LIMIT ?)""", (cutoff, batch_size))
+        deleted += cursor.rowcount
+        if cursor.rowcount < batch_size:
+            return deleted
+
+
+def print_entries(rows, with_entity):
+    if not rows:
+        print("No changes found.")
+        return
+    for row in rows:
+        if with_entity:
+            audit_id, changed_at, actor, entity, entity_id, action, old, new = row
+            subject = f"{entity} {entity_id} "
+        else:
+            audit_id, changed_at, actor, action, old, new = row
+            subject = ""
+        print(f"{changed_at} | {actor:<12} | {subject}{action}: {old or '-'} -> {new or '-'}")
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Query or prune the change log.")
+    parser.add_argument("--db", default=DB_FILE, help="database file")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="most entries to show")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    show = commands.add_parser("history", help="changes to one flight or destination")
+    target = show.add_mutually_exclusive_group(required=True)
+    target.add_argument("--flight", help="flight number (e.g. FL-123)")
+    target.add_argument("--destination", type=int, help="destination id")
+
+    recent = commands.add_parser("recent", help="all changes in a recent time window")
+    recent.add_argument("--hours", type=float, default=1.0)
+
+    prune_log = commands.add_parser("prune", help="delete entries older than a retention period")
+    prune_log.add_argument("--keep-days", type=int, required=True)
+    prune_log.add_argument("--vacuum", action="store_true", help="return the freed space to the file system")
+
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.db):
+        print(f"[Error] Database '{args.db}' not found. Run 'python db_manager.py' first.")
+        return 1
+
+    conn = open_connection(args.db)
+    try:
+        if args.command == "history":
+            if args.flight:
+                row = conn.execute("SELECT flight_id FROM Flights WHERE flight_num = ?", (args.flight,)).fetchone()
+                if row is None:
+                    print(f"[Error] Flight '{args.flight}' not found.")
+                    return 1
+                print_entries(history(conn, "flight", row[0], args.limit), with_entity=False)
+            else:
+                print_entries(history(conn, "destination", args.destination, args.limit), with_entity=False)
+        elif args.command == "recent":
+            since = conn.execute("SELECT datetime('now', ?)", (f"-{args.hours * 3600:.0f} seconds",)).fetchone()[0]
+            print_entries(changes_between(conn, since, limit=args.limit), with_entity=True)
+        else:
+            if args.keep_days < 0:
+                print("[Error] --keep-days cannot be negative.")
+                return 1
+            print(f"Deleted {prune(conn, args.keep_days):,} log entries older than {args.keep_days} days.")
+            if args.vacuum:
+                conn.execute("VACUUM")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+from connection import DB_FILE, open_connection
+from service import FlightService, ServiceError
+
+# Bulk crew auto-assignment for unassigned flights.
+#
+# Every flight departing in the date range with no pilot is given one, in a
+# single transaction. Pilots with the fewest flights are preferred, and the
+# duty rules from scheduling.py (no overlapping flights, no same-day double
+# booking of untimed flights, minimum rest) are respected; flights no pilot
+# is free for stay unassigned. --dry-run shows the plan without writing it.
+#
+#     python auto_assign.py --from 2026-06-01 --to 2026-08-31
+
+MAX_PRINTED_ASSIGNMENTS = 10
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Assign pilots to unassigned flights in a date range.")
+    parser.add_argument("--from", dest="date_from", required=True, help="first departure date (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="date_to", required=True, help="last departure date (YYYY-MM-DD)")
+    parser.add_argument("--dry-run", action="store_true", help="plan the assignments without saving them")
+    parser.add_argument("--db", default=DB_FILE, help="database file")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"[Error] Database '{args.db}' not found. Run 'python db_manager.py' first.")
+        return 1
+
+    conn = open_connection(args.db)
+    try:
+        began = time.perf_counter()
+        assignments, unassigned = FlightService(conn).auto_assign_pilots(args.date_from, args.date_to, args.dry_run)
+        elapsed = time.perf_counter() - began
+    except ServiceError as e:
+        print(f"[Error] {e}")
+        return 1
+    finally:
+        conn.close()
+
+    for f_id, p_id in assignments[:MAX_PRINTED_ASSIGNMENTS]:
+        print(f"Flight ID {f_id} -> Pilot ID {p_id}")
+    if len(assignments) > MAX_PRINTED_ASSIGNMENTS:
+        print(f"... and {len(assignments) - MAX_PRINTED_ASSIGNMENTS} more")
+
+    per_pilot = Counter(p_id for _, p_id in assignments)
+    print("\n--- Auto-assign Summary ---")
+    print(f"Assigned:      {len(assignments)}{' (dry run, nothing saved)' if args.dry_run else ''}")
+    print(f"Left open:     {unassigned}")
+    print(f"Pilots used:   {len(per_pilot)}")
+    if per_pilot:
+        print(f"Per pilot:     {min(per_pilot.values())}-{max(per_pilot.values())} flights")
+    print(f"Elapsed:       {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import argparse
+import os
+import sys
+
+from connection import DB_FILE, open_connection
+from service import FlightService, ServiceError
+
+# Mass status changes, e.g. delaying every flight to a hub hit by weather.
+#
+# "set" changes the status of every flight matching all the filters given
+# (airport, date range, current status, a file of flight numbers) with one
+# set-based UPDATE in one transaction, and prints a batch id. The previous
+# statuses are kept, so "rollback <batch_id>" undoes the batch.
+#
+#     python batch_status.py set Delayed --airport LHR --from 2026-05-10 --to 2026-05-10
+#     python batch_status.py set Cancelled --flights cancelled.txt
+#     python batch_status.py list
+#     python batch_status.py rollback 7
+
+
+def read_flight_numbers(path):
+    """One flight number per line; blank lines and lines starting with # are skipped."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+def set_main(service, args):
+    dest_id = None
+    if args.airport:
+        matches = [row[0] for row in service.list_destinations() if row[2].upper() == args.airport.upper()]
+        if not matches:
+            print(f"[Error] Airport code '{args.airport}' not found.")
+            return 1
+        dest_id = matches[0]
+    flight_nums = read_flight_numbers(args.flights) if args.flights else None
+
+    batch_id, affected = service.update_status_where(args.status, dest_id=dest_id, date_from=args.date_from,
+                                                     date_to=args.date_to, current_status=args.current_status,
+                                                     flight_nums=flight_nums)
+    print(f"[Success] {affected} flight(s) set to '{args.status}' in batch {batch_id}.")
+    if affected:
+        print(f"Undo with: python batch_status.py rollback {batch_id}")
+    return 0
+
+
+def rollback_main(service, args):
+    restored = service.rollback_status_batch(args.batch_id)
+    print(f"[Success] Batch {args.batch_id} rolled back: {restored} flight(s) restored.")
+    return 0
+
+
+def list_main(service, args):
+    batches = service.list_status_batches(args.limit)
+    if not batches:
+        print("No status batches yet.")
+        return 0
+    print(f"{'Batch':<6} | {'Created':<19} | {'Status':<12} | {'Flights':>7} | {'Rolled back':<19} | Filters")
+    print("-" * 100)
+    for batch_id, created_at, new_status, filters, affected, rolled_back_at in batches:
+        print(f"{batch_id:<6} | {created_at:<19} | {new_status:<12} | {affected:>7} | "
+              f"{rolled_back_at or '':<19} | {filters}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Change the status of many flights at once, with rollback.")
+    parser.add_argument("--db", default=DB_FILE, help="database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    set_status = commands.add_parser("set", help="set the status of every matching flight")
+    set_status.add_argument("status", help="new status (e.g. Delayed)")
+    set_status.add_argument("--airport", help="destination airport code")
+    set_status.add_argument("--from", dest="date_from", help="first departure date (YYYY-MM-DD)")
+    set_status.add_argument("--to", dest="date_to", help="last departure date (YYYY-MM-DD)")
+    set_status.add_argument("--current-status", help="only flights that currently have this status")
+    set_status.add_argument("--flights", help="file of flight numbers, one per line")
+
+    rollback = commands.add_parser("rollback", help="restore the statuses a batch replaced")
+    rollback.add_argument("batch_id", type=int)
+
+    batches = commands.add_parser("list", help="show recent batches")
+    batches.add_argument("--limit", type=int, default=20)
+
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.db):
+        print(f"[Error] Database '{args.db}' not found. Run 'python db_manager.py' first.")
+        return 1
+
+    handlers = {"set": set_main, "rollback": rollback_main, "list": list_main}
+    conn = open_connection(args.db)
+    try:
+        return handlers[args.command](FlightService(conn), args)
+    except ServiceError as e:
+        print(f"[Error] {e}")
+        return 1
+    except OSError as e:
+        print(f"[Error] Could not read the flight list: {e}")
+        return 1
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
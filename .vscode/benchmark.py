@@ -0,0 +1,506 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import tracing
+from connection import open_connection
+from loaders import departure_days, flight_key
+from service import FlightService, ScheduleConflictError, ServiceError
+from validation import day_to_date
+
+# Non-interactive benchmark of the query paths behind each CLI operation.
+#
+# Every operation makes the same FlightService call as its menu option in
+# menu.py, with inputs picked from the database by --seed so runs are
+# repeatable. Writes (update, assign, safe delete) run inside a transaction
+# that is rolled back, so the database is unchanged between runs and the
+# commit cost is not counted.
+#
+# Results are written as JSON (per operation: runs, min/median/p95/mean/max
+# in milliseconds and rows returned) with the git commit, Python and SQLite
+# versions and table sizes. Compare two result files with:
+#
+#     python benchmark.py compare before.json after.json
+#
+# --trace DIR runs with statement tracing on (tracing.py), so comparing a
+# traced run with a plain one shows the tracing overhead.
+#
+# "startup" times cold starts instead: fresh processes that open the menu,
+# show one report and exit, and a scripted tool run, against the bare
+# interpreter start for reference. It exits with status 1 when the menu's
+# median is over --budget-ms.
+#
+# "concurrency" checks that concurrent writers wait for each other instead
+# of failing: --threads threads, each with its own connection, make
+# committed service writes back to back on a temporary copy of the
+# database. A write the service rejects (e.g. a duty clash) is fine; any
+# database error ("database is locked") fails the check with status 1.
+#
+#     python benchmark.py startup airline_data.db
+#     python benchmark.py concurrency bench.db --threads 8 --calls 200
+
+DEFAULT_REPEAT = 20
+DEFAULT_WARMUP = 2
+DEFAULT_SEED = 42
+# A change is reported as a regression when its median grows by more than this
+REGRESSION_THRESHOLD = 0.20
+# ...and by at least this much, so jitter on sub-millisecond queries is ignored
+REGRESSION_MIN_MS = 0.1
+# How many pages the "deep page" operation walks forward
+DEEP_PAGES = 10
+STARTUP_RUNS = 20
+STARTUP_BUDGET_MS = 50.0
+CONCURRENT_THREADS = 8
+CONCURRENT_CALLS = 200
+# Flights and pilots the concurrent writers pick from
+CONCURRENT_SAMPLE = 500
+
+
+def pick_inputs(conn, seed):
+    """Choose realistic, repeatable inputs for the operations from the data itself."""
+    rng = random.Random(seed)
+
+    def pick(sql):
+        values = [row[0] for row in conn.execute(sql)]
+        return rng.choice(values) if values else None
+
+    city = pick("SELECT city FROM Destinations ORDER BY dest_id")
+    # The busiest destination and pilot are the worst cases for their filters
+    busy_dest = conn.execute("SELECT dest_id FROM FlightCountsByDestination ORDER BY flights DESC LIMIT 1").fetchone()
+    busy_pilot = conn.execute("SELECT pilot_id FROM FlightCountsByPilot ORDER BY flights DESC LIMIT 1").fetchone()
+    days = departure_days(conn)
+    first_date, last_date = (day_to_date(days[0]), day_to_date(days[-1])) if days else (None, None)
+    max_flight_id = conn.execute("SELECT COALESCE(MAX(flight_id), 0) FROM Flights").fetchone()[0]
+    # The first live id from a random point: ids have gaps once flights are deleted or archived
+    flight_id = conn.execute("SELECT MIN(flight_id) FROM Flights WHERE flight_id >= ?",
+                             (rng.randint(1, max_flight_id),)).fetchone()[0] if max_flight_id else None
+    pilot_name = pick("SELECT name FROM Pilots ORDER BY pilot_id")
+
+    date = pick("SELECT departure_date FROM Flights ORDER BY flight_id LIMIT 1000")
+    if first_date and last_date:
+        low = datetime.date.fromisoformat(first_date)
+        span = (datetime.date.fromisoformat(last_date) - low).days
+        range_from = low + datetime.timedelta(days=rng.randint(0, max(span - 7, 0)))
+        range_to = range_from + datetime.timedelta(days=6)
+    else:
+        range_from = range_to = None
+
+    return {
+        "city": city,
+        "city_prefix": city[:3] if city else None,
+        "status": "Delayed",
+        "date": date,
+        "date_from": range_from.isoformat() if range_from else None,
+        "date_to": range_to.isoformat() if range_to else None,
+        "date_contains": date[5:] if date else None,
+        "flight_id": flight_id,
+        "pilot_id": busy_pilot[0] if busy_pilot else None,
+        "dest_id": busy_dest[0] if busy_dest else None,
+        "pilot_search": pilot_name.split()[-1] if pilot_name else None,
+        "keyword": city[:4] if city else None,
+    }
+
+
+def _filter_page(options=None, **from_inputs):
+    """A filter search. from_inputs maps query_flights() arguments to keys of the inputs."""
+    def run(service, inputs):
+        arguments = {name: inputs[key] for name, key in from_inputs.items()}
+        rows, _ = service.query_flights(**arguments, **(options or {}))
+        return len(rows)
+    return run
+
+
+def deep_page(service, inputs):
+    """Walk DEEP_PAGES pages forward through View All Flights."""
+    rows, has_more = service.query_flights()
+    count = len(rows)
+    for _ in range(DEEP_PAGES - 1):
+        if not has_more:
+            break
+        rows, has_more = service.query_flights(after=flight_key(rows[-1]))
+        count += len(rows)
+    return count
+
+
+def all_summaries(service, inputs):
+    return sum(len(rows) for rows in service.summaries().values())
+
+
+def rolled_back(write):
+    """Run a write operation in a transaction that is always rolled back.
+
+    The service joins the open transaction, so nothing it does is committed.
+    """
+    def run(service, inputs):
+        service.conn.execute("BEGIN")
+        try:
+            return write(service, inputs)
+        finally:
+            service.conn.rollback()
+    return run
+
+
+def update_flight(service, inputs):
+    service.update_flight(inputs["flight_id"], status="Delayed", dest_id=inputs["dest_id"])
+    return 1
+
+
+def assign_pilot(service, inputs):
+    """Returns 1 if the assignment was accepted. The busiest pilot is often
+    already flying that day; a rejection runs the same duty checks.
+    """
+    try:
+        service.assign_pilot(inputs["flight_id"], inputs["pilot_id"])
+    except ScheduleConflictError:
+        return 0
+    return 1
+
+
+def safe_delete_destination(service, inputs):
+    """Delete-anyway on the busiest destination: count, detach its flights, delete it."""
+    return service.delete_destination(inputs["dest_id"], force=True)
+
+
+# name -> function(service, inputs) returning the number of rows it produced
+OPERATIONS = {
+    "filter_city_exact": _filter_page({"mode": "exact"}, city="city"),
+    "filter_city_prefix": _filter_page({"mode": "prefix"}, city="city_prefix"),
+    "filter_city_contains": _filter_page({"mode": "contains"}, city="city_prefix"),
+    "filter_status_exact": _filter_page({"mode": "exact"}, status="status"),
+    "filter_date_exact": _filter_page(departure_date="date"),
+    "filter_date_range": _filter_page(date_from="date_from", date_to="date_to"),
+    "filter_date_contains": _filter_page({"date_mode": "contains"}, departure_date="date_contains"),
+    "view_all_first_page": _filter_page(),
+    "view_all_deep_page": deep_page,
+    "keyword_search": lambda service, inputs: len(service.search_flights(inputs["keyword"])),
+    "pilot_search": lambda service, inputs: len(service.search_pilots(inputs["pilot_search"])),
+    "pilot_schedule": lambda service, inputs: len(service.pilot_schedule(inputs["pilot_id"])),
+    "destinations_with_counts": lambda service, inputs: len(service.list_destinations_with_counts()),
+    "summaries": all_summaries,
+    "update_flight": rolled_back(update_flight),
+    "assign_pilot": rolled_back(assign_pilot),
+    "safe_delete_destination": rolled_back(safe_delete_destination),
+}
+
+
+def concurrent_assign_pilot(service, rng, inputs):
+    service.assign_pilot(rng.choice(inputs["flight_ids"]), rng.choice(inputs["pilot_ids"]))
+
+
+def concurrent_update_flight(service, rng, inputs):
+    service.update_flight(rng.choice(inputs["flight_ids"]), status=rng.choice(("Scheduled", "On Time", "Delayed")))
+
+
+def concurrent_auto_assign(service, rng, inputs):
+    date = rng.choice(inputs["dates"])
+    service.auto_assign_pilots(date, date)
+
+
+def concurrent_status_batch(service, rng, inputs):
+    """A status batch over a few flights, then its rollback."""
+    batch_id, _ = service.update_status_where("Delayed", flight_ids=rng.sample(inputs["flight_ids"], 5))
+    service.rollback_status_batch(batch_id)
+
+
+# name -> function(service, rng, inputs) making one committed write, for "concurrency"
+CONCURRENT_WRITES = {
+    "assign_pilot": concurrent_assign_pilot,
+    "update_flight": concurrent_update_flight,
+    "auto_assign_pilots": concurrent_auto_assign,
+    "status_batch_rollback": concurrent_status_batch,
+}
+
+
+def run_concurrent_writes(db, threads=CONCURRENT_THREADS, calls=CONCURRENT_CALLS, seed=DEFAULT_SEED):
+    """Run calls CONCURRENT_WRITES calls (picked at random) on each of threads
+    threads against a copy of db. Returns ({name: [calls, rejected, failed]},
+    first database error message or None, seconds).
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        copy = os.path.join(directory, "concurrency.db")
+        source = open_connection(db)
+        target = open_connection(copy)
+        try:
+            source.backup(target)
+            rng = random.Random(seed)
+            flight_ids = [row[0] for row in target.execute("SELECT flight_id FROM Flights ORDER BY flight_id")]
+            pilot_ids = [row[0] for row in target.execute("SELECT pilot_id FROM Pilots ORDER BY pilot_id")]
+            dates = [day_to_date(day) for day in departure_days(target)]
+        finally:
+            source.close()
+            target.close()
+        inputs = {"flight_ids": rng.sample(flight_ids, min(len(flight_ids), CONCURRENT_SAMPLE)),
+                  "pilot_ids": rng.sample(pilot_ids, min(len(pilot_ids), CONCURRENT_SAMPLE)),
+                  "dates": dates}
+        counts = {name: [0, 0, 0] for name in CONCURRENT_WRITES}
+        errors = []
+        lock = threading.Lock()
+        # Every thread starts writing at the same moment
+        barrier = threading.Barrier(threads)
+
+        def writer(thread_seed):
+            thread_rng = random.Random(thread_seed)
+            service = FlightService(open_connection(copy))
+            try:
+                barrier.wait()
+                for _ in range(calls):
+                    name = thread_rng.choice(list(CONCURRENT_WRITES))
+                    outcome = 0
+                    try:
+                        CONCURRENT_WRITES[name](service, thread_rng, inputs)
+                    except ServiceError:
+                        outcome = 1
+                    except sqlite3.Error as e:
+                        outcome = 2
+                        with lock:
+                            errors.append(str(e))
+                    with lock:
+                        counts[name][0] += 1
+                        if outcome:
+                            counts[name][outcome] += 1
+            finally:
+                service.conn.close()
+
+        workers = [threading.Thread(target=writer, args=(seed + i,)) for i in range(threads)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return counts, errors[0] if errors else None, time.perf_counter() - start
+
+
+def time_operation(service, operation, inputs, repeat=DEFAULT_REPEAT, warmup=DEFAULT_WARMUP):
+    """Run one operation warmup + repeat times and summarise the timed runs (ms)."""
+    for _ in range(warmup):
+        operation(service, inputs)
+    timings = []
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = operation(service, inputs)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "runs": repeat,
+        "rows": rows,
+        "min_ms": round(timings[0], 4),
+        "median_ms": round(statistics.median(timings), 4),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 4),
+        "mean_ms": round(statistics.fmean(timings), 4),
+        "max_ms": round(timings[-1], 4),
+    }
+
+
+def git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def table_sizes(conn):
+    return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("Pilots", "Destinations", "Flights")}
+
+
+def run_benchmarks(conn, names=None, repeat=DEFAULT_REPEAT, warmup=DEFAULT_WARMUP, seed=DEFAULT_SEED):
+    """Time the named operations (default: all) and return the JSON-ready result."""
+    inputs = pick_inputs(conn, seed)
+    service = FlightService(conn)
+    results = {}
+    for name in names or OPERATIONS:
+        with tracing.operation(name):
+            results[name] = time_operation(service, OPERATIONS[name], inputs, repeat, warmup)
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "seed": seed,
+        "tables": table_sizes(conn),
+        "inputs": inputs,
+        "operations": results,
+    }
+
+
+def compare_results(before, after, threshold=REGRESSION_THRESHOLD):
+    """Yield (name, before_ms, after_ms, ratio, regressed) for operations in both runs."""
+    for name, new in after["operations"].items():
+        old = before["operations"].get(name)
+        if old is None:
+            continue
+        ratio = new["median_ms"] / old["median_ms"] if old["median_ms"] else float("inf")
+        regressed = ratio > 1 + threshold and new["median_ms"] - old["median_ms"] > REGRESSION_MIN_MS
+        yield name, old["median_ms"], new["median_ms"], ratio, regressed
+
+
+def print_results(result):
+    print(f"\n{'Operation':<26} | {'Median ms':>10} | {'p95 ms':>10} | {'Rows':>6}")
+    print("-" * 62)
+    for name, timing in result["operations"].items():
+        print(f"{name:<26} | {timing['median_ms']:>10.3f} | {timing['p95_ms']:>10.3f} | {timing['rows']:>6}")
+
+
+def time_startup(db, runs=STARTUP_RUNS):
+    """{name: (median_ms, p95_ms)} wall time of fresh processes with
+    AIRLINE_DB=db: the bare interpreter, the menu showing the summary report
+    (its first queries) and exiting, and a scripted batch_status.py listing.
+    """
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    commands = {
+        "interpreter": ([sys.executable, "-c", "pass"], ""),
+        "menu": ([sys.executable, os.path.join(script_dir, "main.py")], "7\n1\n8\n"),
+        "batch_status list": ([sys.executable, os.path.join(script_dir, "batch_status.py"), "list"], ""),
+    }
+    # Passed the way a plain "python main.py" launch finds it
+    env = dict(os.environ, AIRLINE_DB=db)
+    timings = {name: [] for name in commands}
+    # Interleaved so a busy spell on the machine affects every command alike
+    for _ in range(runs + 1):
+        for name, (command, stdin) in commands.items():
+            start = time.perf_counter()
+            subprocess.run(command, input=stdin, capture_output=True, text=True, check=True, env=env)
+            timings[name].append((time.perf_counter() - start) * 1000)
+    results = {}
+    for name, values in timings.items():
+        # The first round writes any missing bytecode caches, so it is not counted
+        values = sorted(values[1:])
+        results[name] = (statistics.median(values), values[min(len(values) - 1, int(len(values) * 0.95))])
+    return results
+
+
+def startup_main(args):
+    if not os.path.exists(args.db):
+        print(f"[Error] Database '{args.db}' not found. Run 'python db_manager.py' first.")
+        return 1
+    results = time_startup(os.path.abspath(args.db), args.runs)
+    print(f"\n{'Cold start':<20} | {'Median ms':>10} | {'p95 ms':>10}")
+    print("-" * 46)
+    for name, (median, p95) in results.items():
+        print(f"{name:<20} | {median:>10.1f} | {p95:>10.1f}")
+    median = results["menu"][0]
+    if median > args.budget_ms:
+        print(f"\n[Regression] Menu start-up median {median:.1f} ms is over the {args.budget_ms:g} ms budget.")
+        return 1
+    return 0
+
+
+def concurrency_main(args):
+    if not os.path.exists(args.db):
+        print(f"[Error] Database '{args.db}' not found. Create one with 'python generate_data.py {args.db}'.")
+        return 1
+    if args.threads < 1 or args.calls < 1:
+        print("[Error] --threads and --calls must be at least 1.")
+        return 1
+    counts, first_error, seconds = run_concurrent_writes(args.db, args.threads, args.calls, args.seed)
+    print(f"\n{'Write':<26} | {'Calls':>7} | {'Rejected':>8} | {'Failed':>7}")
+    print("-" * 58)
+    for name, (calls, rejected, failed) in counts.items():
+        print(f"{name:<26} | {calls:>7} | {rejected:>8} | {failed:>7}")
+    total = sum(calls for calls, _, _ in counts.values())
+    print(f"\n{total} writes from {args.threads} threads in {seconds:.2f}s ({total / seconds:,.0f}/sec).")
+    failed = sum(failed for _, _, failed in counts.values())
+    if failed:
+        print(f"\n[Regression] {failed} writes failed with a database error, e.g. '{first_error}'.")
+        return 1
+    return 0
+
+
+def compare_main(args):
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    print(f"Comparing {before.get('commit') or args.before} -> {after.get('commit') or args.after} (median ms)")
+    print(f"\n{'Operation':<26} | {'Before':>10} | {'After':>10} | {'Change':>8}")
+    print("-" * 64)
+    regressions = 0
+    for name, old, new, ratio, regressed in compare_results(before, after, args.threshold):
+        flag = "  [Regression]" if regressed else ""
+        print(f"{name:<26} | {old:>10.3f} | {new:>10.3f} | {(ratio - 1) * 100:>+7.1f}%{flag}")
+        regressions += regressed
+    return 1 if regressions else 0
+
+
+def run_main(args):
+    if not os.path.exists(args.db):
+        print(f"[Error] Database '{args.db}' not found. Create one with 'python generate_data.py {args.db}'.")
+        return 1
+    unknown = [name for name in args.only or [] if name not in OPERATIONS]
+    if unknown:
+        print(f"[Error] Unknown operation(s): {', '.join(unknown)}. Choose from: {', '.join(OPERATIONS)}")
+        return 2
+
+    if args.trace:
+        tracing.enable(args.trace)
+    conn = open_connection(args.db)
+    try:
+        result = run_benchmarks(conn, args.only, args.repeat, args.warmup, args.seed)
+    finally:
+        conn.close()
+    result["database"] = os.path.abspath(args.db)
+
+    print_results(result)
+    if args.output == "-":
+        json.dump(result, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the query paths behind each CLI operation.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="time the operations against a database")
+    run.add_argument("db", help="database file (e.g. one built with generate_data.py)")
+    run.add_argument("-o", "--output", default="-", help="JSON results file ('-' for stdout)")
+    run.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timed runs per operation")
+    run.add_argument("--warmup", type=int, default=DEFAULT_WARMUP, help="untimed runs per operation")
+    run.add_argument("--seed", type=int, default=DEFAULT_SEED, help="seed for choosing the inputs")
+    run.add_argument("--only", nargs="+", metavar="OPERATION", help="run only these operations")
+    run.add_argument("--trace", metavar="DIR", help="trace statements, writing metrics and the slow-query log to DIR")
+
+    compare = commands.add_parser("compare", help="compare two JSON result files")
+    compare.add_argument("before")
+    compare.add_argument("after")
+    compare.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                         help="median slowdown reported as a regression (0.2 = 20%%)")
+
+    startup = commands.add_parser("startup", help="time cold starts of the menu and a scripted tool")
+    startup.add_argument("db", help="database file")
+    startup.add_argument("--runs", type=int, default=STARTUP_RUNS, help="timed starts per command")
+    startup.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS,
+                         help="largest acceptable median for the menu")
+
+    concurrency = commands.add_parser("concurrency", help="check that concurrent writers wait instead of failing")
+    concurrency.add_argument("db", help="database file (copied; the original is not changed)")
+    concurrency.add_argument("--threads", type=int, default=CONCURRENT_THREADS, help="concurrent writers")
+    concurrency.add_argument("--calls", type=int, default=CONCURRENT_CALLS, help="writes per thread")
+    concurrency.add_argument("--seed", type=int, default=DEFAULT_SEED, help="seed for choosing the writes")
+
+    args = parser.parse_args(argv)
+    handlers = {"run": run_main, "compare": compare_main, "startup": startup_main,
+                "concurrency": concurrency_main}
+    return handlers[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+import argparse
+import csv
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+
+from connection import DB_FILE, open_connection
+from loaders import FLIGHT_DETAILS, SUMMARY_QUERIES, STREAM_BATCH_SIZE, iter_batches, summary_cursor
+
+# Streaming export of flights and the summary reports for downstream jobs.
+#
+# Rows are pulled from the cursor with fetchmany() and written one batch at
+# a time, so memory is bounded by the batch size whatever the table size.
+# Formats: csv, jsonl, and "columnar" - a compact binary layout written in
+# row groups. Each column in a group is either int64 values plus a null mask,
+# or a dictionary of distinct strings plus uint32 indexes, and each column
+# block is zlib-compressed. read_columnar() reads it back.
+
+DATASETS = ("flights",) + tuple(f"summary-{name}" for name in SUMMARY_QUERIES)
+FORMATS = ("csv", "jsonl", "columnar")
+EXTENSIONS = {"csv": ".csv", "jsonl": ".jsonl", "columnar": ".fcol"}
+
+COLUMNAR_MAGIC = b"FLTCOL1\n"
+ROW_GROUP_SIZE = 65536
+
+
+def dataset_cursor(conn, dataset):
+    """Cursor over a dataset. Flights are read in rowid order (a sequential table scan)."""
+    if dataset == "flights":
+        return conn.execute(FLIGHT_DETAILS + " ORDER BY f.flight_id")
+    return summary_cursor(conn, dataset.removeprefix("summary-"))
+
+
+def column_names(cursor):
+    return [description[0] for description in cursor.description]
+
+
+def write_csv(cursor, out, batch_size=STREAM_BATCH_SIZE):
+    writer = csv.writer(out)
+    writer.writerow(column_names(cursor))
+    count = 0
+    for batch in iter_batches(cursor, batch_size):
+        writer.writerows(batch)
+        count += len(batch)
+    return count
+
+
+def write_jsonl(cursor, out, batch_size=STREAM_BATCH_SIZE):
+    names = column_names(cursor)
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    count = 0
+    for batch in iter_batches(cursor, batch_size):
+        out.write("\n".join(encode(dict(zip(names, row))) for row in batch))
+        out.write("\n")
+        count += len(batch)
+    return count
+
+
+def _encode_column(values):
+    """(kind, payload) for one column of a row group."""
+    if all(value is None or type(value) is int for value in values):
+        mask = bytes(0 if value is None else 1 for value in values)
+        ints = array("q", (0 if value is None else value for value in values))
+        return b"i", mask + ints.tobytes()
+
+    dictionary = {}
+    indexes = array("I", (dictionary.setdefault(value, len(dictionary)) for value in values))
+    header = json.dumps(list(dictionary), ensure_ascii=False).encode("utf-8")
+    return b"s", struct.pack("<I", len(header)) + header + indexes.tobytes()
+
+
+def _decode_column(kind, payload, row_count):
+    if kind == b"i":
+        mask = payload[:row_count]
+        ints = array("q")
+        ints.frombytes(payload[row_count:])
+        return [value if present else None for value, present in zip(ints, mask)]
+
+    (header_length,) = struct.unpack_from("<I", payload)
+    dictionary = json.loads(payload[4:4 + header_length].decode("utf-8"))
+    indexes = array("I")
+    indexes.frombytes(payload[4 + header_length:])
+    return [dictionary[index] for index in indexes]
+
+
+def write_columnar(cursor, out, row_group_size=ROW_GROUP_SIZE):
+    """Write the cursor as row groups of column blocks to a binary file."""
+    names = column_names(cursor)
+    header = json.dumps({"columns": names}).encode("utf-8")
+    out.write(COLUMNAR_MAGIC)
+    out.write(struct.pack("<I", len(header)))
+    out.write(header)
+
+    count = 0
+    for batch in iter_batches(cursor, row_group_size):
+        out.write(struct.pack("<I", len(batch)))
+        for column in zip(*batch):
+            kind, payload = _encode_column(column)
+            block = zlib.compress(payload, 6)
+            out.write(kind)
+            out.write(struct.pack("<I", len(block)))
+            out.write(block)
+        count += len(batch)
+    return count
+
+
+def read_columnar(path):
+    """Yield (column_names, rows) per row group of a columnar export file."""
+    with open(path, "rb") as f:
+        if f.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+            raise ValueError(f"{path} is not a columnar export file")
+        (header_length,) = struct.unpack("<I", f.read(4))
+        names = json.loads(f.read(header_length))["columns"]
+        while True:
+            raw = f.read(4)
+            if not raw:
+                return
+            (row_count,) = struct.unpack("<I", raw)
+            columns = []
+            for _ in names:
+                kind = f.read(1)
+                (block_length,) = struct.unpack("<I", f.read(4))
+                payload = zlib.decompress(f.read(block_length))
+                columns.append(_decode_column(kind, payload, row_count))
+            yield names, list(zip(*columns))
+
+
+def export_dataset(conn, dataset, file_format, path):
+    """Export one dataset to path ('-' for stdout with csv/jsonl). Returns the row count."""
+    cursor = dataset_cursor(conn, dataset)
+    if file_format == "columnar":
+        with open(path, "wb") as out:
+            return write_columnar(cursor, out)
+
+    writer = write_csv if file_format == "csv" else write_jsonl
+    if path == "-":
+        return writer(cursor, sys.stdout)
+    # Large buffered writes keep this I/O bound rather than syscall bound
+    with open(path, "w", newline="", encoding="utf-8", buffering=1024 * 1024) as out:
+        return writer(cursor, out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream flights or summary reports to a file.")
+    parser.add_argument("dataset", choices=DATASETS + ("all",), help="what to export")
+    parser.add_argument("-f", "--format", choices=FORMATS, default="csv")
+    parser.add_argument("-o", "--output", default="-",
+                        help="output file ('-' for stdout), or a directory when exporting 'all'")
+    parser.add_argument("--db", default=DB_FILE, help="database file")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"[Error] Database '{args.db}' not found. Run 'python db_manager.py' first.", file=sys.stderr)
+        return 1
+    if args.format == "columnar" and args.output == "-":
+        print("[Error] The columnar format must be written to a file (use -o).", file=sys.stderr)
+        return 1
+
+    if args.dataset == "all":
+        if args.output == "-":
+            print("[Error] Exporting 'all' needs an output directory (use -o).", file=sys.stderr)
+            return 1
+        os.makedirs(args.output, exist_ok=True)
+        targets = [(name, os.path.join(args.output, name + EXTENSIONS[args.format])) for name in DATASETS]
+    else:
+        targets = [(args.dataset, args.output)]
+
+    conn = open_connection(args.db)
+    try:
+        for dataset, path in targets:
+            start = time.perf_counter()
+            count = export_dataset(conn, dataset, args.format, path)
+            elapsed = time.perf_counter() - start
+            if path != "-":
+                rate = count / elapsed if elapsed else 0.0
+                print(f"Exported {count} row(s) of {dataset} to {path} in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+from audit import AUDIT_BATCH_INSERT, default_actor
+from connection import DB_FILE, open_connection
+from fulltext import FTS_BATCH_INSERT
+from scheduling import MIN_REST, DutyChecker, duty_interval
+from summaries import COUNTS_BATCH_INSERT
+from validation import day_to_date, epoch_day, is_valid_date, is_valid_flight_number, status_error
+
+# Non-interactive bulk import of flight schedules from CSV or JSONL.
+#
+# Each input row needs flight_num, departure_date, status and airport_code;
+# license_num is optional (blank means unassigned). Rows are validated with
+# the same rules as the interactive prompts, statuses, airport codes and
+# licence numbers are resolved through in-memory maps, and valid rows are inserted
+# with executemany() one large transaction per batch. Rows with a pilot go
+# through a scheduling.DutyChecker like interactive assignments: a row is
+# rejected when its pilot has a clashing duty, in the database or in an
+# earlier row of the batch.
+#
+# Each batch takes the write lock up front (BEGIN IMMEDIATE), so the
+# duplicate and duty checks see the same Flights the batch is inserted into.
+#
+# The per-row insert triggers on Flights (FTS index, summary counts) cost
+# more than the insert itself, so each batch transaction drops them, applies
+# the equivalent set-based statements to the whole batch and recreates them
+# before committing. Other connections never see a trigger missing. The
+# audit log gets one set-based insert entry per batch in the same way.
+
+BATCH_SIZE = 50000
+# Keep IN (...) lists well under SQLite's bound-parameter limit
+LOOKUP_CHUNK_SIZE = 500
+MAX_PRINTED_REJECTS = 10
+
+# Insert trigger -> statements that do the same work for all rows with flight_id > ?
+BATCH_REPLACED_TRIGGERS = {
+    "flights_fts_insert": [FTS_BATCH_INSERT],
+    "flight_counts_insert": COUNTS_BATCH_INSERT,
+}
+
+
+def detect_format(path):
+    return "jsonl" if path.lower().endswith((".jsonl", ".json", ".ndjson")) else "csv"
+
+
+def read_rows(path, file_format=None):
+    """Yield (line_number, record) pairs without loading the file into memory.
+
+    record is a dict, or None when a JSONL line is not valid JSON.
+    """
+    file_format = file_format or detect_format(path)
+    with open(path, newline="", encoding="utf-8") as f:
+        if file_format == "csv":
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, record
+        else:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    yield line_number, None
+                    continue
+                yield line_number, record if isinstance(record, dict) else None
+
+
+def load_lookup_maps(conn):
+    """airport_code -> dest_id, license_num -> pilot_id and lower-case status
+    name -> status_id, loaded once per import.
+    """
+    dest_ids = {code.upper(): dest_id for code, dest_id in conn.execute("SELECT airport_code, dest_id FROM Destinations")}
+    pilot_ids = dict(conn.execute("SELECT license_num, pilot_id FROM Pilots"))
+    status_ids = {name.lower(): status_id for status_id, name in conn.execute("SELECT status_id, name FROM FlightStatus")}
+    return dest_ids, pilot_ids, status_ids
+
+
+def _field(record, name):
+    value = record.get(name)
+    return "" if value is None else str(value).strip()
+
+
+def validate_row(record, dest_ids, pilot_ids, status_ids):
+    """Return (values, None) for a valid row or (None, reason) for a rejected one.
+
+    values is (flight_num, departure_day, status_id, pilot_id, dest_id).
+    """
+    if record is None:
+        return None, "Row is not a valid JSON object."
+
+    f_num = _field(record, "flight_num")
+    if not is_valid_flight_number(f_num):
+        return None, f"Invalid flight number '{f_num}'. Must be FL-XXX."
+
+    dep_date = _field(record, "departure_date")
+    if not is_valid_date(dep_date):
+        return None, f"Invalid date '{dep_date}'. Must be a real date as YYYY-MM-DD."
+
+    status = _field(record, "status")
+    error = status_error(status)
+    if error:
+        return None, error
+    status_id = status_ids.get(status.lower())
+    if status_id is None:
+        return None, f"Unknown status '{status}'."
+
+    airport_code = _field(record, "airport_code").upper()
+    dest_id = dest_ids.get(airport_code)
+    if dest_id is None:
+        return None, f"Unknown airport code '{airport_code}'."
+
+    license_num = _field(record, "license_num")
+    pilot_id = None
+    if license_num:
+        pilot_id = pilot_ids.get(license_num)
+        if pilot_id is None:
+            return None, f"Unknown licence number '{license_num}'."
+
+    return (f_num, epoch_day(dep_date), status_id, pilot_id, dest_id), None
+
+
+def existing_flight_numbers(conn, flight_nums):
+    """Which of flight_nums are already in Flights (served by idx_flights_flight_num)."""
+    existing = set()
+    for start in range(0, len(flight_nums), LOOKUP_CHUNK_SIZE):
+        chunk = flight_nums[start:start + LOOKUP_CHUNK_SIZE]
+        placeholders = ", ".join("?" for _ in chunk)
+        cursor = conn.execute(f"SELECT flight_num FROM Flights WHERE flight_num IN ({placeholders})", chunk)
+        existing.update(row[0] for row in cursor)
+    return existing
+
+
+def get_trigger_sql(conn, name):
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?", (name,)).fetchone()
+    return row[0] if row else None
+
+
+def import_flights(conn, rows, batch_size=BATCH_SIZE, on_reject=None, actor=None):
+    """Validate and insert flights from an iterable of (line_number, record).
+
+    on_reject(line_number, reason, record) is called for every rejected row.
+    actor is recorded in the audit log (default: the OS user).
+    Returns a dict with read/inserted/rejected counts, elapsed seconds and rows/sec.
+    """
+    dest_ids, pilot_ids, status_ids = load_lookup_maps(conn)
+    # Only the triggers this database actually has (older schema versions lack some)
+    triggers = {}
+    for name in BATCH_REPLACED_TRIGGERS:
+        sql = get_trigger_sql(conn, name)
+        if sql:
+            triggers[name] = sql
+    audited = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'AuditLog'").fetchone()
+    actor = actor or default_actor()
+    rest_hours = MIN_REST.total_seconds() / 3600
+    stats = {"read": 0, "inserted": 0, "rejected": 0}
+    seen = set()
+    batch = []
+
+    def reject(line_number, reason, record):
+        stats["rejected"] += 1
+        if on_reject:
+            on_reject(line_number, reason, record)
+
+    def flush():
+        conn.execute("BEGIN IMMEDIATE")
+        existing = existing_flight_numbers(conn, [values[0] for _, values, _ in batch])
+        checker = DutyChecker(conn)
+        to_insert = []
+        for line_number, values, record in batch:
+            f_num, departure_day, _, pilot_id, _ = values
+            if f_num in existing:
+                reject(line_number, f"Flight number '{f_num}' already exists.", record)
+                continue
+            if pilot_id is not None:
+                clash = checker.add(pilot_id, f_num, *duty_interval(day_to_date(departure_day)))
+                if clash is not None:
+                    reject(line_number, f"Pilot '{_field(record, 'license_num')}' is already flying {clash}, "
+                                        f"which overlaps this flight or leaves less than {rest_hours:g} hours of rest.",
+                           record)
+                    continue
+            to_insert.append(values)
+
+        last_id = conn.execute("SELECT COALESCE(MAX(flight_id), 0) FROM Flights").fetchone()[0]
+        for name in triggers:
+            conn.execute(f"DROP TRIGGER {name}")
+        conn.executemany(
+            "INSERT INTO Flights (flight_num, departure_day, status_id, pilot_id, dest_id) VALUES (?, ?, ?, ?, ?)",
+            to_insert,
+        )
+        for name, sql in triggers.items():
+            # AUTOINCREMENT ids only grow, so the new rows are exactly those above last_id
+            for statement in BATCH_REPLACED_TRIGGERS[name]:
+                conn.execute(statement, (last_id,))
+            conn.execute(sql)
+        if audited:
+            conn.execute(AUDIT_BATCH_INSERT, (actor, last_id))
+        conn.commit()
+        stats["inserted"] += len(to_insert)
+        batch.clear()
+
+    start = time.perf_counter()
+    try:
+        for line_number, record in rows:
+            stats["read"] += 1
+            values, reason = validate_row(record, dest_ids, pilot_ids, status_ids)
+            if reason:
+                reject(line_number, reason, record)
+                continue
+            if values[0] in seen:
+                reject(line_number, f"Flight number '{values[0]}' appears more than once in the file.", record)
+                continue
+            seen.add(values[0])
+            batch.append((line_number, values, record))
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    except Exception:
+        conn.rollback()
+        raise
+
+    stats["seconds"] = time.perf_counter() - start
+    stats["rows_per_sec"] = stats["read"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import flights from a CSV or JSONL file.")
+    parser.add_argument("path", help="CSV (with a header row) or JSONL file of flights")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="file format (default: from the file extension)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="rows per transaction")
+    parser.add_argument("--rejects", help="write rejected rows to this JSONL file")
+    parser.add_argument("--db", default=DB_FILE, help="database file")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"[Error] Database '{args.db}' not found. Run 'python db_manager.py' first.")
+        return 1
+
+    rejects_file = open(args.rejects, "w", encoding="utf-8") if args.rejects else None
+    printed = 0
+
+    def on_reject(line_number, reason, record):
+        nonlocal printed
+        if printed < MAX_PRINTED_REJECTS:
+            print(f"[Rejected] line {line_number}: {reason}")
+            printed += 1
+        if rejects_file:
+            rejects_file.write(json.dumps({"line": line_number, "reason": reason, "row": record}) + "\n")
+
+    conn = open_connection(args.db)
+    try:
+        stats = import_flights(conn, read_rows(args.path, args.format), args.batch_size, on_reject)
+    finally:
+        conn.close()
+        if rejects_file:
+            rejects_file.close()
+
+    print("\n--- Import Summary ---")
+    print(f"Rows read:     {stats['read']}")
+    print(f"Inserted:      {stats['inserted']}")
+    print(f"Rejected:      {stats['rejected']}")
+    print(f"Elapsed:       {stats['seconds']:.2f}s ({stats['rows_per_sec']:,.0f} rows/sec)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+import atexit
+import os
+import sqlite3
+import threading
+
+import tracing
+
+# Database file: $AIRLINE_DB, or airline_data.db next to these scripts. Kept
+# absolute so every script finds the same file whatever the working directory.
+DB_FILE = os.path.abspath(os.environ.get("AIRLINE_DB")
+                          or os.path.join(os.path.dirname(os.path.abspath(__file__)), "airline_data.db"))
+
+# Schema version this code expects: the version of the last entry in
+# migrations.MIGRATIONS. Startup compares it with PRAGMA user_version, so an
+# up-to-date database is opened without importing the migrations or running DDL.
+SCHEMA_VERSION = 11
+
+# Applied to every connection when it is opened. journal_mode=WAL lets
+# readers run alongside a writer, synchronous=NORMAL is safe under WAL and
+# avoids an fsync per commit, and cache_size is negative so it means KiB.
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64000,          # ~64 MB page cache
+    "mmap_size": 268435456,        # 256 MB memory-mapped I/O
+    "temp_store": "MEMORY",
+    "foreign_keys": "ON",
+    "busy_timeout": 5000,          # ms to wait on a locked database
+}
+# Only matter to a connection that writes, and journal_mode itself writes to
+# the file, so read-only connections skip them and keep the file's own mode
+WRITE_PRAGMAS = ("journal_mode", "synchronous")
+
+# Prepared statements kept per connection (sqlite3 reuses them by SQL text)
+STATEMENT_CACHE_SIZE = 256
+
+_settings = {"db_file": DB_FILE, "pragmas": dict(DEFAULT_PRAGMAS)}
+_local = threading.local()
+_open_connections = []
+_lock = threading.Lock()
+
+
+def configure(db_file=None, **pragmas):
+    """Change the database file or override PRAGMAs for connections opened afterwards.
+
+    e.g. configure(cache_size=-256000, mmap_size=0)
+    """
+    if db_file is not None:
+        _settings["db_file"] = os.path.abspath(db_file)
+    _settings["pragmas"].update(pragmas)
+
+
+def get_db_file():
+    """Absolute path of the database file new connections open."""
+    return _settings["db_file"]
+
+
+def apply_pragmas(conn, pragmas=None, read_only=False):
+    for name, value in (pragmas or _settings["pragmas"]).items():
+        if read_only and name in WRITE_PRAGMAS:
+            continue
+        # PRAGMA values cannot be bound parameters; they come from our own settings
+        conn.execute(f"PRAGMA {name} = {value}")
+
+
+def open_connection(db_file=None, pragmas=None, read_only=False):
+    """Open a new tuned connection (traced if tracing.enabled()). The caller is responsible for closing it.
+
+    read_only opens the file through a file:...?mode=ro URI: every write
+    fails with "attempt to write a readonly database", and a missing file
+    is an error instead of being created. WRITE_PRAGMAS are not applied, so
+    a database not in WAL mode can be opened too.
+    """
+    db_file = db_file or _settings["db_file"]
+    if read_only:
+        from urllib.parse import quote  # loaded on first use to keep it off the menu's start-up path
+        db_file = f"file:{quote(os.path.abspath(db_file))}?mode=ro"
+    conn = sqlite3.connect(db_file, cached_statements=STATEMENT_CACHE_SIZE, uri=read_only,
+                           factory=tracing.connection_factory())
+    apply_pragmas(conn, pragmas, read_only)
+    return conn
+
+
+def schema_is_current(conn):
+    """True when the database is at SCHEMA_VERSION or later (one PRAGMA read)."""
+    return conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION
+
+
+def get_connection():
+    """Return this thread's long-lived connection, opening it on first use.
+
+    The main CLI thread reuses one connection for the whole session; worker
+    threads each get their own, since sqlite3 connections are not shared
+    across threads.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "db_file", None) != _settings["db_file"]:
+        conn = open_connection()
+        _local.conn = conn
+        _local.db_file = _settings["db_file"]
+        with _lock:
+            _open_connections.append(conn)
+    return conn
+
+
+def close_connections():
+    """Close every connection opened by get_connection() (run at exit)."""
+    with _lock:
+        while _open_connections:
+            conn = _open_connections.pop()
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                # Opened in another thread that has already finished
+                pass
+    _local.conn = None
+
+
+atexit.register(close_connections)
@@ -1,11 +1,26 @@
-import sqlite3
 import os
+import sys
 
-def run_setup():
+from connection import DB_FILE, SCHEMA_VERSION, open_connection, schema_is_current
+from migrations import apply_migrations, check_query_plans
+from fulltext import check_fts, has_fts, rebuild_fts
+from integrity import delete_policies, find_orphans, fix_orphans, set_delete_policy
+from statuses import add_status, list_statuses, merge_status
+from summaries import rebuild_summaries, verify_summaries
+from validation import epoch_day
+
+def run_setup(db_file=None):
+    db_file = db_file or DB_FILE
     # This creates the physical database file
-    conn = sqlite3.connect('airline_data.db')
+    conn = open_connection(db_file)
     cursor = conn.cursor()
 
+    # An up-to-date database already has its tables and sample data
+    if schema_is_current(conn):
+        conn.close()
+        print(f"Database '{db_file}' is already initialised (schema version {SCHEMA_VERSION}).")
+        return
+
       # Instead of hardcoding the CREATE TABLE statements, we read them from schema.sql
     try:
         # Get the directory where this script is located
@@ -52,11 +67,129 @@ def run_setup():
         (109, "FL-109", "2026-05-14", "On Time", 9, 9),
         (110, "FL-110", "2026-05-14", "Scheduled", 10, 10)
     ]
-    cursor.executemany("INSERT OR IGNORE INTO Flights (flight_id, flight_num, departure_date, status, pilot_id, dest_id) VALUES (?,?,?,?,?,?)", flights)
+    conn.commit()
 
+    # Bring indexes and later schema changes up to date; flights store a status code
+    # and a departure day number from then on
+    apply_migrations(conn)
+    cursor.executemany("INSERT OR IGNORE INTO Flights (flight_id, flight_num, departure_day, status_id, pilot_id, dest_id) "
+                       "VALUES (?, ?, ?, (SELECT status_id FROM FlightStatus WHERE name = ?), ?, ?)",
+                       [(f_id, f_num, epoch_day(dep_date), *rest) for f_id, f_num, dep_date, *rest in flights])
     conn.commit()
     conn.close()
-    print("Database 'airline_data.db' successfully initialised.")
+    print(f"Database '{db_file}' successfully initialised.")
+
+
+def run_migrations(db_file=None):
+    """Upgrade an existing database in place, then check the hot query plans."""
+    conn = open_connection(db_file or DB_FILE)
+    try:
+        if apply_migrations(conn) < SCHEMA_VERSION:
+            # The hot queries are written for the latest schema
+            return ["migrations"]
+        print("\n--- Query Plan Check ---")
+        return check_query_plans(conn)
+    finally:
+        conn.close()
+
 
 if __name__ == "__main__":
-    run_setup()
\ No newline at end of file
+    # python db_manager.py            -> create and seed the database
+    # python db_manager.py migrate    -> upgrade an existing database
+    # python db_manager.py check      -> confirm hot queries use their indexes
+    # python db_manager.py rebuild-fts -> rebuild the full-text search indexes
+    # python db_manager.py verify-summaries  -> compare summary counts with Flights
+    # python db_manager.py rebuild-summaries -> recompute summary counts from scratch
+    # python db_manager.py check-integrity [--fix]  -> find (and detach) orphaned references
+    # python db_manager.py delete-policy [Destinations|Pilots restrict|set null|cascade]
+    # python db_manager.py statuses                 -> list the status codes
+    # python db_manager.py add-status NAME
+    # python db_manager.py merge-status FROM TO     -> move FROM's flights to TO and remove FROM
+    command = sys.argv[1] if len(sys.argv) > 1 else "setup"
+    match command:
+        case "setup":
+            run_setup()
+        case "migrate":
+            run_migrations()
+        case "check":
+            conn = open_connection(DB_FILE)
+            failures = check_query_plans(conn)
+            conn.close()
+            sys.exit(1 if failures else 0)
+        case "rebuild-fts":
+            conn = open_connection(DB_FILE)
+            if not has_fts(conn):
+                print("[Error] Full-text indexes not found. Run 'python db_manager.py migrate' first.")
+                conn.close()
+                sys.exit(1)
+            rebuild_fts(conn)
+            broken = check_fts(conn)
+            conn.close()
+            if broken:
+                print(f"[Error] Integrity check failed for: {', '.join(broken)}")
+                sys.exit(1)
+            print("Full-text indexes rebuilt and verified.")
+        case "verify-summaries":
+            conn = open_connection(DB_FILE)
+            mismatches = verify_summaries(conn)
+            conn.close()
+            for name, key, stored, live in mismatches:
+                print(f"[Mismatch] {name} {key}: stored {stored}, actual {live}")
+            if mismatches:
+                print("Run 'python db_manager.py rebuild-summaries' to fix the counts.")
+                sys.exit(1)
+            print("Summary counts match the Flights table.")
+        case "rebuild-summaries":
+            conn = open_connection(DB_FILE)
+            rebuild_summaries(conn)
+            conn.close()
+            print("Summary counts rebuilt.")
+        case "check-integrity":
+            conn = open_connection(DB_FILE)
+            orphans = find_orphans(conn)
+            for child, column, missing, count in orphans:
+                print(f"[Orphan] {count} {child} row(s) have {column} {missing}, which does not exist")
+            if orphans and "--fix" in sys.argv[2:]:
+                changed = fix_orphans(conn, orphans)
+                print(f"Set {changed} orphaned reference(s) to NULL.")
+            conn.close()
+            if not orphans:
+                print("No orphaned references found.")
+            elif "--fix" not in sys.argv[2:]:
+                print("Run 'python db_manager.py check-integrity --fix' to set them to NULL.")
+                sys.exit(1)
+        case "delete-policy":
+            conn = open_connection(DB_FILE)
+            try:
+                if len(sys.argv) > 3:
+                    set_delete_policy(conn, sys.argv[2], " ".join(sys.argv[3:]).lower())
+                for parent, policy in delete_policies(conn).items():
+                    print(f"{parent:<14} ON DELETE {policy.upper()}")
+            except ValueError as e:
+                print(f"[Error] {e}")
+                sys.exit(1)
+            finally:
+                conn.close()
+        case "statuses" | "add-status" | "merge-status":
+            conn = open_connection(DB_FILE)
+            try:
+                if command == "add-status" and len(sys.argv) == 3:
+                    print(f"Added status '{sys.argv[2]}' with code {add_status(conn, sys.argv[2])}.")
+                elif command == "merge-status" and len(sys.argv) == 4:
+                    moved = merge_status(conn, sys.argv[2], sys.argv[3])
+                    print(f"Moved {moved} flight(s) from '{sys.argv[2]}' to '{sys.argv[3]}'.")
+                elif command != "statuses":
+                    print("Usage: python db_manager.py add-status NAME | merge-status FROM TO")
+                    sys.exit(2)
+                for status_id, name, flights in list_statuses(conn):
+                    print(f"{status_id:>4}  {name:<16} {flights} flight(s)")
+            except ValueError as e:
+                print(f"[Error] {e}")
+                sys.exit(1)
+            finally:
+                conn.close()
+        case _:
+            print(f"Unknown command '{command}'. Use setup, migrate, check, rebuild-fts, "
+                  "verify-summaries, rebuild-summaries, check-integrity, delete-policy, "
+                  "statuses, add-status or merge-status.")
+            sys.exit(2)
\ No newline at end of file
@@ -0,0 +1,142 @@
+import re
+import sqlite3
+
+from loaders import FLIGHT_DETAILS
+from search import contains_filter
+
+# Full-text search over the FTS5 indexes created by migration 3.
+# destinations_fts, pilots_fts and flights_fts are external-content tables
+# kept in sync by triggers, so they only store the token index itself.
+
+FTS_TABLES = ("destinations_fts", "pilots_fts", "flights_fts")
+
+# Set-based replacement for the flights_fts_insert trigger, used by bulk
+# imports: indexes every flight with flight_id > ? in one statement.
+FTS_BATCH_INSERT = "INSERT INTO flights_fts(rowid, flight_num) SELECT flight_id, flight_num FROM Flights WHERE flight_id > ?"
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def has_fts(conn):
+    """True when the FTS5 tables exist (migration 3 applied and FTS5 available)."""
+    cursor = conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN (?, ?, ?)",
+        FTS_TABLES,
+    )
+    return cursor.fetchone()[0] == len(FTS_TABLES)
+
+
+def build_match(text):
+    """Turn free text into a safe FTS5 prefix query, e.g. 'fl-10' -> '"fl"* "10"*'.
+
+    Every token is quoted so user input can never be read as FTS5 syntax.
+    Returns None when the text has no searchable characters.
+    """
+    tokens = _TOKEN.findall(text)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def search_destinations(conn, text, limit=20):
+    """Destinations matching city or airport code, best match first."""
+    match = build_match(text)
+    if match is None:
+        return []
+    if not has_fts(conn):
+        city, params = contains_filter("city", text)
+        code, code_params = contains_filter("airport_code", text)
+        cursor = conn.execute(
+            f"SELECT dest_id, city, airport_code FROM Destinations WHERE {city} OR {code} LIMIT ?",
+            params + code_params + [limit],
+        )
+        return cursor.fetchall()
+    cursor = conn.execute("""SELECT d.dest_id, d.city, d.airport_code
+                             FROM destinations_fts
+                             JOIN Destinations d ON d.dest_id = destinations_fts.rowid
+                             WHERE destinations_fts MATCH ?
+                             ORDER BY rank
+                             LIMIT ?""", (match, limit))
+    return cursor.fetchall()
+
+
+def search_pilots(conn, text, limit=20):
+    """Pilots matching name or licence number, best match first."""
+    match = build_match(text)
+    if match is None:
+        return []
+    if not has_fts(conn):
+        name, params = contains_filter("name", text)
+        lic, lic_params = contains_filter("license_num", text)
+        cursor = conn.execute(
+            f"SELECT pilot_id, name, license_num FROM Pilots WHERE {name} OR {lic} LIMIT ?",
+            params + lic_params + [limit],
+        )
+        return cursor.fetchall()
+    cursor = conn.execute("""SELECT p.pilot_id, p.name, p.license_num
+                             FROM pilots_fts
+                             JOIN Pilots p ON p.pilot_id = pilots_fts.rowid
+                             WHERE pilots_fts MATCH ?
+                             ORDER BY rank
+                             LIMIT ?""", (match, limit))
+    return cursor.fetchall()
+
+
+def search_flights(conn, text, limit=50):
+    """Flights whose number, destination or pilot matches the text.
+
+    Returns rows in the same shape as loaders.get_flight(), ranked by the
+    best bm25 score across the three indexes.
+    """
+    match = build_match(text)
+    if match is None:
+        return []
+    if not has_fts(conn):
+        clauses = []
+        params = []
+        for column in ("f.flight_num", "d.city", "d.airport_code", "p.name", "p.license_num"):
+            clause, clause_params = contains_filter(column, text)
+            clauses.append(clause)
+            params += clause_params
+        cursor = conn.execute(
+            f"{FLIGHT_DETAILS} WHERE {' OR '.join(clauses)} LIMIT ?", params + [limit]
+        )
+        return cursor.fetchall()
+    query = f"""WITH hits AS (
+                    SELECT rowid AS flight_id, rank FROM flights_fts WHERE flights_fts MATCH :q
+                    UNION ALL
+                    SELECT f.flight_id, m.rank
+                    FROM (SELECT rowid, rank FROM destinations_fts WHERE destinations_fts MATCH :q) m
+                    JOIN Flights f ON f.dest_id = m.rowid
+                    UNION ALL
+                    SELECT f.flight_id, m.rank
+                    FROM (SELECT rowid, rank FROM pilots_fts WHERE pilots_fts MATCH :q) m
+                    JOIN Flights f ON f.pilot_id = m.rowid
+                ),
+                best AS (
+                    SELECT flight_id, MIN(rank) AS score FROM hits GROUP BY flight_id
+                )
+                {FLIGHT_DETAILS}
+                JOIN best b ON b.flight_id = f.flight_id
+                ORDER BY b.score, f.departure_day
+                LIMIT :limit"""
+    cursor = conn.execute(query, {"q": match, "limit": limit})
+    return cursor.fetchall()
+
+
+def rebuild_fts(conn):
+    """Rebuild every FTS index from its content table (e.g. after a bulk load)."""
+    for table in FTS_TABLES:
+        conn.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+    conn.commit()
+
+
+def check_fts(conn):
+    """Run the FTS5 integrity check on each index. Returns a list of broken tables."""
+    broken = []
+    for table in FTS_TABLES:
+        try:
+            conn.execute(f"INSERT INTO {table}({table}) VALUES ('integrity-check')")
+        except sqlite3.DatabaseError:
+            broken.append(table)
+    return broken
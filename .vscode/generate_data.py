@@ -0,0 +1,224 @@
+import argparse
+import datetime
+import itertools
+import math
+import os
+import random
+import sys
+import time
+from bisect import bisect
+
+from connection import DEFAULT_PRAGMAS, open_connection
+from migrations import apply_migrations
+
+# Synthetic data generator for building production-sized databases.
+#
+# The output is reproducible: the same arguments and --seed always produce
+# the same rows. The distributions are skewed to look like a real airline
+# rather than uniform noise:
+#   - destinations follow a Zipf curve, so a few hub airports carry most flights
+#   - departure dates have a summer and December peak, and Fridays/Sundays are busy
+#   - flights before --today are mostly On Time / Delayed / Cancelled, and
+#     flights after it are mostly Scheduled, with more unassigned pilots
+#
+# Tables are filled from schema.sql with no indexes or triggers, and the
+# migrations run afterwards. Indexes, FTS indexes and summary counts are
+# therefore built once over the loaded data instead of row by row.
+#
+# Flight numbers are FL-0000001, FL-0000002, ... The interactive FL-XXX
+# format only has 1000 values, so generated numbers use a wider format that
+# can never clash with numbers entered at the prompt.
+
+DEFAULT_PILOTS = 1000
+DEFAULT_DESTINATIONS = 5000
+DEFAULT_FLIGHTS = 1_000_000
+DEFAULT_START = "2025-01-01"
+DEFAULT_DAYS = 730
+DEFAULT_SEED = 42
+BATCH_SIZE = 100_000
+
+# Bulk loading settings: nothing else reads the file while it is being built,
+# so journaling and fsyncs are switched off. WAL is turned back on at the end.
+LOAD_PRAGMAS = dict(DEFAULT_PRAGMAS, journal_mode="OFF", synchronous="OFF", foreign_keys="OFF")
+
+PAST_STATUSES = [("On Time", 70), ("Delayed", 22), ("Cancelled", 5), ("Scheduled", 3)]
+FUTURE_STATUSES = [("Scheduled", 88), ("On Time", 6), ("Delayed", 5), ("Cancelled", 1)]
+# Chance that a flight has no pilot yet
+PAST_UNASSIGNED = 0.02
+FUTURE_UNASSIGNED = 0.15
+
+# Monday..Sunday
+WEEKDAY_WEIGHTS = [1.0, 0.85, 0.85, 0.95, 1.2, 1.05, 1.15]
+
+FIRST_NAMES = [
+    "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+    "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Charles", "Karen",
+    "Daniel", "Lisa", "Matthew", "Nancy", "Anthony", "Sandra", "Mark", "Emma", "Paul", "Maria",
+    "Wei", "Aisha", "Hiroshi", "Priya", "Carlos", "Fatima", "Olga", "Kwame", "Ingrid", "Mateo",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+    "Hernandez", "Lopez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin", "Lee",
+    "Chen", "Wang", "Kim", "Nguyen", "Patel", "Singh", "Khan", "Ivanova", "Okafor", "Silva",
+    "Rossi", "Muller", "Dubois", "Tanaka", "Sato", "Andersson", "Novak", "Kowalski", "Haddad", "Cohen",
+]
+CITY_SYLLABLES = ["ka", "lo", "mi", "ra", "den", "vor", "sal", "ber", "ton", "ri",
+                  "an", "mar", "el", "os", "port", "ville", "ha", "no", "ste", "lin"]
+
+
+def _cumulative(weights):
+    return list(itertools.accumulate(weights))
+
+
+def generate_pilots(rng, count):
+    """(name, license_num) rows."""
+    return [(f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", f"LIC-{i:06d}") for i in range(1, count + 1)]
+
+
+def airport_codes(rng, count):
+    """count distinct codes: three letters while they last, then four."""
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    codes = ["".join(code) for code in itertools.product(letters, repeat=3)]
+    rng.shuffle(codes)
+    if count <= len(codes):
+        return codes[:count]
+    longer = ["".join(code) for code in itertools.product(letters, repeat=4)]
+    if count > len(codes) + len(longer):
+        raise ValueError(f"Cannot generate more than {len(codes) + len(longer)} destinations")
+    return codes + rng.sample(longer, count - len(codes))
+
+
+def generate_destinations(rng, count):
+    """(city, airport_code) rows. City names repeat occasionally, as real ones do."""
+    cities = []
+    for _ in range(count):
+        name = "".join(rng.choice(CITY_SYLLABLES) for _ in range(rng.randint(2, 3)))
+        cities.append(name.capitalize())
+    return list(zip(cities, airport_codes(rng, count)))
+
+
+def day_weights(start, days):
+    """Relative traffic per day: seasonal peaks times a day-of-week factor."""
+    weights = []
+    for offset in range(days):
+        day = start + datetime.timedelta(days=offset)
+        doy = day.timetuple().tm_yday
+        summer = math.exp(-((doy - 200) / 35) ** 2)
+        december = math.exp(-((doy - 355) / 12) ** 2)
+        weights.append((1.0 + 0.6 * summer + 0.4 * december) * WEEKDAY_WEIGHTS[day.weekday()])
+    return weights
+
+
+def generate_flights(rng, count, pilot_count, dest_count, start, days, today, batch_size=BATCH_SIZE):
+    """Yield batches of (flight_id, flight_num, departure_date, status, pilot_id, dest_id)."""
+    dates = [(start + datetime.timedelta(days=offset)).isoformat() for offset in range(days)]
+    date_cum = _cumulative(day_weights(start, days))
+    # Zipf-like popularity, shuffled so the hubs are not simply the lowest ids
+    dest_ids = list(range(1, dest_count + 1))
+    rng.shuffle(dest_ids)
+    dest_cum = _cumulative(1.0 / (rank ** 1.1) for rank in range(1, dest_count + 1))
+
+    past_names, past_weights = zip(*PAST_STATUSES)
+    future_names, future_weights = zip(*FUTURE_STATUSES)
+    past_cum, future_cum = _cumulative(past_weights), _cumulative(future_weights)
+    today = today.isoformat()
+
+    flight_id = 0
+    while flight_id < count:
+        n = min(batch_size, count - flight_id)
+        batch_dates = rng.choices(dates, cum_weights=date_cum, k=n)
+        batch_dests = rng.choices(dest_ids, cum_weights=dest_cum, k=n)
+        rows = []
+        for dep_date, dest_id in zip(batch_dates, batch_dests):
+            flight_id += 1
+            random_value = rng.random()
+            if dep_date < today:
+                status = past_names[bisect(past_cum, random_value * past_cum[-1])]
+                unassigned = PAST_UNASSIGNED
+            else:
+                status = future_names[bisect(future_cum, random_value * future_cum[-1])]
+                unassigned = FUTURE_UNASSIGNED
+            pilot_id = None if rng.random() < unassigned else rng.randint(1, pilot_count)
+            rows.append((flight_id, f"FL-{flight_id:07d}", dep_date, status, pilot_id, dest_id))
+        yield rows
+
+
+def read_schema():
+    schema_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema.sql")
+    with open(schema_path, "r") as f:
+        return f.read()
+
+
+def generate_database(path, pilots=DEFAULT_PILOTS, destinations=DEFAULT_DESTINATIONS, flights=DEFAULT_FLIGHTS,
+                      start=DEFAULT_START, days=DEFAULT_DAYS, today=None, seed=DEFAULT_SEED,
+                      batch_size=BATCH_SIZE, verbose=True):
+    """Create a new database at path filled with synthetic data. Returns the elapsed seconds."""
+    if os.path.exists(path):
+        raise FileExistsError(f"{path} already exists")
+    rng = random.Random(seed)
+    start = datetime.date.fromisoformat(start)
+    today = datetime.date.fromisoformat(today) if today else start + datetime.timedelta(days=days // 2)
+
+    began = time.perf_counter()
+    conn = open_connection(path, LOAD_PRAGMAS)
+    try:
+        conn.executescript(read_schema())
+        conn.executemany("INSERT INTO Pilots (name, license_num) VALUES (?, ?)", generate_pilots(rng, pilots))
+        conn.executemany("INSERT INTO Destinations (city, airport_code) VALUES (?, ?)",
+                         generate_destinations(rng, destinations))
+        conn.commit()
+
+        loaded = 0
+        for rows in generate_flights(rng, flights, pilots, destinations, start, days, today, batch_size):
+            conn.executemany("INSERT INTO Flights (flight_id, flight_num, departure_date, status, pilot_id, dest_id) "
+                             "VALUES (?, ?, ?, ?, ?, ?)", rows)
+            conn.commit()
+            loaded += len(rows)
+            if verbose:
+                elapsed = time.perf_counter() - began
+                print(f"  {loaded:,} / {flights:,} flights ({loaded / elapsed:,.0f} rows/sec)", end="\r")
+        if verbose:
+            print()
+
+        # Indexes, FTS and summary counts are built in one pass each
+        apply_migrations(conn, verbose)
+        conn.execute("PRAGMA journal_mode = WAL")
+    finally:
+        conn.close()
+    return time.perf_counter() - began
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic airline database for benchmarking.")
+    parser.add_argument("path", help="database file to create")
+    parser.add_argument("--pilots", type=int, default=DEFAULT_PILOTS)
+    parser.add_argument("--destinations", type=int, default=DEFAULT_DESTINATIONS)
+    parser.add_argument("--flights", type=int, default=DEFAULT_FLIGHTS)
+    parser.add_argument("--start", default=DEFAULT_START, help="first departure date (YYYY-MM-DD)")
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS, help="number of days of departures")
+    parser.add_argument("--today", help="date splitting past and future flights (default: middle of the range)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--force", action="store_true", help="replace the file if it exists")
+    args = parser.parse_args(argv)
+
+    if min(args.pilots, args.destinations, args.days) < 1 or args.flights < 0:
+        print("[Error] --pilots, --destinations and --days must be at least 1, and --flights cannot be negative.")
+        return 1
+    if os.path.exists(args.path):
+        if not args.force:
+            print(f"[Error] '{args.path}' already exists. Use --force to replace it.")
+            return 1
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.path + suffix):
+                os.remove(args.path + suffix)
+
+    print(f"Generating {args.pilots:,} pilots, {args.destinations:,} destinations and "
+          f"{args.flights:,} flights into '{args.path}' (seed {args.seed})")
+    elapsed = generate_database(args.path, args.pilots, args.destinations, args.flights,
+                                args.start, args.days, args.today, args.seed)
+    print(f"Done in {elapsed:.1f}s.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
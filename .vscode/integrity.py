@@ -0,0 +1,84 @@
+# Referential integrity for Flights (migration 8).
+#
+# Foreign keys are enforced on every connection (connection.DEFAULT_PRAGMAS),
+# and what happens to a parent's flights when a destination or pilot is
+# deleted is configurable per parent table in DeletePolicies:
+#   restrict - the DELETE fails while flights still reference the row
+#   set null - the flights are kept with dest_id / pilot_id set to NULL
+#   cascade  - the flights are deleted too
+# A BEFORE DELETE trigger on each parent applies the policy, so a single
+# DELETE statement does the whole job inside the database. SQLite fixes
+# ON DELETE actions when a table is created, so a policy table read by
+# triggers is what makes the behaviour changeable without rebuilding Flights.
+#
+# find_orphans() looks for references that were left dangling before
+# enforcement was switched on (or by tools that turn it off). It is an
+# anti-join driven by the covering child index, so each scan reads the
+# index once instead of the Flights table, and probes parents by primary key.
+
+DELETE_POLICIES = ("restrict", "set null", "cascade")
+
+# (child table, column, parent table, parent key, child index)
+REFERENCES = [
+    ("Flights", "dest_id", "Destinations", "dest_id", "idx_flights_dest"),
+    ("Flights", "pilot_id", "Pilots", "pilot_id", "idx_flights_pilot"),
+]
+
+_PARENTS = {parent: (child, column) for child, column, parent, _, _ in REFERENCES}
+
+
+def delete_policy_trigger(parent):
+    """CREATE TRIGGER statement applying DeletePolicies to deletes from parent."""
+    child, column = _PARENTS[parent]
+    key = next(ref[3] for ref in REFERENCES if ref[2] == parent)
+    policy = f"(SELECT on_delete FROM DeletePolicies WHERE parent = '{parent}')"
+    return f"""CREATE TRIGGER IF NOT EXISTS {parent.lower()}_delete_policy BEFORE DELETE ON {parent} BEGIN
+                   SELECT RAISE(ABORT, '{parent} row is still referenced by {child} (delete policy: restrict)')
+                   WHERE {policy} = 'restrict' AND EXISTS (SELECT 1 FROM {child} WHERE {column} = old.{key});
+                   UPDATE {child} SET {column} = NULL WHERE {column} = old.{key} AND {policy} = 'set null';
+                   DELETE FROM {child} WHERE {column} = old.{key} AND {policy} = 'cascade';
+               END"""
+
+
+def get_delete_policy(conn, parent):
+    row = conn.execute("SELECT on_delete FROM DeletePolicies WHERE parent = ?", (parent,)).fetchone()
+    return row[0] if row else "restrict"
+
+
+def set_delete_policy(conn, parent, policy):
+    if parent not in _PARENTS:
+        raise ValueError(f"Unknown parent table: {parent}. Choose from: {', '.join(_PARENTS)}")
+    if policy not in DELETE_POLICIES:
+        raise ValueError(f"Unknown delete policy: {policy}. Choose from: {', '.join(DELETE_POLICIES)}")
+    with conn:
+        conn.execute("""INSERT INTO DeletePolicies (parent, on_delete) VALUES (?, ?)
+                        ON CONFLICT (parent) DO UPDATE SET on_delete = excluded.on_delete""", (parent, policy))
+
+
+def delete_policies(conn):
+    """{parent table: policy} for every parent in REFERENCES."""
+    return {parent: get_delete_policy(conn, parent) for parent in _PARENTS}
+
+
+def find_orphans(conn):
+    """Return a list of (child, column, missing_key, row_count) for every
+    reference to a parent row that does not exist.
+    """
+    orphans = []
+    for child, column, parent, key, index in REFERENCES:
+        cursor = conn.execute(f"""SELECT c.{column}, COUNT(*)
+                                  FROM {child} c INDEXED BY {index}
+                                  WHERE c.{column} IS NOT NULL
+                                    AND NOT EXISTS (SELECT 1 FROM {parent} p WHERE p.{key} = c.{column})
+                                  GROUP BY c.{column}""")
+        orphans += [(child, column, missing, count) for missing, count in cursor]
+    return orphans
+
+
+def fix_orphans(conn, orphans):
+    """Set every orphaned reference from find_orphans() to NULL in one transaction. Returns the rows changed."""
+    changed = 0
+    with conn:
+        for child, column, missing, _ in orphans:
+            changed += conn.execute(f"UPDATE {child} SET {column} = NULL WHERE {column} = ?", (missing,)).rowcount
+    return changed
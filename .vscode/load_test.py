@@ -0,0 +1,240 @@
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from urllib.parse import urlencode
+
+# Load test for api_server.py using only the standard library.
+#
+# --concurrency clients each keep one HTTP/1.1 keep-alive connection open
+# and send requests back to back for --duration seconds. Requests are drawn
+# from a weighted mix of read endpoints (filters, search, pilot schedule,
+# summaries); --writes adds pilot assignments. Reports requests/sec and
+# p50/p90/p99 latency per endpoint and overall, optionally as JSON.
+#
+#     python api_server.py --db bench.db &
+#     python load_test.py --duration 20 --concurrency 64
+
+DEFAULT_URL_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_CONCURRENCY = 32
+DEFAULT_DURATION = 10.0
+DEFAULT_SEED = 42
+
+STATUSES = ("Scheduled", "On Time", "Delayed", "Cancelled")
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+class Client:
+    """One keep-alive connection sending requests in sequence."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, body=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        payload = json.dumps(body).encode("utf-8") if body is not None else b""
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n")
+        self.writer.write(head.encode("latin-1") + payload)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("Server closed the connection")
+        status = int(status_line.split()[1])
+        length = 0
+        close = False
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            name = name.strip().lower()
+            if name == "content-length":
+                length = int(value)
+            elif name == "connection" and value.strip().lower() == "close":
+                close = True
+        body = await self.reader.readexactly(length)
+        if close:
+            await self.close()
+        return status, body
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+async def fetch_fixtures(host, port):
+    """Look up pilots, cities and a date range to build realistic requests."""
+    client = Client(host, port)
+    try:
+        _, body = await client.request("GET", "/pilots")
+        pilots = [pilot["pilot_id"] for pilot in json.loads(body)["pilots"]]
+        _, body = await client.request("GET", "/flights?limit=200")
+        flights = json.loads(body)["flights"]
+        _, body = await client.request("GET", "/summaries/destinations")
+        cities = [row["label"] for row in json.loads(body) if row["flights"]]
+    finally:
+        await client.close()
+    if not pilots or not flights or not cities:
+        raise SystemExit("[Error] The database needs pilots, destinations and flights to load test.")
+    return {
+        "pilots": pilots,
+        "flight_ids": [flight["flight_id"] for flight in flights],
+        "dates": sorted({flight["departure_date"] for flight in flights}),
+        "cities": cities,
+    }
+
+
+def request_mix(fixtures, writes):
+    """Weighted (name, weight, make_request) list; make_request(rng) -> (method, path, body)."""
+    def flights_by_city(rng):
+        return "GET", "/flights?" + urlencode({"city": rng.choice(fixtures["cities"])[:3]}), None
+
+    def flights_by_status(rng):
+        return "GET", "/flights?" + urlencode({"status": rng.choice(STATUSES), "mode": "exact"}), None
+
+    def flights_by_date(rng):
+        return "GET", "/flights?" + urlencode({"date": rng.choice(fixtures["dates"])}), None
+
+    def keyword_search(rng):
+        return "GET", "/flights/search?" + urlencode({"q": rng.choice(fixtures["cities"])[:4]}), None
+
+    def schedule(rng):
+        return "GET", f"/pilots/{rng.choice(fixtures['pilots'])}/schedule", None
+
+    def flight(rng):
+        return "GET", f"/flights/{rng.choice(fixtures['flight_ids'])}", None
+
+    def summaries(rng):
+        return "GET", "/summaries/status", None
+
+    def assign(rng):
+        return "PUT", f"/flights/{rng.choice(fixtures['flight_ids'])}/pilot", {"pilot_id": rng.choice(fixtures["pilots"])}
+
+    mix = [
+        ("flights_by_city", 20, flights_by_city),
+        ("flights_by_status", 15, flights_by_status),
+        ("flights_by_date", 15, flights_by_date),
+        ("keyword_search", 10, keyword_search),
+        ("pilot_schedule", 15, schedule),
+        ("get_flight", 20, flight),
+        ("summary_status", 5, summaries),
+    ]
+    if writes:
+        mix.append(("assign_pilot", writes, assign))
+    return mix
+
+
+async def worker(host, port, mix, deadline, seed, latencies, errors):
+    rng = random.Random(seed)
+    names = [name for name, _, _ in mix]
+    weights = [weight for _, weight, _ in mix]
+    makers = {name: make for name, _, make in mix}
+    client = Client(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            method, path, body = makers[name](rng)
+            start = time.perf_counter()
+            try:
+                status, _ = await client.request(method, path, body)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                errors[name] = errors.get(name, 0) + 1
+                await client.close()
+                continue
+            latencies.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+            # Random assignments often clash with a pilot's schedule; a 409 is a valid answer
+            if status >= 400 and status != 409:
+                errors[name] = errors.get(name, 0) + 1
+    finally:
+        await client.close()
+
+
+def summarise(values, elapsed):
+    values = sorted(values)
+    return {
+        "requests": len(values),
+        "rps": round(len(values) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(values, 0.50), 3),
+        "p90_ms": round(percentile(values, 0.90), 3),
+        "p99_ms": round(percentile(values, 0.99), 3),
+        "mean_ms": round(statistics.fmean(values), 3) if values else 0.0,
+    }
+
+
+async def run_load_test(host, port, concurrency, duration, writes=0, seed=DEFAULT_SEED):
+    fixtures = await fetch_fixtures(host, port)
+    mix = request_mix(fixtures, writes)
+    latencies = {}
+    errors = {}
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(worker(host, port, mix, deadline, seed + i, latencies, errors)
+                           for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    every = [value for values in latencies.values() for value in values]
+    return {
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 2),
+        "overall": dict(summarise(every, elapsed), errors=sum(errors.values())),
+        "endpoints": {name: dict(summarise(values, elapsed), errors=errors.get(name, 0))
+                      for name, values in sorted(latencies.items())},
+    }
+
+
+def print_report(result):
+    overall = result["overall"]
+    print(f"\n{result['concurrency']} clients for {result['duration_s']}s: "
+          f"{overall['requests']} requests, {overall['rps']:,.0f} req/s, {overall['errors']} error(s)")
+    print(f"\n{'Endpoint':<20} | {'Req/s':>8} | {'p50 ms':>8} | {'p99 ms':>8} | {'Errors':>6}")
+    print("-" * 62)
+    for name, stats in list(result["endpoints"].items()) + [("overall", overall)]:
+        print(f"{name:<20} | {stats['rps']:>8,.0f} | {stats['p50_ms']:>8.2f} | {stats['p99_ms']:>8.2f} | "
+              f"{stats['errors']:>6}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the flights API server.")
+    parser.add_argument("--host", default=DEFAULT_URL_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("-c", "--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="concurrent connections")
+    parser.add_argument("-d", "--duration", type=float, default=DEFAULT_DURATION, help="seconds to run")
+    parser.add_argument("--writes", type=int, default=0,
+                        help="weight of pilot assignments in the mix (reads total 100; default: read only)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("-o", "--output", help="also write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        result = asyncio.run(run_load_test(args.host, args.port, args.concurrency, args.duration,
+                                           args.writes, args.seed))
+    except OSError as e:
+        print(f"[Error] Could not reach the server at {args.host}:{args.port}: {e}")
+        return 1
+
+    print_report(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
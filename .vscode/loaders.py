@@ -0,0 +1,235 @@
+from validation import day_to_date, epoch_day
+
+# Set-based loaders shared by the CLI listings in menu.py.
+# Each function runs one query (joining Destinations/Pilots where a name is
+# shown) instead of looking related rows up one flight at a time.
+# Rows are plain tuples; the column order is given in each docstring.
+#
+# Flight listings are never loaded whole: fetch_page() returns one keyset
+# page at a time, and iter_rows()/stream_flights() yield rows in fixed-size
+# batches so memory stays flat regardless of table size.
+
+PAGE_SIZE = 20
+STREAM_BATCH_SIZE = 1000
+
+# departure_day -> 'YYYY-MM-DD', filled by day_text()
+_day_texts = {}
+
+FLIGHT_DETAILS = """SELECT f.flight_id, f.flight_num, f.departure_date, s.name,
+                           f.dest_id, d.city, f.pilot_id, p.name,
+                           f.departure_time, f.arrival_time
+                    FROM Flights f
+                    LEFT JOIN FlightStatus s ON f.status_id = s.status_id
+                    LEFT JOIN Destinations d ON f.dest_id = d.dest_id
+                    LEFT JOIN Pilots p ON f.pilot_id = p.pilot_id"""
+# The same over the archived flights (archive.py), attached as "history"
+HISTORY_FLIGHT_DETAILS = FLIGHT_DETAILS.replace("FROM Flights f", "FROM history.Flights f")
+
+# Flights are listed chronologically; flight_id breaks ties so the key is unique.
+# idx_flights_departure (and the other departure_day indexes) serve this order.
+FLIGHT_ORDER = ("f.departure_day", "f.flight_id")
+
+
+def iter_batches(cursor, batch_size=STREAM_BATCH_SIZE):
+    """Yield lists of up to batch_size rows from a cursor."""
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            return
+        yield batch
+
+
+def iter_rows(cursor, batch_size=STREAM_BATCH_SIZE):
+    """Yield rows from a cursor in fixed-size batches so memory stays flat."""
+    for batch in iter_batches(cursor, batch_size):
+        yield from batch
+
+
+def fetch_page(conn, select, order_by, where="1 = 1", params=(), after=None, before=None, page_size=PAGE_SIZE):
+    """One keyset page of `select`, ordered by the order_by columns.
+
+    after/before are the order_by values of the last/first row of the
+    current page. The seek is a row-value comparison on those columns, so
+    an index jumps straight to the page instead of skipping rows as OFFSET
+    does. Returns (rows, has_more), where has_more says whether more rows
+    exist in the direction fetched. Rows are always in ascending order.
+    """
+    columns = ", ".join(order_by)
+    placeholders = ", ".join("?" for _ in order_by)
+    clauses = [f"({where})"]
+    bound = list(params)
+    direction = "ASC"
+
+    if after is not None:
+        clauses.append(f"({columns}) > ({placeholders})")
+        bound += list(after)
+    elif before is not None:
+        clauses.append(f"({columns}) < ({placeholders})")
+        bound += list(before)
+        direction = "DESC"
+
+    order = ", ".join(f"{column} {direction}" for column in order_by)
+    # One extra row tells us whether another page exists
+    cursor = conn.execute(
+        f"{select} WHERE {' AND '.join(clauses)} ORDER BY {order} LIMIT ?",
+        bound + [page_size + 1],
+    )
+    rows = cursor.fetchall()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if direction == "DESC":
+        rows.reverse()
+    return rows, has_more
+
+
+def flight_page(conn, where="1 = 1", params=(), after=None, before=None, page_size=PAGE_SIZE,
+                include_history=False):
+    """Keyset page of flights in the list shape of get_flight(). With
+    include_history the archived flights (attached as "history") are paged too.
+    """
+    rows, has_more = fetch_page(conn, FLIGHT_DETAILS, FLIGHT_ORDER, where, params, after, before, page_size)
+    if not include_history:
+        return rows, has_more
+    # Each table seeks its own next page; the page is the nearest page_size of both
+    old_rows, old_more = fetch_page(conn, HISTORY_FLIGHT_DETAILS, FLIGHT_ORDER, where, params, after, before,
+                                    page_size)
+    rows = sorted(rows + old_rows, key=flight_key)
+    has_more = has_more or old_more or len(rows) > page_size
+    return (rows[-page_size:] if before is not None else rows[:page_size]), has_more
+
+
+def flight_key(row):
+    """Keyset position of a flight_page() row: (departure_day, flight_id)."""
+    return (epoch_day(row[2]), row[0])
+
+
+def stream_flights(conn, where="1 = 1", params=(), batch_size=STREAM_BATCH_SIZE):
+    """Yield every matching flight (get_flight() shape) in departure order."""
+    order = ", ".join(FLIGHT_ORDER)
+    cursor = conn.execute(f"{FLIGHT_DETAILS} WHERE {where} ORDER BY {order}", params)
+    yield from iter_rows(cursor, batch_size)
+
+
+def get_flight(conn, flight_id):
+    """(flight_id, flight_num, departure_date, status, dest_id, city, pilot_id, pilot_name,
+    departure_time, arrival_time), or None.
+    """
+    cursor = conn.execute(FLIGHT_DETAILS + " WHERE f.flight_id = ?", (flight_id,))
+    return cursor.fetchone()
+
+
+def flight_number_page(conn, after=None, before=None, page_size=PAGE_SIZE):
+    """Keyset page of (flight_num,) rows, served by idx_flights_flight_num."""
+    return fetch_page(conn, "SELECT f.flight_num FROM Flights f", ("f.flight_num",),
+                      after=after, before=before, page_size=page_size)
+
+
+def list_pilots(conn):
+    """(pilot_id, name, license_num)"""
+    cursor = conn.execute("SELECT pilot_id, name, license_num FROM Pilots ORDER BY pilot_id")
+    return cursor.fetchall()
+
+
+def list_destinations(conn):
+    """(dest_id, city, airport_code), ordered by city."""
+    cursor = conn.execute("SELECT dest_id, city, airport_code FROM Destinations ORDER BY city")
+    return cursor.fetchall()
+
+
+def list_destinations_with_counts(conn):
+    """(dest_id, airport_code, city, flight_count), ordered by city."""
+    cursor = conn.execute("""SELECT d.dest_id, d.airport_code, d.city, COUNT(f.flight_id)
+                             FROM Destinations d
+                             LEFT JOIN Flights f ON d.dest_id = f.dest_id
+                             GROUP BY d.dest_id, d.airport_code, d.city
+                             ORDER BY d.city""")
+    return cursor.fetchall()
+
+
+def list_cities(conn):
+    cursor = conn.execute("SELECT DISTINCT city FROM Destinations ORDER BY city")
+    return [row[0] for row in cursor.fetchall()]
+
+
+def list_statuses(conn):
+    """Status names from the FlightStatus vocabulary, by code."""
+    cursor = conn.execute("SELECT name FROM FlightStatus ORDER BY status_id")
+    return [row[0] for row in cursor.fetchall()]
+
+
+def status_codes(conn):
+    """(status_id, name) for every status, by code."""
+    return conn.execute("SELECT status_id, name FROM FlightStatus ORDER BY status_id").fetchall()
+
+
+def day_text(day):
+    """day_to_date(), remembered: listings repeat the same few hundred days."""
+    text = _day_texts.get(day)
+    if text is None:
+        text = _day_texts[day] = day_to_date(day)
+    return text
+
+
+def departure_days(conn, schema="main"):
+    """Every departure_day in use, in order. Each step seeks idx_flights_departure
+    for the next larger day, so the cost grows with the number of days rather
+    than the number of flights (a DISTINCT would read every index entry).
+    schema "history" lists the archived flights' days.
+    """
+    cursor = conn.execute(f"""WITH RECURSIVE days (day) AS (
+                                 SELECT MIN(departure_day) FROM {schema}.Flights
+                                 UNION ALL
+                                 SELECT (SELECT MIN(departure_day) FROM {schema}.Flights WHERE departure_day > days.day)
+                                 FROM days WHERE days.day IS NOT NULL
+                             )
+                             SELECT day FROM days WHERE day IS NOT NULL""")
+    return [row[0] for row in cursor.fetchall()]
+
+
+def list_departure_dates(conn):
+    return [day_text(day) for day in departure_days(conn)]
+
+
+def pilot_schedule(conn, pilot_id):
+    """Yield (flight_num, departure_date, city) for one pilot, served by idx_flights_pilot.
+    city is None for a flight without a destination.
+    """
+    # departure_day rather than the generated departure_date, which would
+    # be read from the table row instead of the covering index
+    cursor = conn.execute("""SELECT f.flight_num, f.departure_day, d.city
+                             FROM Flights f
+                             LEFT JOIN Destinations d ON f.dest_id = d.dest_id
+                             WHERE f.pilot_id = ?""", (pilot_id,))
+    for f_num, day, city in iter_rows(cursor):
+        yield f_num, day_text(day), city
+
+
+# Report queries behind view_summarised_data, also used by bulk_export.
+# They read the trigger-maintained counts tables (migration 4), so each
+# report costs O(destinations + pilots + statuses) rather than a full
+# aggregate over Flights.
+SUMMARY_QUERIES = {
+    "destinations": """SELECT d.city, COALESCE(SUM(c.flights), 0) AS flights
+                       FROM Destinations d
+                       LEFT JOIN FlightCountsByDestination c ON c.dest_id = d.dest_id
+                       GROUP BY d.city""",
+    "pilots": """SELECT p.name AS pilot, COALESCE(c.flights, 0) AS flights
+                 FROM Pilots p
+                 LEFT JOIN FlightCountsByPilot c ON c.pilot_id = p.pilot_id
+                 ORDER BY p.pilot_id""",
+    "status": """SELECT s.name AS status, c.flights
+                 FROM FlightCountsByStatus c
+                 JOIN FlightStatus s ON s.status_id = c.status_id
+                 WHERE c.flights > 0
+                 ORDER BY s.status_id""",
+}
+
+
+def summary_cursor(conn, name):
+    """Cursor over (label, flight_count) rows for one of SUMMARY_QUERIES."""
+    return conn.execute(SUMMARY_QUERIES[name])
+
+
+def summary(conn, name):
+    """Yield (label, flight_count) rows for one of SUMMARY_QUERIES."""
+    yield from iter_rows(summary_cursor(conn, name))
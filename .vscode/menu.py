@@ -0,0 +1,965 @@
+import os
+import sys
+
+import connection
+from connection import get_connection, schema_is_current
+from scheduling import clock_times, duty_error
+from validation import is_valid_date, is_valid_timestamp
+from loaders import flight_key
+from service import DuplicateError, FlightService, ServiceError, ValidationError
+from tracing import operation
+
+# Interactive shell over FlightService (service.py), started by main.py.
+# This module only prompts and prints; the rules and SQL live in the service.
+#
+# Startup touches the database once: a PRAGMA user_version read. Setup and
+# the migrations are only imported when that says they are needed.
+
+
+def ensure_database_initialised(db_file=None):
+    if db_file is not None:
+        connection.configure(db_file=db_file)
+    db_file = connection.get_db_file()
+    if not os.path.exists(db_file):
+        from db_manager import run_setup
+        run_setup(db_file)
+        return
+
+    conn = get_connection()
+    if not schema_is_current(conn):
+        # Existing databases are upgraded in place (indexes etc.) without a rebuild
+        from migrations import apply_migrations
+        apply_migrations(conn)
+
+
+def prompt_new_flight_number(service, prompt_text="\nEnter Flight Number (format: FL-XXX, e.g., FL-101): ", example="FL-101"):
+    while True:
+        f_num = input(prompt_text).strip()
+        try:
+            service.check_new_flight_number(f_num)
+        except ValidationError:
+            print(f"[Error] Invalid flight number format. Must be FL-XXX (e.g., {example})")
+            continue
+        except DuplicateError as e:
+            print(f"[Error] {e}")
+            continue
+
+        return f_num
+
+
+def prompt_existing_id(exists, prompt_text, invalid_message, not_found_message):
+    """Ask for an integer id until exists(id) is true."""
+    while True:
+        try:
+            value = int(input(prompt_text))
+        except ValueError:
+            print(invalid_message)
+            continue
+
+        if not exists(value):
+            print(not_found_message)
+            continue
+
+        return value
+
+
+def prompt_date(prompt_text, allow_blank=False, default_value=None):
+    while True:
+        value = input(prompt_text).strip()
+        if allow_blank and value == "":
+            return default_value
+        if not is_valid_date(value):
+            print("[Error] Invalid date. Please use a real date as YYYY-MM-DD (e.g., 2026-05-10)")
+            continue
+        return value
+
+
+def prompt_status(service, prompt_text, allow_blank=False, default_value=None):
+    """Pick a status from the FlightStatus list by number or by name."""
+    statuses = service.list_statuses()
+    print("Statuses: " + ", ".join(f"{idx}. {name}" for idx, name in enumerate(statuses, 1)))
+    while True:
+        choice = input(prompt_text).strip()
+        if choice == "" and allow_blank:
+            return default_value
+        if choice.isdigit() and 1 <= int(choice) <= len(statuses):
+            return statuses[int(choice) - 1]
+        for name in statuses:
+            if name.lower() == choice.lower():
+                return name
+        print(f"[Error] Please enter a number from 1 to {len(statuses)} or one of the statuses listed.")
+
+
+def prompt_times(departure_date, prompt_text):
+    """Ask for departure and arrival clock times on departure_date.
+    Returns (departure_time, arrival_time), or (None, None) if left blank.
+    """
+    while True:
+        departure = input(prompt_text).strip()
+        if departure == "":
+            return None, None
+        arrival = input("Enter arrival time (HH:MM; earlier than departure means the next day): ").strip()
+        times = clock_times(departure_date, departure, arrival)
+        if not all(is_valid_timestamp(value) for value in times):
+            print("[Error] Please enter times as HH:MM (e.g., 14:30)")
+            continue
+        error = duty_error(departure_date, *times)
+        if error:
+            print(f"[Error] {error}")
+            continue
+        return times
+
+
+def prompt_search_mode():
+    """Ask how a text filter should match. Defaults to a prefix match."""
+    print("\n1. Exact match")
+    print("2. Starts with (default)")
+    print("3. Contains text (fuzzy, slow on large tables)")
+    while True:
+        mode = input("Select search mode (1-3, or leave blank for 2): ").strip()
+        match mode:
+            case '1':
+                return "exact"
+            case '2' | '':
+                return "prefix"
+            case '3':
+                return "contains"
+            case _:
+                print("[Error] Invalid selection. Please enter 1, 2 or 3.")
+
+
+def browse_pages(fetch, key_of, print_page, empty_message="No records found."):
+    """Show rows one page at a time with next/previous navigation.
+
+    fetch(after=None, before=None) returns (rows, has_more) for the page
+    after/before a key; key_of(row) gives that key. Returns when the user
+    presses Enter, or straight away if everything fits on one page.
+    """
+    rows, has_next = fetch()
+    if not rows:
+        print(empty_message)
+        return
+
+    page = 1
+    print_page(rows)
+    while has_next or page > 1:
+        options = []
+        if has_next:
+            options.append("[n] Next page")
+        if page > 1:
+            options.append("[p] Previous page")
+        options.append("[Enter] Continue")
+        nav = input(f"\nPage {page} - " + "  ".join(options) + ": ").strip().lower()
+
+        if nav == "":
+            return
+        if nav == "n" and has_next:
+            next_rows, more = fetch(after=key_of(rows[-1]))
+            if not next_rows:
+                has_next = False
+                print("No more pages.")
+                continue
+            rows, has_next = next_rows, more
+            page += 1
+        elif nav == "p" and page > 1:
+            rows, _ = fetch(before=key_of(rows[0]))
+            page -= 1
+            has_next = True
+        else:
+            print("[Error] Invalid selection. Please try again.")
+            continue
+        print_page(rows)
+
+
+def print_flight_table(rows):
+    """Print flight_page()/get_flight() rows as the filter results table."""
+    print(f"\n{'Flight':<10} | {'Destination':<15} | {'Status':<12} | {'Date':<12} | {'Pilot'}")
+    print("-" * 75)
+    for row in rows:
+        pilot_name = row[7] if row[7] else "Unassigned"
+        print(f"{row[1]:<10} | {str(row[5]):<15} | {row[3]:<12} | {row[2]:<12} | {pilot_name}")
+
+
+def create_destination(
+    service,
+    allow_retry=True,
+    include_id=False,
+    city_prompt="Enter City Name: ",
+    code_prompt="Enter Airport Code (e.g., JFK): ",
+    normalize_code=True,
+):
+    while True:
+        city = input(city_prompt).strip()
+        airport_code = input(code_prompt).strip()
+        if normalize_code:
+            airport_code = airport_code.upper()
+        try:
+            dest_id = service.create_destination(city, airport_code)
+            if include_id:
+                print(f"\n[Success] New destination '{city}' ({airport_code}) created with ID: {dest_id}")
+            else:
+                print(f"[Success] New destination '{city}' ({airport_code}) added.")
+            return dest_id, city, airport_code
+        except DuplicateError as e:
+            print(f"[Error] {e}")
+            if allow_retry:
+                continue
+            return None
+
+
+def select_destination_id(
+    service,
+    allow_add=True,
+    allow_keep=False,
+    current_id=None,
+    allow_blank=False,
+    prompt_text="\nSelect destination (number): ",
+    invalid_number_message="[Error] Please enter a valid number.",
+    invalid_selection_message="[Error] Invalid selection. Please try again.",
+):
+    destinations = service.list_destinations()
+
+    if destinations:
+        print("Available Destinations:")
+        for idx, dest in enumerate(destinations, 1):
+            print(f"{idx}. {dest[1]} ({dest[2]})")
+        if allow_add:
+            print(f"{len(destinations) + 1}. Add a new destination")
+        if allow_keep:
+            keep_index = len(destinations) + (2 if allow_add else 1)
+            print(f"{keep_index}. Keep current destination")
+
+        while True:
+            dest_choice = input(prompt_text).strip()
+            if allow_blank and dest_choice == "":
+                return current_id
+            try:
+                dest_choice = int(dest_choice)
+            except ValueError:
+                print(invalid_number_message)
+                continue
+
+            if 1 <= dest_choice <= len(destinations):
+                return destinations[dest_choice - 1][0]
+
+            add_index = len(destinations) + 1 if allow_add else None
+            keep_index = len(destinations) + (2 if allow_add else 1) if allow_keep else None
+
+            if allow_add and dest_choice == add_index:
+                created = create_destination(service, allow_retry=True, include_id=False)
+                if created is not None:
+                    dest_id, _, _ = created
+                    return dest_id
+                continue
+
+            if allow_keep and dest_choice == keep_index:
+                return current_id
+
+            print(invalid_selection_message)
+
+    if not allow_add:
+        print("No destinations available.")
+        return current_id
+
+    if allow_keep:
+        print("No destinations available.")
+        add_new = input("Would you like to add a new destination? (yes/no): ").strip().lower()
+        if add_new != "yes":
+            return current_id
+        created = create_destination(service, allow_retry=False, include_id=False)
+        if created is None:
+            return current_id
+        dest_id, _, _ = created
+        return dest_id
+
+    print("No destinations available. You must add one first.")
+    created = create_destination(service, allow_retry=False, include_id=False)
+    if created is None:
+        return current_id
+    dest_id, _, _ = created
+    return dest_id
+
+# --- CLI FUNCTIONS --- #
+
+@operation("add_new_flight")
+def add_new_flight():
+    """Add a New Flight record to the database."""
+    print("\n" + "="*40)
+    print("   ADD NEW FLIGHT")
+    print("="*40)
+    print("1. Add a New Flight")
+    print("2. Return to Main Menu")
+    
+    choice = input("\nSelect an option (1-2): ").strip()
+    
+    match choice:
+        case '2':
+            return
+        case '1':
+            pass
+        case _:
+            print("Invalid selection.")
+            return
+    
+    service = FlightService()
+    
+    # Showing current flights so user doesn't duplicate flight numbers
+    print("\n--- Current Flights ---")
+    browse_pages(
+        lambda after=None, before=None: service.flight_number_page(after=after, before=before),
+        lambda row: (row[0],),
+        lambda rows: print(", ".join(row[0] for row in rows)),
+        empty_message="No flights currently in the system.",
+    )
+    
+    # Get and validate flight number
+    f_num = prompt_new_flight_number(service)
+    
+    # Select or add destination
+    print("\n--- Destination Selection ---")
+    dest_id = select_destination_id(service, allow_add=True, allow_keep=False)
+    if dest_id is None:
+        return
+    
+    f_date = prompt_date("Enter Departure Date (YYYY-MM-DD): ")
+    departure_time, arrival_time = prompt_times(f_date, "Enter departure time (HH:MM, or leave blank if not known): ")
+    f_status = prompt_status(service, "Enter Status (number or name): ")
+    try:
+        service.create_flight(f_num, f_date, f_status, dest_id,
+                              departure_time=departure_time, arrival_time=arrival_time)
+    except ServiceError as e:
+        print(f"\n[Error] {e}")
+        return
+    print(f"\n[Success] New flight '{f_num}' added.")
+
+@operation("view_flights_by_criteria")
+def view_flights_by_criteria():
+    """Retrieve flights based on multiple criteria like destination, status, or departure date."""
+    service = FlightService()
+    
+    print("\n--- FILTER FLIGHTS BY ---")
+    print("1. Destination City")
+    print("2. Flight Status")
+    print("3. Departure Date")
+    print("4. View All Flights")
+    print("5. Keyword Search (flight number, city, airport code or pilot)")
+    print("6. Go Back to Main Menu")
+    
+    choice = input("\nSelect filter criteria (1-6): ").strip()
+    results = None
+    
+    match choice:
+        case '1':
+            # Show available destinations
+            print("\n--- Available Destinations ---")
+            print(", ".join(service.list_cities()))
+            
+            mode = prompt_search_mode()
+            city = input("\nEnter Destination City: ").strip()
+            filters = {"city": city, "mode": mode}
+            label = "city"
+            
+        case '2':
+            # Show available statuses
+            print("\n--- Available Statuses ---")
+            print(", ".join(service.list_statuses()))
+            
+            mode = prompt_search_mode()
+            status = input("\nEnter Status: ").strip()
+            filters = {"status": status, "mode": mode}
+            label = "status"
+            
+        case '3':
+            # Show available dates
+            print("\n--- Available Departure Dates ---")
+            print(", ".join(service.list_departure_dates()))
+            
+            print("\n1. Exact date")
+            print("2. Date range (from/to)")
+            print("3. Contains text (fuzzy, slow on large tables)")
+            date_mode = input("Select search mode (1-3): ").strip()
+            
+            match date_mode:
+                case '1':
+                    dep_date = prompt_date("\nEnter Departure Date (YYYY-MM-DD): ")
+                    filters = {"departure_date": dep_date}
+                case '2':
+                    date_from = prompt_date("\nFrom date (YYYY-MM-DD, or leave blank for no limit): ", allow_blank=True)
+                    date_to = prompt_date("To date (YYYY-MM-DD, or leave blank for no limit): ", allow_blank=True)
+                    filters = {"date_from": date_from, "date_to": date_to}
+                case '3':
+                    text = input("\nEnter part of the date (e.g. 05-1): ").strip()
+                    filters = {"departure_date": text, "date_mode": "contains"}
+                case _:
+                    print("Invalid selection.")
+                    return
+            label = "date"
+            
+        case '4':
+            filters = {}
+            label = "all"
+        case '5':
+            # Ranked full-text search across flights, destinations and pilots
+            text = input("\nEnter search text (e.g. FL-10, lon, jones): ").strip()
+            with operation("search"):
+                results = service.search_flights(text)
+        case '6':
+            return
+        case _:
+            print("Invalid selection.")
+            return
+    
+    if results is None and service.has_history():
+        if input("Include archived flights? (y/N): ").strip().lower() == "y":
+            filters["include_history"] = True
+            label += ":history"
+    print(f"\n{'='*55}")
+    if results is not None:
+        # Keyword search returns an already ranked and limited list
+        print(f"RESULTS: {len(results)} best match(es)")
+        print(f"{'='*55}")
+        if results:
+            print_flight_table(results)
+        else:
+            print("No flights match your criteria.")
+    else:
+        print("RESULTS (earliest departure first)")
+        print(f"{'='*55}")
+        with operation(label):
+            browse_pages(
+                lambda after=None, before=None: service.query_flights(after=after, before=before, **filters),
+                flight_key,
+                print_flight_table,
+                empty_message="No flights match your criteria.",
+            )
+
+@operation("update_flight_information")
+def update_flight_information():
+    """Update flight schedules, such as departure time, status, or destination."""
+    print("\n" + "="*40)
+    print("  UPDATE FLIGHT INFORMATION")
+    print("="*40)
+    print("1. Update a Flight")
+    print("2. Return to Main Menu")
+    
+    choice = input("\nSelect an option (1-2): ").strip()
+    
+    match choice:
+        case '2':
+            return
+        case '1':
+            pass
+        case _:
+            print("Invalid selection.")
+            return
+    
+    service = FlightService()
+    
+    # Show available flights first
+    print("\n--- Available Flights ---")
+    def print_page(rows):
+        print(f"\n{'ID':<5} | {'Flight':<10} | {'Date':<12} | {'Status':<12} | {'Destination':<15}")
+        print("-" * 70)
+        for row in rows:
+            dest_city = row[5] or "N/A"
+            print(f"{row[0]:<5} | {row[1]:<10} | {row[2]:<12} | {row[3]:<12} | {dest_city:<15}")
+    
+    browse_pages(
+        lambda after=None, before=None: service.query_flights(after=after, before=before),
+        flight_key,
+        print_page,
+        empty_message="No flights currently in the system.",
+    )
+    
+    # Get valid Flight ID
+    f_id = prompt_existing_id(
+        service.flight_exists,
+        "\nEnter Flight ID to update (e.g. 110): ",
+        "[Error] Invalid Flight ID. Please enter a valid flight ID.",
+        "[Error] Flight ID not found. Please enter a valid Flight ID.",
+    )
+    flight = service.get_flight(f_id)
+    
+    # Get new status with validation rules
+    new_status = prompt_status(
+        service,
+        "Enter new status (number or name, or leave blank to keep current): ",
+        allow_blank=True,
+        default_value=flight[3],
+    )
+    
+    # Get new departure date with validation
+    new_date = prompt_date(
+        "Enter new departure date (YYYY-MM-DD, or leave blank to keep current): ",
+        allow_blank=True,
+        default_value=flight[2],
+    )
+    new_departure, new_arrival = prompt_times(
+        new_date, "Enter new departure time (HH:MM, or leave blank to keep current): ")
+    
+    # Get new destination with validation
+    print("\n--- Destination Update ---")
+    new_dest_id = select_destination_id(
+        service,
+        allow_add=True,
+        allow_keep=True,
+        current_id=flight[4],
+        allow_blank=True,
+        prompt_text="\nSelect destination (or leave blank to keep current): ",
+        invalid_selection_message="[Error] Invalid selection. Please enter a valid number.",
+    )
+
+    
+    # Update the flight
+    try:
+        service.update_flight(f_id, status=new_status, departure_date=new_date, dest_id=new_dest_id,
+                              departure_time=new_departure, arrival_time=new_arrival)
+    except ServiceError as e:
+        print(f"\n[Error] {e}")
+        return
+    
+    # Show the updated flight to confirm
+    updated = service.get_flight(f_id)
+    
+    if updated:
+        dest_city = updated[5] or "N/A"
+        print(f"\n[Success] Flight {updated[1]} updated!")
+        print(f"New Status: {updated[3]} | New Date: {updated[2]} | New Destination: {dest_city}")
+        if updated[8]:
+            print(f"Departs: {updated[8]} | Arrives: {updated[9]}")
+    else:
+        print("\n[Error] Flight ID not found.")
+
+@operation("assign_pilot_to_flight")
+def assign_pilot_to_flight():
+    """Assign a pilot to a flight and manage pilot schedules."""
+    print("\n" + "="*40)
+    print("  ASSIGN PILOT TO FLIGHT")
+    print("="*40)
+    print("1. Assign a Pilot to a Flight")
+    print("2. Return to Main Menu")
+    
+    choice = input("\nSelect an option (1-2): ").strip()
+    
+    match choice:
+        case '2':
+            return
+        case '1':
+            pass
+        case _:
+            print("Invalid selection.")
+            return
+    
+    service = FlightService()
+    
+    # Show available flights
+    print("\n--- Available Flights ---")
+    def print_page(rows):
+        print(f"{'ID':<5} | {'Flight':<10} | {'Date':<12} | {'Pilot'}")
+        print("-" * 60)
+        for row in rows:
+            pilot_name = row[7] if row[7] else "Unassigned"
+            print(f"{row[0]:<5} | {row[1]:<10} | {row[2]:<12} | {pilot_name}")
+    
+    browse_pages(
+        lambda after=None, before=None: service.query_flights(after=after, before=before),
+        flight_key,
+        print_page,
+        empty_message="No flights currently in the system.",
+    )
+    
+    # Show available pilots
+    print("\n--- Available Pilots ---")
+    pilots = service.list_pilots()
+    print(f"{'ID':<5} | {'Name':<20}")
+    print("-" * 30)
+    for row in pilots:
+        print(f"{row[0]:<5} | {row[1]:<20}")
+    
+    # Validate Flight ID exists
+    f_id = prompt_existing_id(
+        service.flight_exists,
+        "\nEnter Flight ID (e.g. 111): ",
+        "[Error] Invalid Flight ID. Please enter a valid flight ID.",
+        "[Error] Flight ID not found. Please enter a valid Flight ID.",
+    )
+
+    # Validate Pilot ID exists
+    p_id = prompt_existing_id(
+        service.pilot_exists,
+        "Enter Pilot ID to assign (e.g. 5): ",
+        "[Error] Invalid Pilot ID. Please enter a valid pilot ID.",
+        "[Error] Pilot ID not found. Please enter a valid Pilot ID.",
+    )
+    
+    try:
+        service.assign_pilot(f_id, p_id)
+    except ServiceError as e:
+        print(f"\n[Error] {e}")
+        return
+    
+    # Show confirmation
+    result = service.get_flight(f_id)
+    
+    if result and result[7]:
+        print(f"\n[Success] Pilot {result[7]} assigned to flight {result[1]}!")
+    else:
+        print("\n[Error] Could not assign pilot. Plase try again.")
+
+@operation("view_pilot_schedule")
+def view_pilot_schedule():
+    """Retrieve information about pilot schedules."""
+    service = FlightService()
+    
+    # Show available pilots first, optionally narrowed by a name/licence search
+    search_text = input("\nSearch pilots by name or licence (or leave blank to list all): ").strip()
+    if search_text:
+        print(f"\n--- Pilots matching '{search_text}' ---")
+        pilots = service.search_pilots(search_text)
+    else:
+        print("\n--- Available Pilots ---")
+        pilots = service.list_pilots()
+    if pilots:
+        print(f"{'ID':<5} | {'Name':<20} | {'License':<12}")
+        print("-" * 43)
+        for row in pilots:
+            print(f"{row[0]:<5} | {row[1]:<20} | {row[2]:<12}")
+    elif search_text:
+        print("No pilots match your search.")
+    else:
+        print("No pilots available.")
+    
+    p_id = prompt_existing_id(
+        service.pilot_exists,
+        "\nEnter Pilot ID to view their assigned flights: ",
+        "[Error] Invalid Pilot ID. Please enter a valid pilot ID.",
+        "[Error] Pilot ID not found. Please enter a valid Pilot ID.",
+    )
+    
+    print(f"\n--- Schedule for Pilot ID {p_id} ---")
+    found = False
+    for row in service.pilot_schedule(p_id):
+        if not found:
+            print(f"{'Flight':<10} | {'Date':<12} | {'Destination':<15}")
+            print("-" * 43)
+            found = True
+        print(f"{row[0]:<10} | {row[1]:<12} | {row[2] or 'N/A':<15}")
+    if not found:
+        print("No flights assigned to this pilot.")
+
+@operation("manage_destination_info")
+def manage_destination_info():
+    """View and update destination information, add/delete destinations."""
+    service = FlightService()
+    
+    while True:
+        print("\n" + "="*40)
+        print("   DESTINATION MANAGEMENT")
+        print("="*40)
+        print("1. View All Destinations")
+        print("2. Add New Destination")
+        print("3. Update Destination Information")
+        print("4. Delete a Destination")
+        print("5. Go Back to Main Menu")
+        
+        choice = input("\nSelect an option (1-5): ").strip()
+        
+        match choice:
+            case '1':
+                # View all destinations with flight counts
+                destinations = service.list_destinations_with_counts()
+                print(f"\n{'ID':<5} | {'Code':<8} | {'City':<20} | {'Flights'}")
+                print("-" * 50)
+                for row in destinations:
+                    print(f"{row[0]:<5} | {row[1]:<8} | {row[2]:<20} | {row[3]}")
+            
+            case '2':
+                # Add new destination
+                add_new_destination(service)
+            
+            case '3':
+                # Update destination information
+                print("\n--- Available Destinations ---")
+                destinations = service.list_destinations()
+                print(f"{'ID':<5} | {'Code':<8} | {'City'}")
+                print("-" * 40)
+                for row in destinations:
+                    print(f"{row[0]:<5} | {row[2]:<8} | {row[1]}")
+                
+                d_id = prompt_existing_id(
+                    service.destination_exists,
+                    "\nEnter Destination ID to update (e.g. 10): ",
+                    "Invalid ID. Please enter a valid destination ID.",
+                    "[Error] Destination ID not found. Please enter a valid ID.",
+                )
+                
+                print("\nWhat would you like to update?")
+                print("1. City Name")
+                print("2. Airport Code")
+                update_choice = input("Select (1-2): ")
+                
+                match update_choice:
+                    case '1':
+                        new_city = input("Enter new city name: ")
+                        service.update_destination(d_id, city=new_city)
+                        print(f"[Success] Destination city updated to: {new_city}")
+                    case '2':
+                        new_code = input("Enter new airport code: ")
+                        try:
+                            service.update_destination(d_id, airport_code=new_code)
+                        except DuplicateError as e:
+                            print(f"[Error] {e}")
+                            continue
+                        print(f"[Success] Airport code updated to: {new_code}")
+            
+            case '4':
+                # Delete a destination
+                print("\n--- Available Destinations ---")
+                destinations = service.list_destinations()
+                print(f"{'ID':<5} | {'Code':<8} | {'City'}")
+                print("-" * 40)
+                for row in destinations:
+                    print(f"{row[0]:<5} | {row[2]:<8} | {row[1]}")
+                
+                d_id = prompt_existing_id(
+                    service.destination_exists,
+                    "\nEnter Destination ID to delete: ",
+                    "Invalid ID. Please enter a valid destination ID.",
+                    "[Error] Destination ID not found. Please enter a valid ID.",
+                )
+                
+                # Check if destination has flights
+                count = service.destination_flight_count(d_id)
+                
+                policy = service.destination_delete_policy()
+                if count > 0:
+                    print(f"\n[Warning] This destination has {count} flight(s) assigned.")
+                    if policy == "restrict":
+                        print("[Error] The delete policy for destinations is 'restrict'. "
+                              "Move or remove its flights first.")
+                        continue
+                    outcome = "be deleted too" if policy == "cascade" else "be left without a destination"
+                    confirm = input(f"Delete anyway? The flights will {outcome} (yes/no): ")
+                    if confirm.lower() != 'yes':
+                        print("Deletion cancelled.")
+                        continue
+                
+                # The database applies the delete policy to the flights in the same statement
+                try:
+                    service.delete_destination(d_id, force=True)
+                except ServiceError as e:
+                    print(f"[Error] {e}")
+                    continue
+                print("[Success] Destination deleted.")
+            
+            case '5':
+                break
+            case _:
+                print("Invalid selection. Please try again.")
+
+
+def add_new_destination(service):
+    """Add a new destination and optionally assign a flight/pilot to it."""
+    created = create_destination(
+        service,
+        allow_retry=True,
+        include_id=True,
+        city_prompt="\nEnter new city name (e.g. Dublin): ",
+        code_prompt="Enter airport code (e.g. DUB): ",
+        normalize_code=False,
+    )
+    new_dest_id, new_city, _ = created
+    
+    # Ask if user wants to assign flights/pilots
+    assign_choice = input("\nWould you like to assign a flight to this destination? (yes/no): ")
+    
+    if assign_choice.lower() == 'yes':
+        print("\n1. Assign an existing flight (override previous destination)")
+        print("2. Create a new flight")
+        flight_choice = input("Select (1-2): ")
+        
+        match flight_choice:
+            case '1':
+                # Show available flights
+                def print_page(rows):
+                    for row in rows:
+                        print(f"ID: {row[0]} | Flight: {row[1]} | Date: {row[2]} | Pilot ID: {row[6]}")
+
+                print("\n--- Available Flights ---")
+                browse_pages(
+                    lambda after=None, before=None: service.query_flights(after=after, before=before),
+                    flight_key,
+                    print_page,
+                    empty_message="No flights currently in the system.",
+                )
+                
+                f_id = prompt_existing_id(
+                    service.flight_exists,
+                    "\nEnter Flight ID to assign (e.g. 111): ",
+                    "[Error] Invalid Flight ID. Please enter a valid flight ID.",
+                    "[Error] Flight ID not found. Please enter a valid Flight ID.",
+                )
+                
+                # Show available pilots
+                pilots = service.list_pilots()
+                print("\n--- Available Pilots ---")
+                for row in pilots:
+                    print(f"ID: {row[0]} | Name: {row[1]}")
+                
+                p_id = prompt_existing_id(
+                    service.pilot_exists,
+                    "\nEnter Pilot ID to assign (e.g. 5): ",
+                    "[Error] Invalid Pilot ID. Please enter a valid pilot ID.",
+                    "[Error] Pilot ID not found. Please enter a valid Pilot ID.",
+                )
+                
+                # Update flight with new destination and pilot
+                try:
+                    with service.transaction():
+                        service.update_flight(f_id, dest_id=new_dest_id)
+                        service.assign_pilot(f_id, p_id)
+                except ServiceError as e:
+                    print(f"\n[Error] {e}")
+                    return
+                
+                # Show confirmation
+                result = service.get_flight(f_id)
+                if result and result[7]:
+                    print(f"\n[Success] Flight {result[1]} assigned to {new_city} with Pilot {result[7]}")
+            
+            case '2':
+                # Create new flight
+                flight_num = prompt_new_flight_number(
+                    service,
+                    prompt_text="\nEnter flight number (e.g., FL-200): ",
+                    example="FL-200",
+                )
+
+                dep_date = prompt_date("Enter departure date (YYYY-MM-DD): ")
+                departure_time, arrival_time = prompt_times(
+                    dep_date, "Enter departure time (HH:MM, or leave blank if not known): ")
+
+                status = prompt_status(service, "Enter status (number or name): ")
+                
+                # Show available pilots
+                pilots = service.list_pilots()
+                print("\n--- Available Pilots ---")
+                for row in pilots:
+                    print(f"ID: {row[0]} | Name: {row[1]}")
+                
+                p_id = prompt_existing_id(
+                    service.pilot_exists,
+                    "\nEnter Pilot ID to assign (e.g. 5): ",
+                    "[Error] Invalid Pilot ID. Please enter a valid pilot ID.",
+                    "[Error] Pilot ID not found. Please enter a valid Pilot ID.",
+                )
+                
+                # Insert new flight
+                try:
+                    service.create_flight(flight_num, dep_date, status, new_dest_id, pilot_id=p_id,
+                                          departure_time=departure_time, arrival_time=arrival_time)
+                except ServiceError as e:
+                    print(f"\n[Error] {e}")
+                    return
+                
+                print(f"\n[Success] New flight {flight_num} created and assigned to {new_city}")
+
+
+@operation("view_summarised_data")
+def view_summarised_data():
+    """Summarise data such as number of flights per destination or flights per pilot or status,
+    or show the time-series reports (flight volume, status rates, pilot workload).
+    """
+    print("\n--- SUMMARISED REPORTS ---")
+    print("1. Flight Counts (destination, pilot, status)")
+    print("2. Daily Flight Volume per Destination")
+    print("3. Weekly Flight Volume per Destination")
+    print("4. On-time / Delayed / Cancelled Rates (rolling 7 days)")
+    print("5. Pilot Workload by Month")
+    print("6. Go Back to Main Menu")
+
+    choice = input("\nSelect report (1-6): ").strip()
+    match choice:
+        case '1': view_flight_counts()
+        case '2': view_time_series("volume", period="day")
+        case '3': view_time_series("volume", period="week")
+        case '4': view_time_series("rates")
+        case '5': view_time_series("workload")
+        case '6': return
+        case _: print("Invalid selection.")
+
+def view_flight_counts():
+    service = FlightService()
+    
+    # Summary 1: Flights per destination
+    print("\n--- Summary: Flights per Destination ---")
+    for row in service.summary("destinations"):
+        print(f"{row[0]}: {row[1]} flight(s)")
+    
+    # Summary 2: Flights per pilot
+    print("\n--- Summary: Flights per Pilot ---")
+    for row in service.summary("pilots"):
+        print(f"{row[0]}: {row[1]} flight(s)")
+
+    # Summary 3: Flights by status
+    print("\n--- Summary: Flights by Status ---")
+    for row in service.summary("status"):
+        print(f"{row[0]}: {row[1]} flight(s)")
+
+@operation("time_series")
+def view_time_series(name, **options):
+    """Print one of the analytics reports for all flights."""
+    try:
+        headers, rows = FlightService().time_series(name, **options)
+    except ServiceError as e:
+        print(f"[Error] {e}")
+        return
+    from analytics import print_table
+    print()
+    print_table(headers, rows)
+
+#--- MAIN CLI MENU --- #
+
+def main_menu():
+    while True:
+        print("\n" + "="*30)
+        print(" AIRLINE FLIGHT MANAGEMENT ")
+        print("="*30)
+        print("1. Add a New Flight")
+        print("2. View Flights by Criteria")
+        print("3. Update Flight Information")
+        print("4. Assign Pilot to Flight")
+        print("5. View Pilot Schedule")
+        print("6. Destination Management")
+        print("7. View Summarised Reports")
+        print("8. Exit")
+        
+        choice = input("\nSelect an option (1-8): ")
+        
+        match choice:
+            case '1': add_new_flight()
+            case '2': view_flights_by_criteria()
+            case '3': update_flight_information()
+            case '4': assign_pilot_to_flight()
+            case '5': view_pilot_schedule()
+            case '6': manage_destination_info()
+            case '7': view_summarised_data()
+            case '8': 
+                print("Exiting System...")
+                break
+            case _:
+                print("Invalid selection. Please try again.")
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    db_file = None
+    # argparse and the modules its help formatter loads cost ~15ms of start-up,
+    # so the plain "python main.py" launch does not import it
+    if argv:
+        import argparse
+        parser = argparse.ArgumentParser(description="Airline flight management menu.")
+        parser.add_argument("--db", help=f"database file (default: $AIRLINE_DB or {connection.DB_FILE})")
+        db_file = parser.parse_args(argv).db
+    ensure_database_initialised(db_file)
+    main_menu()
+    return 0
\ No newline at end of file
@@ -0,0 +1,511 @@
+import sqlite3
+
+from connection import SCHEMA_VERSION
+from integrity import delete_policy_trigger
+from loaders import FLIGHT_DETAILS, FLIGHT_ORDER, PAGE_SIZE
+from statuses import key_lookup_sql, seed_statement
+
+# Versioned schema changes applied on top of schema.sql.
+# The version reached so far is stored in PRAGMA user_version, so an existing
+# airline_data.db only runs the steps it has not seen yet (no rebuild needed).
+# Each entry is (version, description, list of SQL statements).
+MIGRATIONS = [
+    (1, "Secondary indexes on Flights and Destinations", [
+        # Duplicate check in prompt_new_flight_number (also enforces uniqueness)
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_flights_flight_num ON Flights (flight_num)",
+        # view_pilot_schedule: covers the whole pilot lookup without touching Flights
+        "CREATE INDEX IF NOT EXISTS idx_flights_pilot ON Flights (pilot_id, departure_date, flight_num, dest_id)",
+        # Safe delete count in manage_destination_info and destination filters
+        "CREATE INDEX IF NOT EXISTS idx_flights_dest ON Flights (dest_id, departure_date)",
+        # Date and status filters in view_flights_by_criteria
+        "CREATE INDEX IF NOT EXISTS idx_flights_departure ON Flights (departure_date)",
+        "CREATE INDEX IF NOT EXISTS idx_flights_status ON Flights (status, departure_date)",
+        "CREATE INDEX IF NOT EXISTS idx_destinations_city ON Destinations (city)",
+    ]),
+    (2, "Case-insensitive indexes for city and status search", [
+        # Exact and prefix searches compare with COLLATE NOCASE, which a
+        # BINARY index cannot serve
+        "DROP INDEX IF EXISTS idx_destinations_city",
+        "CREATE INDEX IF NOT EXISTS idx_destinations_city ON Destinations (city COLLATE NOCASE)",
+        "DROP INDEX IF EXISTS idx_flights_status",
+        "CREATE INDEX IF NOT EXISTS idx_flights_status ON Flights (status COLLATE NOCASE, departure_date)",
+    ]),
+    (3, "Full-text search indexes (FTS5) with sync triggers", [
+        # External-content tables: only the token index is stored, the text
+        # stays in the base tables. prefix='2 3' makes short prefix queries fast.
+        """CREATE VIRTUAL TABLE IF NOT EXISTS destinations_fts USING fts5(
+               city, airport_code, content='Destinations', content_rowid='dest_id', prefix='2 3')""",
+        """CREATE VIRTUAL TABLE IF NOT EXISTS pilots_fts USING fts5(
+               name, license_num, content='Pilots', content_rowid='pilot_id', prefix='2 3')""",
+        """CREATE VIRTUAL TABLE IF NOT EXISTS flights_fts USING fts5(
+               flight_num, content='Flights', content_rowid='flight_id', prefix='2 3')""",
+
+        """CREATE TRIGGER IF NOT EXISTS destinations_fts_insert AFTER INSERT ON Destinations BEGIN
+               INSERT INTO destinations_fts(rowid, city, airport_code) VALUES (new.dest_id, new.city, new.airport_code);
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS destinations_fts_delete AFTER DELETE ON Destinations BEGIN
+               INSERT INTO destinations_fts(destinations_fts, rowid, city, airport_code)
+               VALUES ('delete', old.dest_id, old.city, old.airport_code);
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS destinations_fts_update AFTER UPDATE OF city, airport_code ON Destinations BEGIN
+               INSERT INTO destinations_fts(destinations_fts, rowid, city, airport_code)
+               VALUES ('delete', old.dest_id, old.city, old.airport_code);
+               INSERT INTO destinations_fts(rowid, city, airport_code) VALUES (new.dest_id, new.city, new.airport_code);
+           END""",
+
+        """CREATE TRIGGER IF NOT EXISTS pilots_fts_insert AFTER INSERT ON Pilots BEGIN
+               INSERT INTO pilots_fts(rowid, name, license_num) VALUES (new.pilot_id, new.name, new.license_num);
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS pilots_fts_delete AFTER DELETE ON Pilots BEGIN
+               INSERT INTO pilots_fts(pilots_fts, rowid, name, license_num)
+               VALUES ('delete', old.pilot_id, old.name, old.license_num);
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS pilots_fts_update AFTER UPDATE OF name, license_num ON Pilots BEGIN
+               INSERT INTO pilots_fts(pilots_fts, rowid, name, license_num)
+               VALUES ('delete', old.pilot_id, old.name, old.license_num);
+               INSERT INTO pilots_fts(rowid, name, license_num) VALUES (new.pilot_id, new.name, new.license_num);
+           END""",
+
+        # Status/date/pilot updates do not touch flights_fts, only flight_num changes do
+        """CREATE TRIGGER IF NOT EXISTS flights_fts_insert AFTER INSERT ON Flights BEGIN
+               INSERT INTO flights_fts(rowid, flight_num) VALUES (new.flight_id, new.flight_num);
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS flights_fts_delete AFTER DELETE ON Flights BEGIN
+               INSERT INTO flights_fts(flights_fts, rowid, flight_num) VALUES ('delete', old.flight_id, old.flight_num);
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS flights_fts_update AFTER UPDATE OF flight_num ON Flights BEGIN
+               INSERT INTO flights_fts(flights_fts, rowid, flight_num) VALUES ('delete', old.flight_id, old.flight_num);
+               INSERT INTO flights_fts(rowid, flight_num) VALUES (new.flight_id, new.flight_num);
+           END""",
+
+        # Index the rows that already exist
+        "INSERT INTO destinations_fts(destinations_fts) VALUES ('rebuild')",
+        "INSERT INTO pilots_fts(pilots_fts) VALUES ('rebuild')",
+        "INSERT INTO flights_fts(flights_fts) VALUES ('rebuild')",
+    ]),
+    (4, "Materialised flight counts for the summary reports", [
+        # One row per destination / pilot / status, kept current by triggers,
+        # so view_summarised_data reads O(destinations + pilots + statuses) rows
+        # instead of aggregating the whole Flights table.
+        """CREATE TABLE IF NOT EXISTS FlightCountsByDestination (
+               dest_id INTEGER PRIMARY KEY,
+               flights INTEGER NOT NULL DEFAULT 0
+           )""",
+        """CREATE TABLE IF NOT EXISTS FlightCountsByPilot (
+               pilot_id INTEGER PRIMARY KEY,
+               flights INTEGER NOT NULL DEFAULT 0
+           )""",
+        """CREATE TABLE IF NOT EXISTS FlightCountsByStatus (
+               status TEXT PRIMARY KEY,
+               flights INTEGER NOT NULL DEFAULT 0
+           )""",
+
+        """CREATE TRIGGER IF NOT EXISTS flight_counts_insert AFTER INSERT ON Flights BEGIN
+               INSERT INTO FlightCountsByDestination (dest_id, flights) SELECT new.dest_id, 1 WHERE new.dest_id IS NOT NULL
+                   ON CONFLICT (dest_id) DO UPDATE SET flights = flights + 1;
+               INSERT INTO FlightCountsByPilot (pilot_id, flights) SELECT new.pilot_id, 1 WHERE new.pilot_id IS NOT NULL
+                   ON CONFLICT (pilot_id) DO UPDATE SET flights = flights + 1;
+               INSERT INTO FlightCountsByStatus (status, flights) VALUES (new.status, 1)
+                   ON CONFLICT (status) DO UPDATE SET flights = flights + 1;
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS flight_counts_delete AFTER DELETE ON Flights BEGIN
+               UPDATE FlightCountsByDestination SET flights = flights - 1 WHERE dest_id = old.dest_id;
+               UPDATE FlightCountsByPilot SET flights = flights - 1 WHERE pilot_id = old.pilot_id;
+               UPDATE FlightCountsByStatus SET flights = flights - 1 WHERE status = old.status;
+           END""",
+        # Separate update triggers so e.g. a status change only touches the status counts
+        """CREATE TRIGGER IF NOT EXISTS flight_counts_update_dest AFTER UPDATE OF dest_id ON Flights
+           WHEN old.dest_id IS NOT new.dest_id BEGIN
+               UPDATE FlightCountsByDestination SET flights = flights - 1 WHERE dest_id = old.dest_id;
+               INSERT INTO FlightCountsByDestination (dest_id, flights) SELECT new.dest_id, 1 WHERE new.dest_id IS NOT NULL
+                   ON CONFLICT (dest_id) DO UPDATE SET flights = flights + 1;
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS flight_counts_update_pilot AFTER UPDATE OF pilot_id ON Flights
+           WHEN old.pilot_id IS NOT new.pilot_id BEGIN
+               UPDATE FlightCountsByPilot SET flights = flights - 1 WHERE pilot_id = old.pilot_id;
+               INSERT INTO FlightCountsByPilot (pilot_id, flights) SELECT new.pilot_id, 1 WHERE new.pilot_id IS NOT NULL
+                   ON CONFLICT (pilot_id) DO UPDATE SET flights = flights + 1;
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS flight_counts_update_status AFTER UPDATE OF status ON Flights
+           WHEN old.status IS NOT new.status BEGIN
+               UPDATE FlightCountsByStatus SET flights = flights - 1 WHERE status = old.status;
+               INSERT INTO FlightCountsByStatus (status, flights) VALUES (new.status, 1)
+                   ON CONFLICT (status) DO UPDATE SET flights = flights + 1;
+           END""",
+
+        # Seed the counts from the rows that already exist
+        "INSERT INTO FlightCountsByDestination (dest_id, flights) SELECT dest_id, COUNT(*) FROM Flights WHERE dest_id IS NOT NULL GROUP BY dest_id",
+        "INSERT INTO FlightCountsByPilot (pilot_id, flights) SELECT pilot_id, COUNT(*) FROM Flights WHERE pilot_id IS NOT NULL GROUP BY pilot_id",
+        "INSERT INTO FlightCountsByStatus (status, flights) SELECT status, COUNT(*) FROM Flights GROUP BY status",
+    ]),
+    (5, "Departure and arrival times with a pilot duty index", [
+        # 'YYYY-MM-DD HH:MM'; NULL for flights that only have a departure_date
+        "ALTER TABLE Flights ADD COLUMN departure_time TEXT",
+        "ALTER TABLE Flights ADD COLUMN arrival_time TEXT",
+        # Duty conflict checks in scheduling.py: one range seek per pilot.
+        # Partial, so untimed legacy rows do not bloat it.
+        """CREATE INDEX IF NOT EXISTS idx_flights_pilot_duty ON Flights (pilot_id, departure_time, arrival_time)
+           WHERE departure_time IS NOT NULL""",
+    ]),
+    (6, "Status batches with the previous values for rollback", [
+        # One row per mass status change; filters is the JSON of the predicates used
+        """CREATE TABLE IF NOT EXISTS StatusBatches (
+               batch_id INTEGER PRIMARY KEY AUTOINCREMENT,
+               created_at TEXT NOT NULL DEFAULT (datetime('now')),
+               new_status TEXT NOT NULL,
+               filters TEXT NOT NULL,
+               affected INTEGER NOT NULL DEFAULT 0,
+               rolled_back_at TEXT
+           )""",
+        # The status each flight had before the batch, clustered by batch for the rollback
+        """CREATE TABLE IF NOT EXISTS StatusBatchItems (
+               batch_id INTEGER NOT NULL REFERENCES StatusBatches (batch_id) ON DELETE CASCADE,
+               flight_id INTEGER NOT NULL,
+               old_status TEXT NOT NULL,
+               PRIMARY KEY (batch_id, flight_id)
+           ) WITHOUT ROWID""",
+    ]),
+    (7, "Append-only change log for flights and destinations", [
+        """CREATE TABLE IF NOT EXISTS AuditLog (
+               audit_id INTEGER PRIMARY KEY,
+               changed_at TEXT NOT NULL,
+               actor TEXT,
+               entity TEXT NOT NULL,
+               entity_id INTEGER NOT NULL,
+               action TEXT NOT NULL,
+               old_values TEXT,
+               new_values TEXT
+           )""",
+        # History of one flight/destination, newest first
+        "CREATE INDEX IF NOT EXISTS idx_audit_entity ON AuditLog (entity, entity_id, audit_id)",
+        # Everything changed in a time window
+        "CREATE INDEX IF NOT EXISTS idx_audit_changed_at ON AuditLog (changed_at)",
+        """CREATE TRIGGER IF NOT EXISTS audit_log_append_only BEFORE UPDATE ON AuditLog BEGIN
+               SELECT RAISE(ABORT, 'AuditLog is append-only');
+           END""",
+    ]),
+    (8, "Configurable ON DELETE policies for destinations and pilots", [
+        """CREATE TABLE IF NOT EXISTS DeletePolicies (
+               parent TEXT PRIMARY KEY,
+               on_delete TEXT NOT NULL CHECK (on_delete IN ('restrict', 'set null', 'cascade'))
+           )""",
+        # The behaviour FlightService already had: deleting a destination
+        # detaches its flights, and pilots with flights cannot be deleted
+        "INSERT OR IGNORE INTO DeletePolicies (parent, on_delete) VALUES ('Destinations', 'set null'), ('Pilots', 'restrict')",
+        delete_policy_trigger("Destinations"),
+        delete_policy_trigger("Pilots"),
+    ]),
+    (9, "Version counters for the reference data cache", [
+        # One counter per cached table (see refcache.py), bumped by every write
+        """CREATE TABLE IF NOT EXISTS ReferenceVersions (
+               name TEXT PRIMARY KEY,
+               version INTEGER NOT NULL DEFAULT 0
+           )""",
+        "INSERT OR IGNORE INTO ReferenceVersions (name) VALUES ('Destinations'), ('Pilots'), ('Statuses')",
+        *[f"""CREATE TRIGGER IF NOT EXISTS {table.lower()}_version_{event.lower()} AFTER {event} ON {table} BEGIN
+                  UPDATE ReferenceVersions SET version = version + 1 WHERE name = '{table}';
+              END"""
+          for table in ("Destinations", "Pilots") for event in ("INSERT", "UPDATE", "DELETE")],
+        # The status vocabulary only changes when a status gains its first
+        # flight or loses its last one, not on every status update
+        """CREATE TRIGGER IF NOT EXISTS statuses_version_insert AFTER INSERT ON FlightCountsByStatus BEGIN
+               UPDATE ReferenceVersions SET version = version + 1 WHERE name = 'Statuses';
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS statuses_version_update AFTER UPDATE OF flights ON FlightCountsByStatus
+           WHEN (old.flights > 0) <> (new.flights > 0) BEGIN
+               UPDATE ReferenceVersions SET version = version + 1 WHERE name = 'Statuses';
+           END""",
+    ]),
+    (10, "Status lookup table with integer codes", [
+        # Names are unique ignoring case, so case variants are one status
+        """CREATE TABLE IF NOT EXISTS FlightStatus (
+               status_id INTEGER PRIMARY KEY,
+               name TEXT NOT NULL UNIQUE COLLATE NOCASE
+           )""",
+        seed_statement(),
+
+        # raw text value -> code, for every value in Flights and the status batches.
+        # Known spellings get the standard code (see statuses.py); the rest get
+        # a status of their own, named after the most common spelling.
+        "CREATE TEMP TABLE status_map (raw TEXT PRIMARY KEY, flights INTEGER NOT NULL, status_id INTEGER)",
+        f"""INSERT INTO temp.status_map (raw, flights, status_id)
+            SELECT raw, SUM(flights), {key_lookup_sql("raw")}
+            FROM (SELECT status AS raw, COUNT(*) AS flights FROM Flights GROUP BY status
+                  UNION ALL SELECT new_status, 0 FROM StatusBatches
+                  UNION ALL SELECT old_status, 0 FROM StatusBatchItems)
+            GROUP BY raw""",
+        """INSERT OR IGNORE INTO FlightStatus (name)
+           SELECT trim(raw) FROM temp.status_map WHERE status_id IS NULL ORDER BY flights DESC, raw""",
+        """UPDATE temp.status_map SET status_id = (SELECT status_id FROM FlightStatus WHERE name = trim(raw))
+           WHERE status_id IS NULL""",
+
+        "ALTER TABLE Flights ADD COLUMN status_id INTEGER REFERENCES FlightStatus (status_id)",
+        "UPDATE Flights SET status_id = (SELECT status_id FROM temp.status_map WHERE raw = Flights.status)",
+        "ALTER TABLE StatusBatches ADD COLUMN new_status_id INTEGER",
+        "UPDATE StatusBatches SET new_status_id = (SELECT status_id FROM temp.status_map WHERE raw = new_status)",
+        "ALTER TABLE StatusBatchItems ADD COLUMN old_status_id INTEGER",
+        "UPDATE StatusBatchItems SET old_status_id = (SELECT status_id FROM temp.status_map WHERE raw = old_status)",
+        "DROP TABLE temp.status_map",
+
+        # The text column can only be dropped once nothing refers to it
+        "DROP TRIGGER IF EXISTS flight_counts_insert",
+        "DROP TRIGGER IF EXISTS flight_counts_delete",
+        "DROP TRIGGER IF EXISTS flight_counts_update_status",
+        "DROP INDEX IF EXISTS idx_flights_status",
+        "ALTER TABLE Flights DROP COLUMN status",
+        "ALTER TABLE StatusBatches DROP COLUMN new_status",
+        "ALTER TABLE StatusBatchItems DROP COLUMN old_status",
+        "CREATE INDEX IF NOT EXISTS idx_flights_status ON Flights (status_id, departure_date)",
+
+        # ALTER TABLE cannot add a NOT NULL column with a foreign key, so a trigger enforces it
+        """CREATE TRIGGER IF NOT EXISTS flights_status_required_insert BEFORE INSERT ON Flights
+           WHEN new.status_id IS NULL BEGIN
+               SELECT RAISE(ABORT, 'NOT NULL constraint failed: Flights.status_id');
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS flights_status_required_update BEFORE UPDATE OF status_id ON Flights
+           WHEN new.status_id IS NULL BEGIN
+               SELECT RAISE(ABORT, 'NOT NULL constraint failed: Flights.status_id');
+           END""",
+
+        # Status counts keyed by code (this also drops migration 9's triggers on the old table)
+        "DROP TABLE IF EXISTS FlightCountsByStatus",
+        """CREATE TABLE FlightCountsByStatus (
+               status_id INTEGER PRIMARY KEY,
+               flights INTEGER NOT NULL DEFAULT 0
+           )""",
+        "INSERT INTO FlightCountsByStatus (status_id, flights) SELECT status_id, COUNT(*) FROM Flights GROUP BY status_id",
+        """CREATE TRIGGER IF NOT EXISTS flight_counts_insert AFTER INSERT ON Flights BEGIN
+               INSERT INTO FlightCountsByDestination (dest_id, flights) SELECT new.dest_id, 1 WHERE new.dest_id IS NOT NULL
+                   ON CONFLICT (dest_id) DO UPDATE SET flights = flights + 1;
+               INSERT INTO FlightCountsByPilot (pilot_id, flights) SELECT new.pilot_id, 1 WHERE new.pilot_id IS NOT NULL
+                   ON CONFLICT (pilot_id) DO UPDATE SET flights = flights + 1;
+               INSERT INTO FlightCountsByStatus (status_id, flights) VALUES (new.status_id, 1)
+                   ON CONFLICT (status_id) DO UPDATE SET flights = flights + 1;
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS flight_counts_delete AFTER DELETE ON Flights BEGIN
+               UPDATE FlightCountsByDestination SET flights = flights - 1 WHERE dest_id = old.dest_id;
+               UPDATE FlightCountsByPilot SET flights = flights - 1 WHERE pilot_id = old.pilot_id;
+               UPDATE FlightCountsByStatus SET flights = flights - 1 WHERE status_id = old.status_id;
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS flight_counts_update_status AFTER UPDATE OF status_id ON Flights
+           WHEN old.status_id IS NOT new.status_id BEGIN
+               UPDATE FlightCountsByStatus SET flights = flights - 1 WHERE status_id = old.status_id;
+               INSERT INTO FlightCountsByStatus (status_id, flights) VALUES (new.status_id, 1)
+                   ON CONFLICT (status_id) DO UPDATE SET flights = flights + 1;
+           END""",
+
+        # The cached status list is now the vocabulary itself
+        *[f"""CREATE TRIGGER IF NOT EXISTS statuses_version_{event.lower()} AFTER {event} ON FlightStatus BEGIN
+                  UPDATE ReferenceVersions SET version = version + 1 WHERE name = 'Statuses';
+              END"""
+          for event in ("INSERT", "UPDATE", "DELETE")],
+        "UPDATE ReferenceVersions SET version = version + 1 WHERE name = 'Statuses'",
+    ]),
+    (11, "Departure dates stored as integer day numbers", [
+        # Days since 1970-01-01 (validation.epoch_day): 1-3 byte integers instead
+        # of 10 characters of text, compared as numbers. ALTER TABLE cannot
+        # add a NOT NULL or CHECK column here, so triggers enforce both.
+        "ALTER TABLE Flights ADD COLUMN departure_day INTEGER",
+        """CREATE TRIGGER IF NOT EXISTS flights_departure_day_insert BEFORE INSERT ON Flights
+           WHEN typeof(new.departure_day) <> 'integer' BEGIN
+               SELECT RAISE(ABORT, 'Flights.departure_day must be a whole number of days since 1970-01-01');
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS flights_departure_day_update BEFORE UPDATE OF departure_day ON Flights
+           WHEN typeof(new.departure_day) <> 'integer' BEGIN
+               SELECT RAISE(ABORT, 'Flights.departure_day must be a whole number of days since 1970-01-01');
+           END""",
+        # Text that is not a real calendar date ('2026-13-45', or '2026-02-30',
+        # which julianday() rolls over into March) converts to NULL, so the
+        # update trigger stops the migration; apply_migrations() lists the rows
+        """UPDATE Flights SET departure_day = CASE WHEN date(julianday(departure_date)) IS departure_date
+                                                THEN CAST(julianday(departure_date) - 2440587.5 AS INTEGER) END""",
+
+        # The text column becomes a generated one for display and the
+        # existing readers; 2440587.5 is the Julian day of 1970-01-01
+        "DROP INDEX IF EXISTS idx_flights_pilot",
+        "DROP INDEX IF EXISTS idx_flights_dest",
+        "DROP INDEX IF EXISTS idx_flights_departure",
+        "DROP INDEX IF EXISTS idx_flights_status",
+        "ALTER TABLE Flights DROP COLUMN departure_date",
+        "ALTER TABLE Flights ADD COLUMN departure_date TEXT GENERATED ALWAYS AS (date(departure_day + 2440587.5)) VIRTUAL",
+        "CREATE INDEX IF NOT EXISTS idx_flights_pilot ON Flights (pilot_id, departure_day, flight_num, dest_id)",
+        "CREATE INDEX IF NOT EXISTS idx_flights_dest ON Flights (dest_id, departure_day)",
+        "CREATE INDEX IF NOT EXISTS idx_flights_departure ON Flights (departure_day)",
+        "CREATE INDEX IF NOT EXISTS idx_flights_status ON Flights (status_id, departure_day)",
+    ]),
+]
+
+# Flight listings in menu.py are keyset pages in departure order
+_PAGE = " ORDER BY " + ", ".join(FLIGHT_ORDER) + f" LIMIT {PAGE_SIZE + 1}"
+
+# Hot queries from menu.py and the index each one is expected to use.
+# Used by check_query_plans() to confirm the planner actually picks them up.
+HOT_QUERIES = [
+    ("prompt_new_flight_number",
+     "SELECT flight_num FROM Flights WHERE flight_num = ?", ("FL-101",),
+     "idx_flights_flight_num"),
+    ("view_pilot_schedule",
+     """SELECT f.flight_num, f.departure_date, d.city
+        FROM Flights f
+        LEFT JOIN Destinations d ON f.dest_id = d.dest_id
+        WHERE f.pilot_id = ?""", (1,),
+     "idx_flights_pilot"),
+    ("manage_destination_info:delete",
+     "SELECT COUNT(*) FROM Flights WHERE dest_id = ?", (1,),
+     "idx_flights_dest"),
+    ("view_flights_by_criteria:city",
+     FLIGHT_DETAILS + " WHERE d.city = ? COLLATE NOCASE" + _PAGE, ("London",),
+     "idx_destinations_city"),
+    ("view_flights_by_criteria:city_prefix",
+     FLIGHT_DETAILS + " WHERE d.city >= ? COLLATE NOCASE AND d.city < ? COLLATE NOCASE" + _PAGE, ("lon", "loo"),
+     "idx_destinations_city"),
+    ("view_flights_by_criteria:status",
+     FLIGHT_DETAILS + " WHERE f.status_id = ?" + _PAGE, (1,),
+     "idx_flights_status"),
+    ("view_flights_by_criteria:date",
+     FLIGHT_DETAILS + " WHERE f.departure_day = ?" + _PAGE, (20583,),
+     "idx_flights_departure"),
+    ("view_flights_by_criteria:date_range",
+     FLIGHT_DETAILS + " WHERE f.departure_day >= ? AND f.departure_day <= ?" + _PAGE, (20574, 20604),
+     "idx_flights_departure"),
+    ("browse_pages:next_page",
+     FLIGHT_DETAILS + " WHERE (f.departure_day, f.flight_id) > (?, ?)" + _PAGE, (20583, 101),
+     "idx_flights_departure"),
+    ("view_flights_by_criteria:date_contains",
+     """WITH RECURSIVE days (day) AS (
+            SELECT MIN(departure_day) FROM Flights
+            UNION ALL
+            SELECT (SELECT MIN(departure_day) FROM Flights WHERE departure_day > days.day)
+            FROM days WHERE days.day IS NOT NULL
+        )
+        SELECT day FROM days WHERE day IS NOT NULL""", (),
+     "idx_flights_departure"),
+    ("assign_pilot:timed_conflicts",
+     """SELECT flight_id, flight_num, departure_date, departure_time, arrival_time FROM Flights
+        WHERE pilot_id = ? AND departure_time > ? AND departure_time < ?""", (1, "2026-05-09 06:00", "2026-05-11 08:00"),
+     "idx_flights_pilot_duty"),
+    ("assign_pilot:untimed_conflicts",
+     """SELECT flight_id, flight_num, departure_date, departure_time, arrival_time FROM Flights
+        WHERE pilot_id = ? AND departure_day >= ? AND departure_day <= ? AND departure_time IS NULL""",
+     (1, 20582, 20584),
+     "idx_flights_pilot"),
+    ("integrity:orphan_destinations",
+     """SELECT c.dest_id, COUNT(*) FROM Flights c INDEXED BY idx_flights_dest
+        WHERE c.dest_id IS NOT NULL AND NOT EXISTS (SELECT 1 FROM Destinations p WHERE p.dest_id = c.dest_id)
+        GROUP BY c.dest_id""", (),
+     "idx_flights_dest"),
+    ("audit:flight_history",
+     """SELECT audit_id, changed_at, actor, action, old_values, new_values FROM AuditLog
+        WHERE entity = ? AND entity_id = ? ORDER BY audit_id DESC LIMIT 100""", ("flight", 101),
+     "idx_audit_entity"),
+    ("audit:recent_changes",
+     """SELECT audit_id, changed_at, actor, entity, entity_id, action, old_values, new_values FROM AuditLog
+        WHERE changed_at >= ? AND changed_at < COALESCE(?, '9999') ORDER BY changed_at DESC LIMIT 100""",
+     ("2026-05-10 12:00:00", None),
+     "idx_audit_changed_at"),
+]
+
+
+# Startup skips this module when user_version already matches connection.SCHEMA_VERSION
+assert MIGRATIONS[-1][0] == SCHEMA_VERSION, "connection.SCHEMA_VERSION must match the last migration"
+
+
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def latest_version():
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+def find_duplicate_flight_numbers(conn):
+    cursor = conn.execute("""SELECT flight_num, COUNT(*)
+                             FROM Flights
+                             GROUP BY flight_num
+                             HAVING COUNT(*) > 1""")
+    return cursor.fetchall()
+
+
+def find_invalid_departure_dates(conn):
+    """(flight_id, flight_num, departure_date) of text dates migration 11 cannot convert."""
+    if get_schema_version(conn) >= 11:
+        # Dates are day numbers, kept valid by their triggers
+        return []
+    cursor = conn.execute("""SELECT flight_id, flight_num, departure_date
+                             FROM Flights
+                             WHERE date(julianday(departure_date)) IS NOT departure_date
+                             ORDER BY flight_id""")
+    return cursor.fetchall()
+
+
+def apply_migrations(conn, verbose=True):
+    """Bring the database up to the latest schema version.
+
+    Each migration runs in its own transaction together with the
+    user_version bump, so a failed step leaves the database on the
+    previous version. Returns the version the database ends up on.
+    """
+    current = get_schema_version(conn)
+
+    for version, description, statements in MIGRATIONS:
+        if version <= current:
+            continue
+
+        try:
+            conn.execute("BEGIN")
+            for statement in statements:
+                conn.execute(statement)
+            # PRAGMA does not accept bound parameters; version is an int from MIGRATIONS
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+        except sqlite3.IntegrityError as e:
+            conn.rollback()
+            if verbose:
+                print(f"[Error] Migration {version} ({description}) failed: {e}")
+                duplicates = find_duplicate_flight_numbers(conn)
+                if duplicates:
+                    print("Duplicate flight numbers found:")
+                    for f_num, count in duplicates:
+                        print(f"  {f_num}: {count} rows")
+                    print("Rename or remove the duplicates and run the migration again.")
+                invalid = find_invalid_departure_dates(conn)
+                if invalid:
+                    print("Flights with a departure date that is not a real YYYY-MM-DD date:")
+                    for f_id, f_num, dep_date in invalid:
+                        print(f"  {f_id} {f_num}: {dep_date!r}")
+                    print("Correct or remove these flights and run the migration again.")
+            return current
+        except sqlite3.Error as e:
+            conn.rollback()
+            if verbose:
+                print(f"[Error] Migration {version} ({description}) failed: {e}")
+            return current
+
+        current = version
+        if verbose:
+            print(f"Applied migration {version}: {description}")
+
+    return current
+
+
+def explain_query(conn, sql, params=()):
+    """Return the detail column of EXPLAIN QUERY PLAN for a statement."""
+    cursor = conn.execute("EXPLAIN QUERY PLAN " + sql, params)
+    return [row[3] for row in cursor.fetchall()]
+
+
+def check_query_plans(conn, verbose=True):
+    """Confirm each hot query uses its index. Returns a list of failing query names."""
+    failures = []
+    for name, sql, params, index_name in HOT_QUERIES:
+        plan = explain_query(conn, sql, params)
+        uses_index = any(index_name in detail for detail in plan)
+        if not uses_index:
+            failures.append(name)
+        if verbose:
+            result = "OK" if uses_index else "MISSING"
+            print(f"[{result}] {name:<40} expects {index_name}")
+            if not uses_index:
+                for detail in plan:
+                    print(f"        {detail}")
+    return failures
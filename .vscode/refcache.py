@@ -0,0 +1,88 @@
+import sqlite3
+import threading
+from collections import OrderedDict
+
+# Process-wide read-through cache for reference data (migration 9).
+#
+# Destinations, pilots and the status vocabulary are read by nearly every
+# menu action but change rarely. Each cached result is stored with the
+# version of the table it came from; ReferenceVersions holds one counter per
+# table, bumped by triggers on every write (whoever makes it, in this
+# process or another). A lookup costs one primary-key read of the counter
+# and is a hit while the counter has not moved, so create_destination and
+# destination updates/deletes invalidate the cached copies as they commit.
+#
+# "Statuses" is the FlightStatus vocabulary: since migration 10 its
+# counter is bumped by triggers on FlightStatus inserts, updates and
+# deletes, so changing a flight's status never invalidates it.
+#
+# Entries are evicted least recently used beyond MAX_ENTRIES, and results
+# longer than MAX_ROWS are not kept. Results read inside an open
+# transaction are never stored, since a rollback would undo their version.
+
+MAX_ENTRIES = 64
+MAX_ROWS = 50000
+TABLES = ("Destinations", "Pilots", "Statuses")
+
+
+def table_version(conn, table):
+    """Current version of a cached table, or None if the database has no version counters."""
+    try:
+        row = conn.execute("SELECT version FROM ReferenceVersions WHERE name = ?", (table,)).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else None
+
+
+def database_key(conn):
+    """Path of the main database file, or None for an in-memory database."""
+    for _, name, path in conn.execute("PRAGMA database_list"):
+        if name == "main":
+            return path or None
+    return None
+
+
+class ReferenceCache:
+    """LRU map of (database, table, query) to rows, checked against table_version()."""
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_rows=MAX_ROWS):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, conn, db_key, table, query, load):
+        """Rows for query (any hashable key) on table, from the cache or from load(conn)."""
+        version = table_version(conn, table) if db_key is not None else None
+        if version is None:
+            return load(conn)
+        key = (db_key, table, query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(entry[1])
+            self.misses += 1
+
+        rows = load(conn)
+        if len(rows) <= self.max_rows and not conn.in_transaction:
+            with self._lock:
+                self._entries[key] = (version, tuple(rows))
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return rows
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+reference_cache = ReferenceCache()
@@ -0,0 +1,247 @@
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from connection import DB_FILE, open_connection
+from loaders import SUMMARY_QUERIES, departure_days, status_codes
+from validation import day_to_date
+
+# Nightly report run: every summary report plus per-destination, per-pilot
+# and per-day breakdowns, written as CSV files to one directory.
+#
+# The work is cut into tasks and run on a ProcessPoolExecutor, so reports
+# use every core instead of one connection's worth. The breakdowns are
+# sharded by key range (dest_id, pilot_id, departure_day): each shard is
+# one GROUP BY over an index range of Flights. Shards are balanced by the
+# trigger-maintained flight counts (one count per destination or pilot,
+# one per day for the day breakdown), and there are SHARDS_PER_WORKER per
+# worker so a slow shard does not leave the other workers idle at the end.
+# The summary and time-series reports are one task each.
+#
+# Each worker process opens its own read-only connection (file:...?mode=ro),
+# so a report run can never change the database. Results come back in
+# task order (executor.map), and shards cover ascending, disjoint key
+# ranges, so the files are identical whatever the number of workers or
+# the order in which tasks finish. Each task reads its own snapshot: run
+# the reports while no one is writing, or against a copy, for figures that
+# agree across files.
+#
+# With --workers 1 every task runs in this process, one after another on
+# one connection.
+#
+#     python reports.py -o reports/
+#     python reports.py -o reports/ --workers 8 --only destinations pilots
+
+SHARDS_PER_WORKER = 4
+# Time-series reports with their analytics.py options; all periods are written
+TIME_SERIES = {
+    "volume-day": ("volume", {"period": "day", "last": sys.maxsize}),
+    "volume-week": ("volume", {"period": "week", "last": sys.maxsize}),
+    "rates": ("rates", {"last": sys.maxsize}),
+    "workload": ("workload", {}),
+}
+# Breakdown name -> (Flights key column, query for the entities in a key range
+# (None: the keys themselves), entity headers, whether rows show first/last departure)
+BREAKDOWNS = {
+    "destinations": ("dest_id", """SELECT dest_id, city, airport_code FROM Destinations
+                                   WHERE dest_id >= ? AND dest_id < ? ORDER BY dest_id""",
+                     ["dest_id", "city", "airport_code"], True),
+    "pilots": ("pilot_id", """SELECT pilot_id, name, license_num FROM Pilots
+                              WHERE pilot_id >= ? AND pilot_id < ? ORDER BY pilot_id""",
+               ["pilot_id", "pilot", "license_num"], True),
+    "days": ("departure_day", None, ["date"], False),
+}
+# Per-key flight weights that balance the shards; days count one each
+SHARD_WEIGHTS = {
+    "destinations": """SELECT d.dest_id, COALESCE(c.flights, 0) FROM Destinations d
+                       LEFT JOIN FlightCountsByDestination c ON c.dest_id = d.dest_id ORDER BY d.dest_id""",
+    "pilots": """SELECT p.pilot_id, COALESCE(c.flights, 0) FROM Pilots p
+                 LEFT JOIN FlightCountsByPilot c ON c.pilot_id = p.pilot_id ORDER BY p.pilot_id""",
+}
+REPORT_NAMES = tuple(BREAKDOWNS) + tuple(TIME_SERIES) + tuple(f"summary-{name}" for name in SUMMARY_QUERIES)
+
+# This worker process's read-only connection
+_worker = {"conn": None}
+
+
+def split_ranges(weights, count):
+    """Cut ordered (key, weight) pairs into up to count [low, high) key ranges
+    of about equal weight. Each key also weighs 1, for its own output row.
+    """
+    weights = [(key, weight + 1) for key, weight in weights]
+    total = sum(weight for _, weight in weights)
+    ranges = []
+    low = None
+    done = 0
+    for key, weight in weights:
+        if low is None:
+            low = key
+        done += weight
+        if done * count >= total * (len(ranges) + 1):
+            ranges.append((low, key + 1))
+            low = None
+    if low is not None:
+        ranges.append((low, weights[-1][0] + 1))
+    return ranges
+
+
+def plan_tasks(conn, names, shards):
+    """(report, low, high) tasks for the named reports: the breakdowns first,
+    each cut into up to shards key ranges, then one task per other report.
+    """
+    tasks = []
+    for name in names:
+        if name in BREAKDOWNS:
+            if name == "days":
+                weights = [(day, 0) for day in departure_days(conn)]
+            else:
+                weights = conn.execute(SHARD_WEIGHTS[name]).fetchall()
+            # An empty table still gets its file, with the headers only
+            tasks += [(name, low, high) for low, high in split_ranges(weights, shards) or [(0, 0)]]
+    return tasks + [(name, None, None) for name in names if name not in BREAKDOWNS]
+
+
+def breakdown(conn, name, low, high):
+    """(headers, rows) of one key range of a breakdown: flights in total and
+    per status (and the first and last departure) for each key.
+    """
+    key, entity_query, entity_headers, dated = BREAKDOWNS[name]
+    statuses = status_codes(conn)
+    counts = {}
+    for key_value, status_id, flights, first, last in conn.execute(
+            f"""SELECT {key}, status_id, COUNT(*), MIN(departure_day), MAX(departure_day)
+                FROM Flights WHERE {key} >= ? AND {key} < ?
+                GROUP BY {key}, status_id""", (low, high)):
+        total, by_status, first_day, last_day = counts.get(key_value, (0, {}, first, last))
+        by_status[status_id] = flights
+        counts[key_value] = (total + flights, by_status, min(first, first_day), max(last, last_day))
+
+    if entity_query is None:
+        entities = [[day_to_date(day)] for day in sorted(counts)]
+        keys = sorted(counts)
+    else:
+        entities = [list(row) for row in conn.execute(entity_query, (low, high))]
+        keys = [row[0] for row in entities]
+    headers = entity_headers + ["flights"] + [status for _, status in statuses]
+    if dated:
+        headers += ["first_departure", "last_departure"]
+    rows = []
+    for entity, key_value in zip(entities, keys):
+        total, by_status, first, last = counts.get(key_value, (0, {}, None, None))
+        row = entity + [total] + [by_status.get(status_id, 0) for status_id, _ in statuses]
+        if dated:
+            row += [day_to_date(first) if first is not None else "", day_to_date(last) if last is not None else ""]
+        rows.append(row)
+    return headers, rows
+
+
+def run_report(conn, name, low=None, high=None):
+    """(headers, rows) of one task."""
+    if name in BREAKDOWNS:
+        return breakdown(conn, name, low, high)
+    if name in TIME_SERIES:
+        import analytics  # NumPy is only needed for these
+        report, options = TIME_SERIES[name]
+        return analytics.REPORTS[report][0](conn, **options)
+    cursor = conn.execute(SUMMARY_QUERIES[name.removeprefix("summary-")])
+    return [description[0] for description in cursor.description], cursor.fetchall()
+
+
+def _open_worker(db_file):
+    _worker["conn"] = open_connection(db_file, read_only=True)
+
+
+def _run_task(task):
+    """Worker entry point: (headers, rows, seconds) of one task."""
+    start = time.perf_counter()
+    headers, rows = run_report(_worker["conn"], *task)
+    return headers, rows, time.perf_counter() - start
+
+
+def run_reports(db_file, out_dir, names=REPORT_NAMES, workers=None, shards_per_worker=SHARDS_PER_WORKER):
+    """Write each named report to <out_dir>/<name>.csv using workers processes.
+
+    Returns {name: (rows, tasks)} and the seconds spent inside tasks, whose
+    ratio to the elapsed time shows how many workers were busy on average.
+    """
+    workers = workers or os.cpu_count() or 1
+    conn = open_connection(db_file, read_only=True)
+    try:
+        tasks = plan_tasks(conn, names, workers * shards_per_worker if workers > 1 else 1)
+        if workers == 1:
+            _worker["conn"] = conn
+            try:
+                return _write_results(out_dir, tasks, map(_run_task, tasks))
+            finally:
+                _worker["conn"] = None
+    finally:
+        # Closed before the pool starts: a connection must not cross a fork
+        conn.close()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_open_worker, initargs=(db_file,)) as executor:
+        return _write_results(out_dir, tasks, executor.map(_run_task, tasks))
+
+
+def _write_results(out_dir, tasks, results):
+    """Append each task's rows to its report's file, in task order."""
+    os.makedirs(out_dir, exist_ok=True)
+    written = {}
+    task_seconds = 0.0
+    out = writer = None
+    try:
+        for (name, _, _), (headers, rows, seconds) in zip(tasks, results):
+            task_seconds += seconds
+            if name not in written:
+                if out is not None:
+                    out.close()
+                out = open(os.path.join(out_dir, f"{name}.csv"), "w", newline="", encoding="utf-8")
+                writer = csv.writer(out)
+                writer.writerow(headers)
+                written[name] = (0, 0)
+            writer.writerows(rows)
+            count, shards = written[name]
+            written[name] = (count + len(rows), shards + 1)
+    finally:
+        if out is not None:
+            out.close()
+    return written, task_seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write every report to CSV files, in parallel.")
+    parser.add_argument("--db", default=DB_FILE, help="database file")
+    parser.add_argument("-o", "--out", required=True, help="directory for the report files")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--shards-per-worker", type=int, default=SHARDS_PER_WORKER,
+                        help="key ranges each breakdown is cut into, per worker")
+    parser.add_argument("--only", nargs="+", choices=REPORT_NAMES, metavar="REPORT",
+                        help=f"reports to write (default: all of {', '.join(REPORT_NAMES)})")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"[Error] Database '{args.db}' not found. Run 'python db_manager.py' first.")
+        return 1
+    if args.workers < 1 or args.shards_per_worker < 1:
+        print("[Error] --workers and --shards-per-worker must be at least 1.")
+        return 1
+    names = args.only or REPORT_NAMES
+    if any(name in TIME_SERIES for name in names):
+        import analytics
+        if analytics.np is None:
+            print("[Note] NumPy is not installed; skipping the time-series reports.")
+            names = [name for name in names if name not in TIME_SERIES]
+
+    start = time.perf_counter()
+    written, task_seconds = run_reports(args.db, args.out, names, args.workers, args.shards_per_worker)
+    elapsed = time.perf_counter() - start
+    for name, (rows, shards) in written.items():
+        print(f"{name:<22} {rows:>10,} rows  {shards:>4} task(s)")
+    print(f"\nWrote {len(written)} reports to {args.out} in {elapsed:.2f}s with {args.workers} worker(s) "
+          f"({task_seconds:.2f}s inside tasks, {task_seconds / elapsed:.1f} busy on average).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
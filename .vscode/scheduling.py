@@ -0,0 +1,213 @@
+import datetime
+import heapq
+from bisect import bisect_left, insort
+from collections import defaultdict
+
+from validation import epoch_day, is_valid_date, is_valid_timestamp
+
+# Pilot duty conflict detection.
+#
+# A flight occupies its pilot from departure_time to arrival_time (both
+# 'YYYY-MM-DD HH:MM'), or for its whole departure_date when it has no times.
+# A pilot may not hold two duties that overlap or leave less than MIN_REST
+# between them.
+#
+# Duties are capped at MAX_DUTY, so any duty that could clash with
+# [start, end] must begin within (start - MAX_DUTY - rest, end + rest). That
+# window is one range seek on idx_flights_pilot_duty (pilot_id, departure_time),
+# so a check costs O(log n) however many flights the pilot has. Untimed
+# flights are found with a date range on idx_flights_pilot.
+#
+# DutyChecker adds the duties assigned earlier in the same batch, kept
+# per pilot as a sorted list of non-overlapping intervals.
+#
+# plan_assignments() is the bulk auto-assign solver: flights are taken in
+# departure order and each goes to the least-loaded free pilot, popped from
+# a min-heap keyed on flight count. A pilot found busy because of a duty
+# starting within the rest period of the departure is busy for every later
+# departure too, until that duty (plus rest) is over, so they rest in a
+# second heap until then and each such clash is paid for once rather than
+# on every later flight. A pilot whose clashing duty starts later may still
+# fit a shorter later flight in before it, so they go back to the pool.
+
+MIN_REST = datetime.timedelta(hours=10)
+MAX_DUTY = datetime.timedelta(hours=18)
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M"
+_DAY = datetime.timedelta(days=1)
+# Longest time one flight can occupy a pilot (an untimed flight blocks a day)
+_LONGEST_DUTY = max(MAX_DUTY, _DAY)
+
+
+def parse_timestamp(value):
+    return datetime.datetime.strptime(value, TIMESTAMP_FORMAT)
+
+
+def format_timestamp(value):
+    return value.strftime(TIMESTAMP_FORMAT)
+
+
+def duty_interval(departure_date, departure_time=None, arrival_time=None):
+    """(start, end) datetimes for which a flight occupies its pilot."""
+    if departure_time and arrival_time:
+        return parse_timestamp(departure_time), parse_timestamp(arrival_time)
+    day = datetime.datetime.fromisoformat(departure_date)
+    return day, day + _DAY
+
+
+def clock_times(departure_date, departure_clock, arrival_clock):
+    """Timestamps for 'HH:MM' departure and arrival clock times on departure_date.
+
+    An arrival at or before the departure time is taken to be the next day.
+    Values that are not valid times are passed through for duty_error() to reject.
+    """
+    departure_time = f"{departure_date} {departure_clock}"
+    arrival_time = f"{departure_date} {arrival_clock}"
+    if is_valid_timestamp(departure_time) and is_valid_timestamp(arrival_time) and arrival_clock <= departure_clock:
+        arrival_time = format_timestamp(parse_timestamp(arrival_time) + _DAY)
+    return departure_time, arrival_time
+
+
+def duty_error(departure_date, departure_time, arrival_time):
+    """Return the reason a flight's times are rejected, or None if they are acceptable."""
+    if (departure_time is None) != (arrival_time is None):
+        return "Departure and arrival times must be given together."
+    if departure_time is None:
+        return None
+    for value in (departure_time, arrival_time):
+        if not is_valid_timestamp(value):
+            return f"Invalid time '{value}'. Please use YYYY-MM-DD HH:MM (e.g., 2026-05-10 14:30)"
+    if not is_valid_date(departure_date) or departure_time[:10] != departure_date:
+        return "The departure time must be on the departure date."
+    start, end = parse_timestamp(departure_time), parse_timestamp(arrival_time)
+    if end <= start:
+        return "The arrival time must be after the departure time."
+    if end - start > MAX_DUTY:
+        return f"A flight cannot last longer than {MAX_DUTY.total_seconds() / 3600:g} hours."
+    return None
+
+
+def _clashes(start, end, other_start, other_end, min_rest):
+    return other_start < end + min_rest and start < other_end + min_rest
+
+
+def find_conflicts(conn, pilot_id, start, end, min_rest=MIN_REST, exclude=()):
+    """Flights of pilot_id that clash with a duty from start to end.
+
+    Returns (flight_id, flight_num, start, end) tuples; flight ids in
+    exclude are ignored (e.g. the flight being changed).
+    """
+    window_start = start - MAX_DUTY - min_rest
+    window_end = end + min_rest
+    timed = conn.execute("""SELECT flight_id, flight_num, departure_date, departure_time, arrival_time
+                            FROM Flights
+                            WHERE pilot_id = ? AND departure_time > ? AND departure_time < ?""",
+                         (pilot_id, format_timestamp(window_start), format_timestamp(window_end)))
+    # An untimed flight blocks its whole day, so widen the window by a day
+    untimed = conn.execute("""SELECT flight_id, flight_num, departure_date, departure_time, arrival_time
+                              FROM Flights
+                              WHERE pilot_id = ? AND departure_day >= ? AND departure_day <= ?
+                                AND departure_time IS NULL""",
+                           (pilot_id, epoch_day((start - min_rest - _DAY).date().isoformat()),
+                            epoch_day(window_end.date().isoformat())))
+
+    conflicts = []
+    for f_id, f_num, dep_date, dep_time, arr_time in timed.fetchall() + untimed.fetchall():
+        if f_id in exclude:
+            continue
+        other_start, other_end = duty_interval(dep_date, dep_time, arr_time)
+        if _clashes(start, end, other_start, other_end, min_rest):
+            conflicts.append((f_id, f_num, other_start, other_end))
+    return conflicts
+
+
+class DutyChecker:
+    """Conflict checks for a batch of assignments.
+
+    Flights whose ids are in moving (being assigned or retimed by the batch)
+    are ignored in the database, and each accepted duty is added to an
+    in-memory per-pilot sorted interval list. Accepted duties never clash,
+    so only the neighbours either side of a new duty need checking.
+    """
+
+    def __init__(self, conn, moving=(), min_rest=MIN_REST):
+        self.conn = conn
+        self.moving = set(moving)
+        self.min_rest = min_rest
+        self.pending = defaultdict(list)
+
+    def add(self, pilot_id, flight_num, start, end):
+        """Record a duty. Returns the flight number it clashes with, or None if it was accepted."""
+        conflicts = find_conflicts(self.conn, pilot_id, start, end, self.min_rest, self.moving)
+        if conflicts:
+            return conflicts[0][1]
+
+        intervals = self.pending[pilot_id]
+        position = bisect_left(intervals, (start,))
+        for other_start, other_end, other_num in intervals[max(position - 1, 0):position + 1]:
+            if _clashes(start, end, other_start, other_end, self.min_rest):
+                return other_num
+        insort(intervals, (start, end, flight_num))
+        return None
+
+
+
+def first_clash(intervals, start, end, min_rest=MIN_REST):
+    """The first of intervals (a list of (start, end) sorted by start, possibly
+    overlapping each other) that a duty from start to end clashes with, or None.
+    """
+    position = bisect_left(intervals, (start - _LONGEST_DUTY - min_rest,))
+    while position < len(intervals) and intervals[position][0] < end + min_rest:
+        if _clashes(start, end, intervals[position][0], intervals[position][1], min_rest):
+            return intervals[position]
+        position += 1
+    return None
+
+
+def plan_assignments(flights, loads, duties, min_rest=MIN_REST):
+    """Greedy crew plan for unassigned flights.
+
+    flights is a list of (flight_id, start, end); loads maps every candidate
+    pilot_id to their current flight count; duties maps pilot_id to their
+    existing (start, end) duties sorted by start, and is extended in place.
+    Each flight, earliest first, goes to the free pilot with the fewest
+    flights (lowest pilot_id on a tie). Returns [(flight_id, pilot_id)];
+    flights no pilot can take are left out.
+    """
+    available = [(load, p_id) for p_id, load in loads.items()]
+    heapq.heapify(available)
+    # Pilots proven busy for every departure before the key, so they are
+    # not popped again for each of those flights
+    resting = []
+    plan = []
+    # Slots every pilot was found busy for. Duties only grow, so such a slot
+    # stays untakeable
+    unplaceable = set()
+    for f_id, start, end in sorted(flights, key=lambda flight: (flight[1], flight[0])):
+        while resting and resting[0][0] <= start:
+            _, load, p_id = heapq.heappop(resting)
+            heapq.heappush(available, (load, p_id))
+        if (start, end) in unplaceable:
+            continue
+        # Busy for this flight only; back to the pool once it is dealt with
+        skipped = []
+        while available:
+            load, p_id = heapq.heappop(available)
+            intervals = duties.setdefault(p_id, [])
+            clash = first_clash(intervals, start, end, min_rest)
+            if clash is None:
+                insort(intervals, (start, end))
+                plan.append((f_id, p_id))
+                heapq.heappush(available, (load + 1, p_id))
+                break
+            if clash[0] <= start + min_rest:
+                # Any flight departing from now until the clash ends (plus
+                # rest) ends after clash start - rest, so it clashes too
+                heapq.heappush(resting, (clash[1] + min_rest, load, p_id))
+            else:
+                skipped.append((load, p_id))
+        else:
+            # Every pilot was tried against this slot or is resting, and so busy for it
+            unplaceable.add((start, end))
+        for pilot in skipped:
+            heapq.heappush(available, pilot)
+    return plan
@@ -25,4 +25,7 @@ CREATE TABLE IF NOT EXISTS Flights (
     -- Establishing Foreign Key Constraints to maintain referential integrity
     FOREIGN KEY (pilot_id) REFERENCES Pilots(pilot_id),
     FOREIGN KEY (dest_id) REFERENCES Destinations(dest_id)
-);
\ No newline at end of file
+);
+
+-- Indexes and later schema changes are applied as versioned migrations
+-- (see migrations.py), so existing databases can be upgraded in place.
@@ -0,0 +1,79 @@
+import string
+
+# Builders for the WHERE clauses used by view_flights_by_criteria.
+# Each returns (sql_fragment, params). Exact, prefix and range filters are
+# written as plain comparisons so SQLite can serve them from an index;
+# the substring ("contains") filter is kept separate because it always scans.
+
+# NOCASE only folds ASCII letters, so prefixes are folded the same way
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def prefix_upper_bound(prefix, nocase=False):
+    """Smallest string that sorts after every string starting with prefix.
+
+    With nocase the bound is compared with NOCASE, and prefix must already
+    be folded to lower case.
+    """
+    while prefix:
+        last = ord(prefix[-1])
+        if last < 0x10FFFF:
+            following = chr(last + 1)
+            if nocase and following == "A":
+                # NOCASE reads 'A' as 'a', so the character after '@' is '['
+                following = "["
+            return prefix[:-1] + following
+        prefix = prefix[:-1]
+    return None
+
+
+def exact_filter(column, value, nocase=False):
+    collate = " COLLATE NOCASE" if nocase else ""
+    return f"{column} = ?{collate}", [value]
+
+
+def prefix_filter(column, value, nocase=False):
+    """Prefix match written as a range so an index on column can serve it."""
+    collate = " COLLATE NOCASE" if nocase else ""
+    if nocase:
+        value = value.translate(_ASCII_LOWER)
+    upper = prefix_upper_bound(value, nocase)
+    if upper is None:
+        return f"{column} >= ?{collate}", [value]
+    return f"{column} >= ?{collate} AND {column} < ?{collate}", [value, upper]
+
+
+def range_filter(column, low=None, high=None):
+    """Inclusive range; either end may be None for an open-ended range."""
+    clauses = []
+    params = []
+    if low is not None:
+        clauses.append(f"{column} >= ?")
+        params.append(low)
+    if high is not None:
+        clauses.append(f"{column} <= ?")
+        params.append(high)
+    if not clauses:
+        return "1 = 1", []
+    return " AND ".join(clauses), params
+
+
+def contains_filter(column, value):
+    """Fuzzy substring match. Cannot use an index - full scan."""
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{column} LIKE ? ESCAPE '\\'", [f"%{escaped}%"]
+
+
+def build_search(column, mode, value=None, low=None, high=None, nocase=True):
+    """Dispatch to the filter for a search mode: exact, prefix, range or contains."""
+    match mode:
+        case "exact":
+            return exact_filter(column, value, nocase=nocase)
+        case "prefix":
+            return prefix_filter(column, value, nocase=nocase)
+        case "range":
+            return range_filter(column, low, high)
+        case "contains":
+            return contains_filter(column, value)
+        case _:
+            raise ValueError(f"Unknown search mode: {mode}")
@@ -0,0 +1,810 @@
+import datetime
+import os
+import sqlite3
+from contextlib import contextmanager
+
+import archive
+import audit
+import loaders
+from connection import get_connection
+from fulltext import search_flights, search_pilots
+from integrity import get_delete_policy
+from refcache import database_key, reference_cache
+from scheduling import (
+    MIN_REST,
+    DutyChecker,
+    duty_error,
+    duty_interval,
+    format_timestamp,
+    parse_timestamp,
+    plan_assignments,
+)
+from search import build_search, exact_filter, range_filter
+from validation import day_to_date, epoch_day, is_valid_date, is_valid_flight_number, status_error
+
+# Headless service layer over the airline database.
+#
+# FlightService holds the business rules that used to live in menu.py's
+# prompts (flight number format and uniqueness, date and status rules,
+# existence checks, safe delete, pilot duty conflicts) with no input() or
+# print(). menu.py is a thin shell over it, and scripts can call it
+# directly in-process.
+#
+# Failures raise a ServiceError subclass with a message suitable for
+# showing to a user. Every write runs in its own transaction; the batch
+# variants (create_flights, update_flights, assign_pilots,
+# delete_destinations) check every item first and then apply the whole
+# list in one transaction, so a batch is applied completely or not at all.
+#
+# Every change to a flight or destination is appended to the audit log
+# (audit.py) in the same transaction, attributed to the service's actor.
+#
+# Pilot, destination, city and status lists are served from the
+# process-wide reference cache (refcache.py), which the tables' version
+# triggers invalidate on every write.
+#
+# Rows are plain tuples in the shapes documented in loaders.py. A service
+# uses one sqlite3 connection, so use one FlightService per thread.
+
+# IN (...) lists are split to stay under SQLite's bound-parameter limit
+LOOKUP_CHUNK_SIZE = 500
+
+# How query_flights() matches a status name for each search mode (both sides lower-cased)
+STATUS_MATCHERS = {"exact": str.__eq__, "prefix": str.startswith, "contains": str.__contains__}
+
+FLIGHT_NUM_ERROR = "Invalid flight number format. Must be FL-XXX (e.g., FL-101)"
+DATE_ERROR = "Invalid date. Please use a real date as YYYY-MM-DD (e.g., 2026-05-10)"
+
+
+class ServiceError(Exception):
+    """Base class for rejected service calls. index is the failing item of a batch."""
+
+    def __init__(self, message, index=None):
+        super().__init__(message if index is None else f"Item {index}: {message}")
+        self.message = message
+        self.index = index
+
+
+class ValidationError(ServiceError):
+    """A value breaks a format rule (flight number, date, status, ...)."""
+
+
+class NotFoundError(ServiceError):
+    """A flight, pilot or destination id does not exist."""
+
+
+class DuplicateError(ServiceError):
+    """A flight number or airport code is already taken."""
+
+
+class DestinationInUseError(ServiceError):
+    """A destination still has flights and force was not given."""
+
+    def __init__(self, message, flight_count, index=None):
+        super().__init__(message, index)
+        self.flight_count = flight_count
+
+
+class ScheduleConflictError(ServiceError):
+    """A pilot would have overlapping duties, or too little rest between two."""
+
+    def __init__(self, message, conflicting_flight, index=None):
+        super().__init__(message, index)
+        self.conflicting_flight = conflicting_flight
+
+
+def _with_index(error, index):
+    """Re-create a ServiceError for item index of a batch (None for a single call)."""
+    if isinstance(error, DestinationInUseError):
+        return DestinationInUseError(error.message, error.flight_count, index)
+    if isinstance(error, ScheduleConflictError):
+        return ScheduleConflictError(error.message, error.conflicting_flight, index)
+    return type(error)(error.message, index)
+
+
+def _integrity_error(error):
+    """Map an IntegrityError that slipped past the checks (a concurrent writer) to a ServiceError."""
+    if "UNIQUE" in str(error):
+        return DuplicateError("That value is already in use.")
+    if "FOREIGN KEY" in str(error):
+        return NotFoundError("A referenced flight, pilot or destination no longer exists.")
+    return ServiceError(str(error))
+
+
+class FlightService:
+    def __init__(self, conn=None, min_rest=MIN_REST, actor=None):
+        self.conn = conn or get_connection()
+        self.min_rest = min_rest
+        self.actor = actor or audit.default_actor()
+        self._db_key = None
+
+    def _cached(self, table, query, load):
+        """Reference rows from refcache.reference_cache, loaded with load(conn) on a miss."""
+        if self._db_key is None:
+            # "" marks an in-memory database, which is never cached
+            self._db_key = database_key(self.conn) or ""
+        return reference_cache.get(self.conn, self._db_key or None, table, query, load)
+
+    @staticmethod
+    def _single(batch_call, item):
+        """Run a batch method on one item, reporting errors without an item index."""
+        try:
+            return batch_call([item])
+        except ServiceError as e:
+            raise _with_index(e, None) from None
+
+    @contextmanager
+    def transaction(self):
+        """Run the block in one transaction: commit on success, roll back on any error.
+
+        Inside an enclosing transaction() the block joins it instead, so
+        several service calls can be made atomic together.
+
+        The transaction takes the write lock up front (BEGIN IMMEDIATE). The
+        blocks read before they write (existence and duty checks), and under
+        WAL a deferred transaction that has read cannot upgrade to a write
+        while another connection writes: it fails at once with "database is
+        locked" instead of waiting out busy_timeout.
+        """
+        if self.conn.in_transaction:
+            yield self.conn
+            return
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except sqlite3.IntegrityError as e:
+            self.conn.rollback()
+            raise _integrity_error(e) from e
+        except BaseException:
+            self.conn.rollback()
+            raise
+        self.conn.commit()
+
+    # --- Validation and lookups --- #
+
+    def _existing(self, table, column, values):
+        """Which of values are present in table.column."""
+        values = list(values)
+        found = set()
+        for start in range(0, len(values), LOOKUP_CHUNK_SIZE):
+            chunk = values[start:start + LOOKUP_CHUNK_SIZE]
+            placeholders = ", ".join("?" for _ in chunk)
+            cursor = self.conn.execute(f"SELECT {column} FROM {table} WHERE {column} IN ({placeholders})", chunk)
+            found.update(row[0] for row in cursor)
+        return found
+
+    def flight_exists(self, flight_id):
+        return bool(self._existing("Flights", "flight_id", [flight_id]))
+
+    def pilot_exists(self, pilot_id):
+        return bool(self._existing("Pilots", "pilot_id", [pilot_id]))
+
+    def destination_exists(self, dest_id):
+        return bool(self._existing("Destinations", "dest_id", [dest_id]))
+
+    def flight_number_taken(self, flight_num):
+        return bool(self._existing("Flights", "flight_num", [flight_num]))
+
+    def check_new_flight_number(self, flight_num):
+        """Raise unless flight_num has the FL-XXX format and is not in use."""
+        if not is_valid_flight_number(flight_num):
+            raise ValidationError(FLIGHT_NUM_ERROR)
+        if self.flight_number_taken(flight_num):
+            raise DuplicateError(f"Flight number '{flight_num}' already exists. Please use a different number.")
+
+    @staticmethod
+    def check_date(value):
+        if not is_valid_date(value):
+            raise ValidationError(DATE_ERROR)
+
+    def _status_codes(self):
+        """[(status_id, name)] of the FlightStatus vocabulary, from the reference cache."""
+        return self._cached("Statuses", "codes", loaders.status_codes)
+
+    def check_status(self, value):
+        """Return (status_id, name) for a status name, ignoring case.
+        Raises ValidationError for a malformed or unknown status.
+        """
+        error = status_error(value)
+        if error:
+            raise ValidationError(error)
+        for status_id, name in self._status_codes():
+            if name.lower() == value.lower():
+                return status_id, name
+        raise ValidationError(f"Unknown status '{value}'. Choose from: {', '.join(self.list_statuses())}.")
+
+    @staticmethod
+    def check_times(departure_date, departure_time, arrival_time):
+        error = duty_error(departure_date, departure_time, arrival_time)
+        if error:
+            raise ValidationError(error)
+
+    def _flight_rows(self, items):
+        """{flight_id: (flight_num, departure_date, departure_time, arrival_time, pilot_id, status, dest_id)}
+        for (index, flight_id) items, raising NotFoundError for the first missing one.
+        """
+        wanted = list({f_id for _, f_id in items})
+        found = {}
+        for start in range(0, len(wanted), LOOKUP_CHUNK_SIZE):
+            chunk = wanted[start:start + LOOKUP_CHUNK_SIZE]
+            placeholders = ", ".join("?" for _ in chunk)
+            cursor = self.conn.execute(f"""SELECT f.flight_id, f.flight_num, f.departure_date, f.departure_time,
+                                                  f.arrival_time, f.pilot_id, s.name, f.dest_id
+                                           FROM Flights f
+                                           LEFT JOIN FlightStatus s ON s.status_id = f.status_id
+                                           WHERE f.flight_id IN ({placeholders})""", chunk)
+            found.update((row[0], row[1:]) for row in cursor)
+        for index, f_id in items:
+            if f_id not in found:
+                raise NotFoundError(f"Flight ID {f_id} not found.", index)
+        return found
+
+    def _check_duties(self, duties, moving=()):
+        """Raise ScheduleConflictError for the first of duties that clashes with
+        the pilot's other flights. duties is a list of (index, pilot_id,
+        flight_num, start, end); flight ids in moving are being changed by
+        the same batch, so their current rows are ignored.
+        """
+        checker = DutyChecker(self.conn, moving, self.min_rest)
+        rest_hours = self.min_rest.total_seconds() / 3600
+        for index, p_id, f_num, start, end in duties:
+            clash = checker.add(p_id, f_num, start, end)
+            if clash is not None:
+                raise ScheduleConflictError(
+                    f"Pilot ID {p_id} is already flying {clash}, which overlaps this flight "
+                    f"or leaves less than {rest_hours:g} hours of rest.", clash, index)
+
+    def _check_ids(self, items, table, column, label):
+        """Raise NotFoundError for the first item whose id (not None) is missing from table."""
+        wanted = {value for _, value in items if value is not None}
+        found = self._existing(table, column, wanted)
+        for index, value in items:
+            if value is not None and value not in found:
+                raise NotFoundError(f"{label} ID {value} not found.", index)
+
+    # --- Flights --- #
+
+    def get_flight(self, flight_id):
+        """(flight_id, flight_num, departure_date, status, dest_id, city, pilot_id, pilot_name,
+        departure_time, arrival_time), or None.
+        """
+        return loaders.get_flight(self.conn, flight_id)
+
+    def create_flight(self, flight_num, departure_date, status, dest_id, pilot_id=None,
+                      departure_time=None, arrival_time=None):
+        """Add one flight and return its flight_id.
+
+        departure_time and arrival_time ('YYYY-MM-DD HH:MM') are optional but
+        go together; the departure time must fall on departure_date.
+        """
+        return self._single(self.create_flights, {
+            "flight_num": flight_num,
+            "departure_date": departure_date,
+            "status": status,
+            "dest_id": dest_id,
+            "pilot_id": pilot_id,
+            "departure_time": departure_time,
+            "arrival_time": arrival_time,
+        })[0]
+
+    def create_flights(self, flights):
+        """Add a list of flights (dicts with flight_num, departure_date, status,
+        dest_id and optional pilot_id, departure_time and arrival_time) in one
+        transaction. Returns their flight_ids.
+        """
+        rows = []
+        seen = set()
+        for index, flight in enumerate(flights):
+            try:
+                f_num = flight["flight_num"]
+                if not is_valid_flight_number(f_num):
+                    raise ValidationError(FLIGHT_NUM_ERROR)
+                if f_num in seen:
+                    raise DuplicateError(f"Flight number '{f_num}' appears more than once in the batch.")
+                self.check_date(flight["departure_date"])
+                status_id, _ = self.check_status(flight["status"])
+                self.check_times(flight["departure_date"], flight.get("departure_time"), flight.get("arrival_time"))
+                if flight["dest_id"] is None:
+                    raise ValidationError("A destination is required.")
+            except ServiceError as e:
+                raise _with_index(e, index) from None
+            seen.add(f_num)
+            rows.append((f_num, flight["departure_date"], status_id, flight.get("pilot_id"), flight["dest_id"],
+                         flight.get("departure_time"), flight.get("arrival_time")))
+
+        taken = self._existing("Flights", "flight_num", seen)
+        for index, row in enumerate(rows):
+            if row[0] in taken:
+                raise DuplicateError(f"Flight number '{row[0]}' already exists. Please use a different number.", index)
+        self._check_ids(list(enumerate(row[4] for row in rows)), "Destinations", "dest_id", "Destination")
+        self._check_ids(list(enumerate(row[3] for row in rows)), "Pilots", "pilot_id", "Pilot")
+
+        with self.transaction():
+            # Checked inside the transaction so the rows read are the ones the insert lands on
+            self._check_duties([(index, row[3], row[0], *duty_interval(row[1], row[5], row[6]))
+                                for index, row in enumerate(rows) if row[3] is not None])
+            last_id = self.conn.execute("SELECT COALESCE(MAX(flight_id), 0) FROM Flights").fetchone()[0]
+            self.conn.executemany("""INSERT INTO Flights (flight_num, departure_day, status_id, pilot_id, dest_id,
+                                                          departure_time, arrival_time)
+                                     VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                                  [(row[0], epoch_day(row[1]), *row[2:]) for row in rows])
+            self.conn.execute(audit.AUDIT_BATCH_INSERT, (self.actor, last_id))
+            # AUTOINCREMENT ids only grow, so the new rows are exactly those above last_id
+            cursor = self.conn.execute("SELECT flight_id FROM Flights WHERE flight_id > ? ORDER BY flight_id",
+                                       (last_id,))
+            return [row[0] for row in cursor]
+
+    def update_flight(self, flight_id, status=None, departure_date=None, dest_id=None,
+                      departure_time=None, arrival_time=None):
+        """Change a flight's status, date, destination and/or times (None keeps the current value).
+
+        A new departure_time also moves departure_date to its day, and a new
+        date on its own moves a timed flight's times by the same number of days.
+        """
+        self._single(self.update_flights, {
+            "flight_id": flight_id,
+            "status": status,
+            "departure_date": departure_date,
+            "dest_id": dest_id,
+            "departure_time": departure_time,
+            "arrival_time": arrival_time,
+        })
+
+    def update_flights(self, updates):
+        """Apply a list of update_flight() changes (dicts with flight_id plus the
+        fields to change) in one transaction.
+        """
+        updates = list(updates)
+        # index -> (status_id, name) of each new status
+        statuses = {}
+        for index, update in enumerate(updates):
+            try:
+                if update.get("status") is not None:
+                    statuses[index] = self.check_status(update["status"])
+                if update.get("departure_date") is not None:
+                    self.check_date(update["departure_date"])
+            except ServiceError as e:
+                raise _with_index(e, index) from None
+
+        current = self._flight_rows([(i, update["flight_id"]) for i, update in enumerate(updates)])
+        self._check_ids([(i, update.get("dest_id")) for i, update in enumerate(updates)],
+                        "Destinations", "dest_id", "Destination")
+
+        rows = []
+        duties = []
+        entries = []
+        for index, update in enumerate(updates):
+            f_id = update["flight_id"]
+            f_num, old_date, old_departure, old_arrival, p_id, old_status, old_dest = current[f_id]
+            departure_time = update.get("departure_time") or old_departure
+            arrival_time = update.get("arrival_time") or old_arrival
+            departure_date = update.get("departure_date")
+            if update.get("departure_time") is not None and departure_date is None:
+                departure_date = departure_time[:10]
+            departure_date = departure_date or old_date
+            if old_departure and departure_date != old_date and update.get("departure_time") is None:
+                shift = duty_interval(departure_date)[0] - duty_interval(old_date)[0]
+                departure_time, arrival_time = (format_timestamp(parse_timestamp(value) + shift)
+                                                for value in (departure_time, arrival_time))
+            try:
+                self.check_times(departure_date, departure_time, arrival_time)
+            except ServiceError as e:
+                raise _with_index(e, index) from None
+
+            if p_id is not None and (departure_date, departure_time, arrival_time) != (old_date, old_departure,
+                                                                                        old_arrival):
+                duties.append((index, p_id, f_num, *duty_interval(departure_date, departure_time, arrival_time)))
+            status_id, status = statuses.get(index, (None, old_status))
+            rows.append((status_id, epoch_day(departure_date), departure_time, arrival_time, update.get("dest_id"), f_id))
+            changes = audit.changed_fields(
+                {"status": old_status, "departure_date": old_date, "departure_time": old_departure,
+                 "arrival_time": old_arrival, "dest_id": old_dest},
+                {"status": status, "departure_date": departure_date,
+                 "departure_time": departure_time, "arrival_time": arrival_time,
+                 "dest_id": update.get("dest_id") or old_dest})
+            if changes:
+                entries.append(audit.entry(self.actor, "flight", f_id, "update", *changes))
+
+        with self.transaction():
+            self._check_duties(duties, {updates[index]["flight_id"] for index, *_ in duties})
+            self.conn.executemany("""UPDATE Flights
+                                     SET status_id = COALESCE(?, status_id),
+                                         departure_day = ?,
+                                         departure_time = ?,
+                                         arrival_time = ?,
+                                         dest_id = COALESCE(?, dest_id)
+                                     WHERE flight_id = ?""", rows)
+            audit.record(self.conn, entries)
+
+    def assign_pilot(self, flight_id, pilot_id):
+        self._single(self.assign_pilots, (flight_id, pilot_id))
+
+    def assign_pilots(self, assignments):
+        """Assign pilots from a list of (flight_id, pilot_id) pairs in one transaction.
+
+        pilot_id None unassigns the flight. Raises ScheduleConflictError if a
+        pilot would be given overlapping duties or too little rest, counting
+        both their existing flights and the rest of the batch.
+        """
+        assignments = list(assignments)
+        flights = self._flight_rows([(i, f_id) for i, (f_id, _) in enumerate(assignments)])
+        self._check_ids([(i, p_id) for i, (_, p_id) in enumerate(assignments)], "Pilots", "pilot_id", "Pilot")
+        duties = []
+        for index, (f_id, p_id) in enumerate(assignments):
+            if p_id is not None:
+                f_num, departure_date, departure_time, arrival_time, _, _, _ = flights[f_id]
+                duties.append((index, p_id, f_num, *duty_interval(departure_date, departure_time, arrival_time)))
+        entries = [audit.entry(self.actor, "flight", f_id, "update", {"pilot_id": flights[f_id][4]}, {"pilot_id": p_id})
+                   for f_id, p_id in assignments if p_id != flights[f_id][4]]
+        with self.transaction():
+            self._check_duties(duties, {f_id for f_id, _ in assignments})
+            self.conn.executemany("UPDATE Flights SET pilot_id = ? WHERE flight_id = ?",
+                                  [(p_id, f_id) for f_id, p_id in assignments])
+            audit.record(self.conn, entries)
+
+    def auto_assign_pilots(self, date_from, date_to, dry_run=False):
+        """Assign pilots to every unassigned flight departing from date_from to date_to.
+
+        Pilots are chosen by scheduling.plan_assignments(): the least-loaded
+        pilot (by total flight count) who has no clashing duty. The plan is
+        computed and written in one transaction that holds the write lock
+        from the start, so no concurrent assignment can change the duties it
+        was planned from; with dry_run nothing is written. Returns
+        (assignments, unassigned), where assignments is a list of
+        (flight_id, pilot_id) and unassigned the number of flights no pilot
+        was free for.
+        """
+        self.check_date(date_from)
+        self.check_date(date_to)
+        # Duties up to a day plus rest either side of the range can clash with it
+        margin = datetime.timedelta(days=2)
+        window_from = (datetime.date.fromisoformat(date_from) - margin).isoformat()
+        window_to = (datetime.date.fromisoformat(date_to) + margin).isoformat()
+
+        with self.transaction():
+            flights = [(f_id, *duty_interval(dep_date, dep_time, arr_time))
+                       for f_id, dep_date, dep_time, arr_time in self.conn.execute(
+                           """SELECT flight_id, departure_date, departure_time, arrival_time
+                              FROM Flights
+                              WHERE pilot_id IS NULL AND departure_day >= ? AND departure_day <= ?""",
+                           (epoch_day(date_from), epoch_day(date_to)))]
+            loads = dict(self.conn.execute("""SELECT p.pilot_id, COALESCE(c.flights, 0)
+                                              FROM Pilots p
+                                              LEFT JOIN FlightCountsByPilot c ON c.pilot_id = p.pilot_id"""))
+            duties = {}
+            for p_id, dep_date, dep_time, arr_time in self.conn.execute(
+                    """SELECT pilot_id, departure_date, departure_time, arrival_time
+                       FROM Flights
+                       WHERE departure_day >= ? AND departure_day <= ? AND pilot_id IS NOT NULL""",
+                    (epoch_day(window_from), epoch_day(window_to))):
+                duties.setdefault(p_id, []).append(duty_interval(dep_date, dep_time, arr_time))
+            for intervals in duties.values():
+                intervals.sort()
+
+            assignments = plan_assignments(flights, loads, duties, self.min_rest)
+            if not dry_run:
+                self.conn.executemany("UPDATE Flights SET pilot_id = ? WHERE flight_id = ?",
+                                      [(p_id, f_id) for f_id, p_id in assignments])
+                audit.record(self.conn, [audit.entry(self.actor, "flight", f_id, "update",
+                                                     {"pilot_id": None}, {"pilot_id": p_id})
+                                         for f_id, p_id in assignments])
+        return assignments, len(flights) - len(assignments)
+
+    def query_flights(self, city=None, status=None, departure_date=None, date_from=None, date_to=None,
+                      mode="prefix", date_mode="exact", after=None, before=None, page_size=loaders.PAGE_SIZE,
+                      include_history=False):
+        """One keyset page of flights matching every filter given, earliest departure first.
+
+        mode (exact, prefix or contains) applies to city and status; date_mode
+        (exact or contains) to departure_date. date_from/date_to form an
+        inclusive range; exact and range dates must be real YYYY-MM-DD dates.
+        after/before are flight_key() values of the neighbouring page.
+        include_history also lists the flights moved to the history database
+        (archive.py), if any. Returns (rows, has_more).
+        """
+        # Attached on first use; with nothing archived there is nothing to add
+        include_history = include_history and archive.attach(self.conn)
+        clauses = []
+        params = []
+        if city is not None:
+            clauses.append(build_search("d.city", mode, city))
+        if status is not None:
+            # Matched against the cached vocabulary, so the query compares codes
+            if mode not in STATUS_MATCHERS:
+                raise ValueError(f"Unknown search mode: {mode}")
+            ids = [status_id for status_id, name in self._status_codes()
+                   if STATUS_MATCHERS[mode](name.lower(), status.lower())]
+            # With several codes, walk the departure order and filter rather than sort every match
+            column = "f.status_id" if len(ids) == 1 else "+f.status_id"
+            clauses.append((f"{column} IN ({', '.join('?' for _ in ids)})", ids))
+        if departure_date is not None:
+            if date_mode == "contains":
+                # The text is tested once per day in use, not once per flight,
+                # and the query seeks idx_flights_departure for each match
+                import json  # loaded on first use to keep it off the menu's start-up path
+                clauses.append(("f.departure_day IN (SELECT value FROM json_each(?))",
+                                [json.dumps(self._days_containing(departure_date, include_history))]))
+            else:
+                self.check_date(departure_date)
+                clauses.append(build_search("f.departure_day", date_mode, epoch_day(departure_date), nocase=False))
+        if date_from is not None or date_to is not None:
+            for value in (date_from, date_to):
+                if value is not None:
+                    self.check_date(value)
+            clauses.append(build_search("f.departure_day", "range", low=date_from and epoch_day(date_from),
+                                        high=date_to and epoch_day(date_to)))
+        where = " AND ".join(f"({clause})" for clause, _ in clauses) or "1 = 1"
+        for _, clause_params in clauses:
+            params += clause_params
+        return loaders.flight_page(self.conn, where, params, after, before, page_size, include_history)
+
+    def _days_containing(self, text, include_history=False):
+        """departure_day of every date in use whose 'YYYY-MM-DD' text contains text."""
+        days = loaders.departure_days(self.conn)
+        if include_history:
+            days = sorted(set(days).union(loaders.departure_days(self.conn, archive.SCHEMA)))
+        return [day for day in days if text in day_to_date(day)]
+
+    def has_history(self):
+        """Whether flights have been archived to a history database (archive.py)."""
+        main_file = database_key(self.conn)
+        return main_file is not None and os.path.exists(archive.history_file(main_file))
+
+    def search_flights(self, text, limit=50):
+        """Ranked keyword search over flight numbers, cities, airport codes and pilots."""
+        return search_flights(self.conn, text, limit)
+
+    def flight_number_page(self, after=None, before=None, page_size=loaders.PAGE_SIZE):
+        return loaders.flight_number_page(self.conn, after, before, page_size)
+
+    def list_cities(self):
+        return self._cached("Destinations", "cities", loaders.list_cities)
+
+    def list_statuses(self):
+        return self._cached("Statuses", "statuses", loaders.list_statuses)
+
+    def list_departure_dates(self):
+        return loaders.list_departure_dates(self.conn)
+
+    # --- Status batches --- #
+
+    def update_status_where(self, new_status, dest_id=None, date_from=None, date_to=None, current_status=None,
+                            flight_ids=None, flight_nums=None):
+        """Set the status of every flight matching all the filters given, e.g. to
+        delay a whole hub. Returns (batch_id, affected).
+
+        Runs as one set-based UPDATE in one transaction. Each changed flight's
+        previous status is saved under batch_id for rollback_status_batch().
+        At least one filter is required; flights already at new_status are
+        not counted.
+        """
+        new_status_id, new_status_name = self.check_status(new_status)
+        for value in (date_from, date_to):
+            if value is not None:
+                self.check_date(value)
+        filters = {"dest_id": dest_id, "date_from": date_from, "date_to": date_to,
+                   "current_status": current_status, "flight_ids": flight_ids, "flight_nums": flight_nums}
+        filters = {name: value for name, value in filters.items() if value is not None}
+        if not filters:
+            raise ValidationError("Give at least one filter (destination, dates, status or flights).")
+
+        clauses = []
+        if dest_id is not None:
+            clauses.append(exact_filter("dest_id", dest_id))
+        if date_from is not None or date_to is not None:
+            clauses.append(range_filter("departure_day", date_from and epoch_day(date_from),
+                                        date_to and epoch_day(date_to)))
+        if current_status is not None:
+            clauses.append(exact_filter("status_id", self.check_status(current_status)[0]))
+        import json  # loaded on first use to keep it off the menu's start-up path
+        # Flight lists are passed as one JSON parameter, so any length fits
+        if flight_ids is not None:
+            clauses.append(("flight_id IN (SELECT value FROM json_each(?))", [json.dumps(list(flight_ids))]))
+        if flight_nums is not None:
+            clauses.append(("flight_num IN (SELECT value FROM json_each(?))", [json.dumps(list(flight_nums))]))
+        where = " AND ".join(f"({clause})" for clause, _ in clauses)
+        params = [value for _, clause_params in clauses for value in clause_params]
+
+        with self.transaction():
+            batch_id = self.conn.execute("INSERT INTO StatusBatches (new_status_id, filters) VALUES (?, ?)",
+                                         (new_status_id, json.dumps(filters))).lastrowid
+            affected = self.conn.execute(f"""INSERT INTO StatusBatchItems (batch_id, flight_id, old_status_id)
+                                             SELECT ?, flight_id, status_id FROM Flights
+                                             WHERE {where} AND status_id IS NOT ?""",
+                                         [batch_id] + params + [new_status_id]).rowcount
+            self.conn.execute("""UPDATE Flights SET status_id = ?
+                                 WHERE flight_id IN (SELECT flight_id FROM StatusBatchItems WHERE batch_id = ?)""",
+                              (new_status_id, batch_id))
+            self.conn.execute(f"""INSERT INTO AuditLog (changed_at, actor, entity, entity_id, action,
+                                                        old_values, new_values)
+                                  SELECT {audit.NOW}, ?, 'flight', i.flight_id, 'update',
+                                         json_object('status', s.name), json_object('status', ?)
+                                  FROM StatusBatchItems i
+                                  LEFT JOIN FlightStatus s ON s.status_id = i.old_status_id
+                                  WHERE i.batch_id = ?""", (self.actor, new_status_name, batch_id))
+            self.conn.execute("UPDATE StatusBatches SET affected = ? WHERE batch_id = ?", (affected, batch_id))
+        return batch_id, affected
+
+    def rollback_status_batch(self, batch_id):
+        """Put back the statuses a batch replaced. Returns the number of flights restored.
+
+        Flights whose status was changed again after the batch keep that later value.
+        The batch is read under the write lock, so two rollbacks of the same
+        batch cannot both pass the already-rolled-back check.
+        """
+        with self.transaction():
+            row = self.conn.execute("""SELECT b.new_status_id, b.rolled_back_at, s.name
+                                       FROM StatusBatches b
+                                       LEFT JOIN FlightStatus s ON s.status_id = b.new_status_id
+                                       WHERE b.batch_id = ?""", (batch_id,)).fetchone()
+            if row is None:
+                raise NotFoundError(f"Status batch {batch_id} not found.")
+            if row[1] is not None:
+                raise ValidationError(f"Status batch {batch_id} was already rolled back at {row[1]}.")
+            self.conn.execute(f"""INSERT INTO AuditLog (changed_at, actor, entity, entity_id, action,
+                                                        old_values, new_values)
+                                  SELECT {audit.NOW}, ?, 'flight', f.flight_id, 'update',
+                                         json_object('status', ?), json_object('status', s.name)
+                                  FROM StatusBatchItems i
+                                  JOIN Flights f ON f.flight_id = i.flight_id
+                                  LEFT JOIN FlightStatus s ON s.status_id = i.old_status_id
+                                  WHERE i.batch_id = ? AND f.status_id = ?""", (self.actor, row[2], batch_id, row[0]))
+            restored = self.conn.execute("""UPDATE Flights
+                                            SET status_id = i.old_status_id
+                                            FROM StatusBatchItems i
+                                            WHERE i.batch_id = ? AND i.flight_id = Flights.flight_id
+                                              AND Flights.status_id = ?""", (batch_id, row[0])).rowcount
+            self.conn.execute("UPDATE StatusBatches SET rolled_back_at = datetime('now') WHERE batch_id = ?",
+                              (batch_id,))
+        return restored
+
+    def list_status_batches(self, limit=20):
+        """(batch_id, created_at, new_status, filters, affected, rolled_back_at), newest first."""
+        return self.conn.execute("""SELECT b.batch_id, b.created_at, s.name, b.filters, b.affected, b.rolled_back_at
+                                    FROM StatusBatches b
+                                    LEFT JOIN FlightStatus s ON s.status_id = b.new_status_id
+                                    ORDER BY b.batch_id DESC LIMIT ?""", (limit,)).fetchall()
+
+    # --- Pilots --- #
+
+    def list_pilots(self):
+        """(pilot_id, name, license_num)"""
+        return self._cached("Pilots", "pilots", loaders.list_pilots)
+
+    def search_pilots(self, text, limit=20):
+        return self._cached("Pilots", ("search", text, limit), lambda conn: search_pilots(conn, text, limit))
+
+    def pilot_schedule(self, pilot_id):
+        """List of (flight_num, departure_date, city) for one pilot."""
+        return list(loaders.pilot_schedule(self.conn, pilot_id))
+
+    # --- Destinations --- #
+
+    def list_destinations(self):
+        """(dest_id, city, airport_code), ordered by city."""
+        return self._cached("Destinations", "destinations", loaders.list_destinations)
+
+    def list_destinations_with_counts(self):
+        """(dest_id, airport_code, city, flight_count), ordered by city."""
+        return loaders.list_destinations_with_counts(self.conn)
+
+    def create_destination(self, city, airport_code):
+        """Add a destination and return its dest_id."""
+        try:
+            with self.transaction():
+                cursor = self.conn.execute("INSERT INTO Destinations (city, airport_code) VALUES (?, ?)",
+                                           (city, airport_code))
+                audit.record(self.conn, [audit.entry(self.actor, "destination", cursor.lastrowid, "insert",
+                                                     None, {"city": city, "airport_code": airport_code})])
+        except DuplicateError:
+            raise DuplicateError(f"Airport code '{airport_code}' already exists.") from None
+        return cursor.lastrowid
+
+    def update_destination(self, dest_id, city=None, airport_code=None):
+        """Rename a destination and/or change its airport code (None keeps the current value)."""
+        if not self.destination_exists(dest_id):
+            raise NotFoundError(f"Destination ID {dest_id} not found.")
+        try:
+            with self.transaction():
+                old_city, old_code = self.conn.execute("SELECT city, airport_code FROM Destinations WHERE dest_id = ?",
+                                                       (dest_id,)).fetchone()
+                self.conn.execute("""UPDATE Destinations
+                                     SET city = COALESCE(?, city), airport_code = COALESCE(?, airport_code)
+                                     WHERE dest_id = ?""", (city, airport_code, dest_id))
+                changes = audit.changed_fields({"city": old_city, "airport_code": old_code},
+                                               {"city": city or old_city, "airport_code": airport_code or old_code})
+                if changes:
+                    audit.record(self.conn, [audit.entry(self.actor, "destination", dest_id, "update", *changes)])
+        except DuplicateError:
+            raise DuplicateError(f"Airport code '{airport_code}' already exists.") from None
+
+    def destination_flight_count(self, dest_id):
+        """Flights assigned to a destination (served by idx_flights_dest)."""
+        return self.conn.execute("SELECT COUNT(*) FROM Flights WHERE dest_id = ?", (dest_id,)).fetchone()[0]
+
+    def destination_delete_policy(self):
+        """What deleting a destination does to its flights: restrict, set null or cascade (see integrity.py)."""
+        return get_delete_policy(self.conn, "Destinations")
+
+    def delete_destination(self, dest_id, force=False):
+        """Delete a destination. Returns the number of flights it had.
+
+        A destination with flights is only deleted when force is true; its
+        flights are then detached or deleted in the same statement, as
+        destination_delete_policy() says. Under 'restrict' it is never deleted.
+        """
+        return self._single(lambda ids: self.delete_destinations(ids, force), dest_id)[0]
+
+    def delete_destinations(self, dest_ids, force=False):
+        """Delete a list of destinations in one transaction. Returns the flight count of each.
+
+        An id listed more than once is deleted (and logged) once. The flight
+        counts are taken and the delete policy checked inside the
+        transaction, so a flight added meanwhile is never detached or
+        deleted unchecked.
+        """
+        dest_ids = list(dest_ids)
+        # Each id with its first position in the list, for errors
+        positions = {}
+        for index, d_id in enumerate(dest_ids):
+            positions.setdefault(d_id, index)
+        with self.transaction():
+            self._check_ids([(index, d_id) for d_id, index in positions.items()],
+                            "Destinations", "dest_id", "Destination")
+            counts = {d_id: self.destination_flight_count(d_id) for d_id in positions}
+            policy = self.destination_delete_policy()
+            if not force or policy == "restrict":
+                for d_id, index in positions.items():
+                    if counts[d_id] > 0:
+                        reason = " and the delete policy is 'restrict'" if force else ""
+                        raise DestinationInUseError(f"This destination has {counts[d_id]} flight(s) assigned{reason}.",
+                                                    counts[d_id], index)
+            referenced = [(self.actor, d_id) for d_id, count in counts.items() if count > 0]
+            if policy == "set null":
+                self.conn.executemany(f"""INSERT INTO AuditLog (changed_at, actor, entity, entity_id, action,
+                                                                old_values, new_values)
+                                          SELECT {audit.NOW}, ?, 'flight', flight_id, 'update',
+                                                 json_object('dest_id', dest_id), json_object('dest_id', NULL)
+                                          FROM Flights WHERE dest_id = ?""", referenced)
+            elif policy == "cascade":
+                self.conn.executemany(f"""INSERT INTO AuditLog (changed_at, actor, entity, entity_id, action,
+                                                                old_values, new_values)
+                                          SELECT {audit.NOW}, ?, 'flight', flight_id, 'delete',
+                                                 {audit.FLIGHT_VALUES_JSON}, NULL
+                                          FROM Flights WHERE dest_id = ?""", referenced)
+            entries = []
+            for d_id in positions:
+                d_city, d_code = self.conn.execute("SELECT city, airport_code FROM Destinations WHERE dest_id = ?",
+                                                   (d_id,)).fetchone()
+                entries.append(audit.entry(self.actor, "destination", d_id, "delete",
+                                           {"city": d_city, "airport_code": d_code}))
+            audit.record(self.conn, entries)
+            # The delete policy trigger detaches or deletes the flights within each DELETE
+            self.conn.executemany("DELETE FROM Destinations WHERE dest_id = ?", [(d_id,) for d_id in positions])
+        return [counts[d_id] for d_id in dest_ids]
+
+    # --- Reports --- #
+
+    def summary(self, name):
+        """List of (label, flight_count) rows for one of loaders.SUMMARY_QUERIES."""
+        return list(loaders.summary(self.conn, name))
+
+    def summaries(self):
+        """Every summary report: {name: [(label, flight_count), ...]}."""
+        return {name: self.summary(name) for name in loaders.SUMMARY_QUERIES}
+
+    def time_series(self, name, **options):
+        """(headers, rows) of one of analytics.REPORTS. Raises ServiceError
+        when NumPy is not installed and ValidationError for a count option
+        (window, last, top, months) below 1.
+        """
+        import analytics  # loads NumPy, so only when a report is asked for
+        try:
+            analytics.require_numpy()
+        except RuntimeError as e:
+            raise ServiceError(str(e)) from None
+        report, _ = analytics.REPORTS[name]
+        try:
+            return report(self.conn, **options)
+        except ValueError as e:
+            raise ValidationError(str(e)) from None
@@ -0,0 +1,125 @@
+import re
+
+from audit import NOW, default_actor
+
+# Flight status vocabulary (migration 10).
+#
+# Statuses are rows of FlightStatus with integer codes, and Flights stores
+# status_id instead of free text: rows are smaller, status filters and the
+# summary counts compare integers, and "Delayed" / "delayed" can no longer
+# coexist because names are unique ignoring case.
+#
+# The migration maps the existing text values onto codes. Values whose
+# status_key() matches a standard status or one of ALIASES get its code;
+# anything else becomes a status of its own (named after its most common
+# spelling), which merge_status() can fold into the right one afterwards.
+#
+#     python db_manager.py statuses
+#     python db_manager.py add-status Boarding
+#     python db_manager.py merge-status Delayd Delayed
+
+STANDARD_STATUSES = [
+    (1, "Scheduled"),
+    (2, "On Time"),
+    (3, "Delayed"),
+    (4, "Cancelled"),
+    (5, "Boarding"),
+    (6, "Departed"),
+    (7, "Arrived"),
+    (8, "Diverted"),
+]
+
+# Other spellings seen in hand-entered data, by status_key()
+ALIASES = {
+    "sched": "Scheduled",
+    "ontime": "On Time",
+    "delay": "Delayed",
+    "delayd": "Delayed",
+    "late": "Delayed",
+    "canceled": "Cancelled",
+    "cancel": "Cancelled",
+    "canceld": "Cancelled",
+    "cancelld": "Cancelled",
+}
+
+_SEPARATORS = re.compile(r"[\s_-]+")
+
+
+def status_key(name):
+    """Case, space, hyphen and underscore folded: 'On-time' -> 'ontime'."""
+    return _SEPARATORS.sub("", name).lower()
+
+
+def status_key_sql(column):
+    """SQL expression computing status_key() of column (spaces, hyphens and underscores only)."""
+    return f"lower(replace(replace(replace(trim({column}), ' ', ''), '-', ''), '_', ''))"
+
+
+def known_keys():
+    """{status_key: status_id} for the standard statuses and their aliases."""
+    ids = {name: status_id for status_id, name in STANDARD_STATUSES}
+    keys = {status_key(name): status_id for status_id, name in STANDARD_STATUSES}
+    keys.update((alias, ids[name]) for alias, name in ALIASES.items())
+    return keys
+
+
+def seed_statement():
+    """INSERT for the standard statuses. Names come from STANDARD_STATUSES, not user input."""
+    values = ", ".join(f"({status_id}, '{name}')" for status_id, name in STANDARD_STATUSES)
+    return f"INSERT OR IGNORE INTO FlightStatus (status_id, name) VALUES {values}"
+
+
+def key_lookup_sql(column):
+    """Scalar subquery giving the code of a known key for column's value, or NULL."""
+    values = ", ".join(f"('{key}', {status_id})" for key, status_id in sorted(known_keys().items()))
+    return f"(SELECT column2 FROM (VALUES {values}) WHERE column1 = {status_key_sql(column)})"
+
+
+def list_statuses(conn):
+    """(status_id, name, flight_count) for every status, by code."""
+    return conn.execute("""SELECT s.status_id, s.name, COALESCE(c.flights, 0)
+                           FROM FlightStatus s
+                           LEFT JOIN FlightCountsByStatus c ON c.status_id = s.status_id
+                           ORDER BY s.status_id""").fetchall()
+
+
+def find_status(conn, name):
+    """status_id for name (ignoring case), or None."""
+    row = conn.execute("SELECT status_id FROM FlightStatus WHERE name = ?", (name.strip(),)).fetchone()
+    return row[0] if row else None
+
+
+def add_status(conn, name):
+    """Add a status and return its status_id."""
+    name = name.strip()
+    if not name or name.isdigit():
+        raise ValueError("A status needs a name with letters in it.")
+    if find_status(conn, name) is not None:
+        raise ValueError(f"Status '{name}' already exists.")
+    with conn:
+        return conn.execute("INSERT INTO FlightStatus (name) VALUES (?)", (name,)).lastrowid
+
+
+def merge_status(conn, source, target, actor=None):
+    """Move every flight (and status batch) from status source to target and
+    delete source, in one transaction. Returns the number of flights moved.
+    """
+    source_id, target_id = find_status(conn, source), find_status(conn, target)
+    for name, status_id in ((source, source_id), (target, target_id)):
+        if status_id is None:
+            raise ValueError(f"Unknown status: {name}")
+    if source_id == target_id:
+        raise ValueError("Choose two different statuses.")
+    source_name, target_name = (conn.execute("SELECT name FROM FlightStatus WHERE status_id = ?",
+                                             (status_id,)).fetchone()[0] for status_id in (source_id, target_id))
+    with conn:
+        conn.execute(f"""INSERT INTO AuditLog (changed_at, actor, entity, entity_id, action, old_values, new_values)
+                         SELECT {NOW}, ?, 'flight', flight_id, 'update',
+                                json_object('status', ?), json_object('status', ?)
+                         FROM Flights WHERE status_id = ?""",
+                     (actor or default_actor(), source_name, target_name, source_id))
+        moved = conn.execute("UPDATE Flights SET status_id = ? WHERE status_id = ?", (target_id, source_id)).rowcount
+        conn.execute("UPDATE StatusBatches SET new_status_id = ? WHERE new_status_id = ?", (target_id, source_id))
+        conn.execute("UPDATE StatusBatchItems SET old_status_id = ? WHERE old_status_id = ?", (target_id, source_id))
+        conn.execute("DELETE FROM FlightStatus WHERE status_id = ?", (source_id,))
+    return moved
@@ -0,0 +1,60 @@
+# Maintenance for the materialised flight counts created by migration 4.
+#
+# FlightCountsByDestination / ByPilot / ByStatus are kept current by triggers
+# on Flights. verify_summaries() compares them with a fresh GROUP BY and
+# rebuild_summaries() recomputes them from scratch in one transaction.
+
+# name -> (counts table, key column)
+COUNT_TABLES = {
+    "destinations": ("FlightCountsByDestination", "dest_id"),
+    "pilots": ("FlightCountsByPilot", "pilot_id"),
+    "status": ("FlightCountsByStatus", "status_id"),
+}
+
+# Set-based replacement for the flight_counts_insert trigger, used by bulk
+# imports: adds the counts for every flight with flight_id > ? in one go.
+COUNTS_BATCH_INSERT = [
+    f"""INSERT INTO {table} ({key}, flights)
+        SELECT {key}, COUNT(*) FROM Flights WHERE flight_id > ? AND {key} IS NOT NULL GROUP BY {key}
+        ON CONFLICT ({key}) DO UPDATE SET flights = flights + excluded.flights"""
+    for table, key in COUNT_TABLES.values()
+]
+
+
+def live_counts(conn, name):
+    """Counts computed directly from Flights (full aggregate)."""
+    _, key = COUNT_TABLES[name]
+    cursor = conn.execute(f"SELECT {key}, COUNT(*) FROM Flights WHERE {key} IS NOT NULL GROUP BY {key}")
+    return dict(cursor.fetchall())
+
+
+def stored_counts(conn, name):
+    table, key = COUNT_TABLES[name]
+    cursor = conn.execute(f"SELECT {key}, flights FROM {table} WHERE flights != 0")
+    return dict(cursor.fetchall())
+
+
+def verify_summaries(conn):
+    """Return a list of (summary, key, stored, live) for every count that is out of step."""
+    mismatches = []
+    for name in COUNT_TABLES:
+        stored = stored_counts(conn, name)
+        live = live_counts(conn, name)
+        for key in stored.keys() | live.keys():
+            if stored.get(key, 0) != live.get(key, 0):
+                mismatches.append((name, key, stored.get(key, 0), live.get(key, 0)))
+    return mismatches
+
+
+def rebuild_summaries(conn):
+    """Recompute every counts table from Flights in a single transaction."""
+    conn.execute("BEGIN")
+    try:
+        for table, key in COUNT_TABLES.values():
+            conn.execute(f"DELETE FROM {table}")
+            conn.execute(f"""INSERT INTO {table} ({key}, flights)
+                             SELECT {key}, COUNT(*) FROM Flights WHERE {key} IS NOT NULL GROUP BY {key}""")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
@@ -0,0 +1,38 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from connection import open_connection
+
+
+class ReadOnlyConnectionTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_file = os.path.join(self.tmp.name, "rollback.db")
+        conn = sqlite3.connect(self.db_file)
+        conn.execute("PRAGMA journal_mode = DELETE")
+        conn.execute("CREATE TABLE Flights (flight_id INTEGER PRIMARY KEY, flight_num TEXT)")
+        conn.execute("INSERT INTO Flights (flight_num) VALUES ('AB100')")
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_opens_a_rollback_journal_database(self):
+        conn = open_connection(self.db_file, read_only=True)
+        try:
+            self.assertEqual(conn.execute("SELECT flight_num FROM Flights").fetchall(), [("AB100",)])
+            # Still read-only, and the file keeps its own journal mode
+            with self.assertRaises(sqlite3.OperationalError):
+                conn.execute("DELETE FROM Flights")
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "delete")
+            self.assertEqual(conn.execute("PRAGMA foreign_keys").fetchone()[0], 1)
+        finally:
+            conn.close()
+        self.assertFalse(os.path.exists(self.db_file + "-wal"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import datetime
+import random
+import unittest
+
+from scheduling import MIN_REST, first_clash, plan_assignments
+
+T = datetime.datetime(2026, 5, 10, 6, 0)
+HOUR = datetime.timedelta(hours=1)
+
+
+def reference_plan(flights, loads, duties, min_rest=MIN_REST):
+    """plan_assignments() by brute force: every pilot is checked for every
+    flight, and the least-loaded free one (lowest id on a tie) takes it.
+    """
+    loads = dict(loads)
+    duties = {p_id: sorted(intervals) for p_id, intervals in duties.items()}
+    plan = []
+    for f_id, start, end in sorted(flights, key=lambda flight: (flight[1], flight[0])):
+        free = [(load, p_id) for p_id, load in loads.items()
+                if first_clash(duties.setdefault(p_id, []), start, end, min_rest) is None]
+        if free:
+            _, p_id = min(free)
+            duties[p_id] = sorted(duties[p_id] + [(start, end)])
+            loads[p_id] += 1
+            plan.append((f_id, p_id))
+    return plan
+
+
+class PlanAssignmentsTest(unittest.TestCase):
+    def test_short_flight_before_a_later_duty(self):
+        # The long flight clashes with the duty at +20h; the short one ends
+        # in time to rest before it
+        flights = [(1, T, T + 18 * HOUR), (2, T + HOUR, T + 2 * HOUR)]
+        duties = {1: [(T + 20 * HOUR, T + 22 * HOUR)]}
+        self.assertEqual(plan_assignments(flights, {1: 0}, duties), [(2, 1)])
+
+    def test_repeated_slot_without_a_free_pilot(self):
+        # Slot taken by the only pilot; the same slot again cannot be placed
+        flights = [(1, T, T + 2 * HOUR), (2, T, T + 2 * HOUR)]
+        self.assertEqual(plan_assignments(flights, {1: 0}, {}), [(1, 1)])
+
+    def test_matches_brute_force_on_mixed_lengths(self):
+        rng = random.Random(14)
+        for _ in range(200):
+            pilots = rng.randint(1, 5)
+            loads = {p_id: rng.randint(0, 3) for p_id in range(1, pilots + 1)}
+            duties = {}
+            for p_id in loads:
+                for _ in range(rng.randint(0, 3)):
+                    start = T + rng.randint(-12, 96) * HOUR
+                    duties.setdefault(p_id, []).append((start, start + rng.randint(1, 18) * HOUR))
+            flights = []
+            for f_id in range(1, rng.randint(1, 25) + 1):
+                start = T + rng.randint(0, 96) * HOUR
+                flights.append((f_id, start, start + rng.choice([1, 2, 5, 12, 18]) * HOUR))
+            expected = reference_plan(flights, loads, duties)
+            self.assertEqual(plan_assignments(flights, loads, {p_id: sorted(intervals)
+                                                               for p_id, intervals in duties.items()}),
+                             expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
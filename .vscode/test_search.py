@@ -0,0 +1,45 @@
+import random
+import sqlite3
+import unittest
+
+from search import prefix_filter
+
+# Letters either side of the ASCII case ranges, where NOCASE ordering differs
+ALPHABET = "@AZaz[\\]^_`{09"
+
+
+def fold(value):
+    return "".join(char.lower() if "A" <= char <= "Z" else char for char in value)
+
+
+class PrefixFilterTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(2)
+        self.values = ["".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 4))) for _ in range(2000)]
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute("CREATE TABLE Items (value TEXT)")
+        self.conn.executemany("INSERT INTO Items (value) VALUES (?)", [(value,) for value in self.values])
+
+    def tearDown(self):
+        self.conn.close()
+
+    def matches(self, prefix, nocase):
+        sql, params = prefix_filter("value", prefix, nocase)
+        return sorted(row[0] for row in self.conn.execute(f"SELECT value FROM Items WHERE {sql}", params))
+
+    def test_nocase_prefix_ending_in_at_sign(self):
+        self.assertEqual(self.matches("a@", True), sorted(value for value in self.values
+                                                          if fold(value).startswith("a@")))
+
+    def test_matches_startswith(self):
+        rng = random.Random(3)
+        for _ in range(500):
+            prefix = "".join(rng.choice(ALPHABET) for _ in range(rng.randint(1, 3)))
+            self.assertEqual(self.matches(prefix, False),
+                             sorted(value for value in self.values if value.startswith(prefix)))
+            self.assertEqual(self.matches(prefix, True),
+                             sorted(value for value in self.values if fold(value).startswith(fold(prefix))))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,352 @@
+import atexit
+import contextvars
+import os
+import sqlite3
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+
+# Statement tracing, per-operation query metrics and the slow-query log.
+#
+# When tracing is on, connections opened by connection.py are
+# TracedConnections. Their cursors time each statement from execute() until
+# its rows are used up or the cursor is dropped (time spent inside the
+# sqlite3 calls only, not in the caller's loop) and count the rows it
+# returned or changed. Each statement is charged to the current operation,
+# a label set with operation(): the menu labels every action and filter
+# ("view_flights_by_criteria:city"), the API server every endpoint. Nested
+# labels are joined with ":"; statements outside any label count as "other".
+#
+# Per operation, statement counts, rows and a latency histogram are kept in
+# memory and written in Prometheus text format to
+# <directory>/airline_queries_<program>.prom every METRICS_INTERVAL seconds
+# and at exit, replacing the file atomically (node_exporter's textfile
+# collector reads it as is). Statements slower than the threshold are also
+# written, with their EXPLAIN QUERY PLAN, as JSON lines to
+# <directory>/slow_queries.log, rotated at LOG_MAX_BYTES.
+#
+# The per-statement work is kept to two clock reads and a deque append; the
+# histogram is only updated when the metrics are written (or every
+# FLUSH_EVERY statements), which keeps the cost to about 2us a statement.
+#
+# Enable with AIRLINE_TRACE=<directory> (AIRLINE_SLOW_QUERY_MS sets the
+# threshold), or call enable() before opening connections.
+#
+#     AIRLINE_TRACE=/var/log/airline python main.py
+
+SLOW_QUERY_MS = 100.0
+METRICS_INTERVAL = 10.0
+FLUSH_EVERY = 10000
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUPS = 5
+SLOW_LOG_NAME = "slow_queries.log"
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_operation = contextvars.ContextVar("operation", default=None)
+_settings = {"directory": None, "program": None, "logger": None}
+_slow_seconds = SLOW_QUERY_MS / 1000
+# [sql, parameters, operation, seconds, rows] of finished statements not yet in query_stats
+_finished = deque()
+_perf_counter = time.perf_counter
+
+
+@contextmanager
+def operation(name):
+    """Charge statements run inside the block (or decorated function) to name,
+    appended to any enclosing operation as "outer:name".
+    """
+    outer = _operation.get()
+    token = _operation.set(f"{outer}:{name}" if outer else name)
+    try:
+        yield
+    finally:
+        _operation.reset(token)
+
+
+class QueryStats:
+    """Per-operation statement count, total seconds, rows, slow count and latency buckets."""
+
+    def __init__(self):
+        self._operations = {}
+        self._lock = threading.Lock()
+
+    def add(self, statements, slow_seconds):
+        """Count [sql, parameters, operation, seconds, rows] statement records."""
+        with self._lock:
+            for _, _, operation, seconds, rows in statements:
+                operation = operation or "other"
+                stats = self._operations.get(operation)
+                if stats is None:
+                    stats = self._operations[operation] = [0, 0.0, 0, 0, [0] * (len(BUCKETS) + 1)]
+                stats[0] += 1
+                stats[1] += seconds
+                stats[2] += rows
+                stats[3] += seconds >= slow_seconds
+                stats[4][bisect_left(BUCKETS, seconds)] += 1
+
+    def snapshot(self):
+        """{operation: (count, seconds, rows, slow, buckets)}"""
+        with self._lock:
+            return {name: (count, seconds, rows, slow, list(buckets))
+                    for name, (count, seconds, rows, slow, buckets) in self._operations.items()}
+
+    def render(self, program):
+        """Prometheus text exposition of the current totals."""
+        snapshot = sorted(self.snapshot().items())
+        lines = ["# HELP airline_query_duration_seconds Time spent executing statements and fetching their rows.",
+                 "# TYPE airline_query_duration_seconds histogram"]
+        for name, (count, seconds, _, _, buckets) in snapshot:
+            labels = f'program="{_label(program)}",operation="{_label(name)}"'
+            cumulative = 0
+            for bound, bucket in zip(BUCKETS + ("+Inf",), buckets):
+                cumulative += bucket
+                lines.append(f'airline_query_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"airline_query_duration_seconds_sum{{{labels}}} {seconds:.6f}")
+            lines.append(f"airline_query_duration_seconds_count{{{labels}}} {count}")
+        for metric, index, help_text in (("airline_query_rows_total", 2, "Rows returned or changed by statements."),
+                                         ("airline_slow_queries_total", 3, "Statements over the slow-query threshold.")):
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            lines += [f'{metric}{{program="{_label(program)}",operation="{_label(name)}"}} {values[index]}'
+                      for name, values in snapshot]
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        with self._lock:
+            self._operations.clear()
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+query_stats = QueryStats()
+
+
+def enabled():
+    return _settings["directory"] is not None
+
+
+def enable(directory, slow_query_ms=SLOW_QUERY_MS, program=None):
+    """Trace connections opened from now on, writing the metrics file and the
+    slow-query log to directory. program names the metrics file (default:
+    the running script's name).
+    """
+    global _slow_seconds
+    import logging
+    from logging.handlers import RotatingFileHandler
+
+    directory = os.path.abspath(directory)
+    os.makedirs(directory, exist_ok=True)
+    logger = logging.getLogger("airline.slow_queries")
+    if not logger.handlers:
+        handler = RotatingFileHandler(os.path.join(directory, SLOW_LOG_NAME), maxBytes=LOG_MAX_BYTES,
+                                      backupCount=LOG_BACKUPS, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    if program is None:
+        program = os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0] or "python"
+    first = not enabled()
+    _settings.update(directory=directory, program=program, logger=logger)
+    _slow_seconds = slow_query_ms / 1000
+    if first:
+        atexit.register(write_metrics)
+        threading.Thread(target=_write_periodically, name="metrics", daemon=True).start()
+
+
+def metrics_file():
+    return os.path.join(_settings["directory"], f"airline_queries_{_settings['program']}.prom")
+
+
+def flush():
+    """Move finished statements into query_stats."""
+    statements = []
+    try:
+        for _ in range(len(_finished)):
+            statements.append(_finished.popleft())
+    except IndexError:
+        # Another thread flushed at the same time
+        pass
+    query_stats.add(statements, _slow_seconds)
+
+
+def write_metrics():
+    """Write the Prometheus text file now (atomically: written aside, then renamed)."""
+    if not enabled():
+        return
+    flush()
+    path = metrics_file()
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(query_stats.render(_settings["program"]))
+    os.replace(temp_path, path)
+
+
+def _write_periodically():
+    while True:
+        time.sleep(METRICS_INTERVAL)
+        try:
+            write_metrics()
+        except OSError:
+            pass
+
+
+def connection_factory():
+    """The sqlite3.connect() factory for new connections."""
+    return TracedConnection if enabled() else sqlite3.Connection
+
+
+def _finish_statement(conn, trace):
+    _finished.append(trace)
+    if trace[3] >= _slow_seconds:
+        _log_slow_query(conn, *trace)
+    if len(_finished) >= FLUSH_EVERY:
+        flush()
+
+
+def _log_slow_query(conn, sql, parameters, operation, seconds, rows):
+    import json
+    operation = operation or "other"
+    try:
+        # A plain cursor, so the plan lookup is not traced itself
+        plan = [detail for _, _, _, detail in
+                sqlite3.Cursor(conn).execute(f"EXPLAIN QUERY PLAN {sql}", parameters or ())]
+    except (sqlite3.Error, ValueError):
+        plan = None
+    entry = {"at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "program": _settings["program"],
+             "operation": operation, "ms": round(seconds * 1000, 3), "rows": rows, "sql": " ".join(sql.split()),
+             "parameters": parameters, "plan": plan}
+    _settings["logger"].info(json.dumps(entry, default=repr))
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor that reports each statement to the tracer once its rows are used up."""
+
+    # [sql, parameters, operation, seconds, rows] of the statement in progress
+    _trace = None
+
+    def execute(self, sql, parameters=()):
+        if self._trace is not None:
+            self._finish()
+        start = _perf_counter()
+        _execute(self, sql, parameters)
+        trace = [sql, parameters, _operation.get(), _perf_counter() - start, 0]
+        # rowcount is only set by INSERT/UPDATE/DELETE, which have run to completion
+        # by now; anything else (rows or not) is finished when it is used up or dropped
+        if self.rowcount >= 0:
+            trace[4] = self.rowcount
+            _finish_statement(self.connection, trace)
+        else:
+            self._trace = trace
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        if self._trace is not None:
+            self._finish()
+        start = _perf_counter()
+        _executemany(self, sql, seq_of_parameters)
+        seconds = _perf_counter() - start
+        # Only a list can be read again for the plan lookup; iterators are used up
+        parameters = seq_of_parameters[0] if isinstance(seq_of_parameters, list) and seq_of_parameters else None
+        _finish_statement(self.connection, [sql, parameters, _operation.get(), seconds, max(self.rowcount, 0)])
+        return self
+
+    def fetchone(self):
+        start = _perf_counter()
+        row = _fetchone(self)
+        trace = self._trace
+        if trace is not None:
+            trace[3] += _perf_counter() - start
+            if row is None:
+                self._finish()
+            else:
+                trace[4] += 1
+        return row
+
+    def fetchmany(self, size=None):
+        start = _perf_counter()
+        rows = _fetchmany(self, self.arraysize if size is None else size)
+        trace = self._trace
+        if trace is not None:
+            trace[3] += _perf_counter() - start
+            trace[4] += len(rows)
+            if not rows:
+                self._finish()
+        return rows
+
+    def fetchall(self):
+        start = _perf_counter()
+        rows = _fetchall(self)
+        trace = self._trace
+        if trace is not None:
+            trace[3] += _perf_counter() - start
+            trace[4] += len(rows)
+            self._finish()
+        return rows
+
+    def __next__(self):
+        start = _perf_counter()
+        try:
+            row = _next(self)
+        except StopIteration:
+            if self._trace is not None:
+                self._trace[3] += _perf_counter() - start
+                self._finish()
+            raise
+        trace = self._trace
+        if trace is not None:
+            trace[3] += _perf_counter() - start
+            trace[4] += 1
+        return row
+
+    def close(self):
+        if self._trace is not None:
+            self._finish()
+        _close(self)
+
+    def __del__(self):
+        if self._trace is not None:
+            try:
+                self._finish()
+            except Exception:
+                # May run during interpreter shutdown, after the modules it needs are gone
+                pass
+
+    def _finish(self):
+        trace, self._trace = self._trace, None
+        try:
+            _finish_statement(self.connection, trace)
+        except OSError:
+            # Tracing must never break the statement it observes
+            pass
+
+
+_execute = sqlite3.Cursor.execute
+_executemany = sqlite3.Cursor.executemany
+_fetchone = sqlite3.Cursor.fetchone
+_fetchmany = sqlite3.Cursor.fetchmany
+_fetchall = sqlite3.Cursor.fetchall
+_next = sqlite3.Cursor.__next__
+_close = sqlite3.Cursor.close
+
+
+class TracedConnection(sqlite3.Connection):
+    """Connection whose cursors, including those made by execute(), are TracedCursors."""
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return TracedCursor(self).execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return TracedCursor(self).executemany(sql, seq_of_parameters)
+
+
+if os.environ.get("AIRLINE_TRACE"):
+    enable(os.environ["AIRLINE_TRACE"], float(os.environ.get("AIRLINE_SLOW_QUERY_MS") or SLOW_QUERY_MS))
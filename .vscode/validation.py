@@ -0,0 +1,56 @@
+import datetime
+import re
+
+# Validation rules shared by the interactive prompts in menu.py and the
+# non-interactive bulk import, so both accept exactly the same values.
+
+FLIGHT_NUM_PATTERN = re.compile(r'^FL-\d{3}$')
+DATE_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+TIMESTAMP_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}$')
+# Flights store departure dates as whole days since this date (migration 11)
+EPOCH = datetime.date(1970, 1, 1)
+
+
+def is_valid_flight_number(value):
+    return bool(FLIGHT_NUM_PATTERN.match(value))
+
+
+def is_valid_date(value):
+    """'YYYY-MM-DD' that is also a real calendar date (not 2026-13-45 or 2026-02-30)."""
+    if not DATE_PATTERN.match(value):
+        return False
+    try:
+        datetime.date.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+
+def epoch_day(value):
+    """The departure_day stored for a valid 'YYYY-MM-DD' date: days since 1970-01-01."""
+    return (datetime.date.fromisoformat(value) - EPOCH).days
+
+
+def day_to_date(day):
+    """'YYYY-MM-DD' of a departure_day."""
+    return (EPOCH + datetime.timedelta(days=day)).isoformat()
+
+
+def is_valid_timestamp(value):
+    """'YYYY-MM-DD HH:MM' that is also a real date and time."""
+    if not TIMESTAMP_PATTERN.match(value):
+        return False
+    try:
+        datetime.datetime.strptime(value, "%Y-%m-%d %H:%M")
+    except ValueError:
+        return False
+    return True
+
+
+def status_error(status):
+    """Return the reason a status is rejected, or None if it is acceptable."""
+    if status == "":
+        return "Status cannot be blank."
+    if status.isdigit():
+        return "Status should contain letters, not numbers."
+    return None